@@ -13,3 +13,18 @@ OVERDUE_PLAYER_TIMEDELTA_S = os.environ.get("OVERDUE_PLAYER_TIMEDELTA_S", defaul
 OVERDUE_PLAYER_REMOVAL_INTERVAL_S = os.environ.get("OVERDUE_PLAYER_REMOVAL_INTERVAL_S", default=15)
 UNOBSERVED_GAMES_TIMEDELTA_S = os.environ.get("UNOBSERVED_GAMES_TIMEDELTA_S", default=3600)
 UNOBSERVED_GAMES_REMOVE_INTERVAL_S = os.environ.get("UNOBSERVED_GAMES_REMOVE_INTERVAL_S", default=1800)
+
+""" Boards of these maze sizes are generated in the background, so that creating and restarting games does not have to
+wait for the board generation. Format is a comma-separated list of size:capacity, e.g. "7:8,9:4". Empty disables it. """
+BOARD_POOL_SIZES = {int(size): int(capacity) for size, capacity in
+                    (entry.split(":") for entry in os.environ.get("BOARD_POOL_SIZES", default="").split(",") if entry)}
+
+""" Encoding of the persisted game states, either "json" or "binary". Games are converted with their next update. """
+GAME_STATE_ENCODING = os.environ.get("GAME_STATE_ENCODING", default="json")
+
+""" Number of games kept in memory, so that requests do not load them from the database. 0 disables the cache.
+GAME_CACHE_DURABILITY is "write-through" (every update is written immediately) or "write-behind" (updates are
+written GAME_CACHE_FLUSH_INTERVAL_S seconds after the first change, and lost if the process crashes before). """
+GAME_CACHE_SIZE = int(os.environ.get("GAME_CACHE_SIZE", default=0))
+GAME_CACHE_DURABILITY = os.environ.get("GAME_CACHE_DURABILITY", default="write-through")
+GAME_CACHE_FLUSH_INTERVAL_S = float(os.environ.get("GAME_CACHE_FLUSH_INTERVAL_S", default=5))
@@ -35,6 +35,8 @@ def create_app(test_config=None):
         JSON_SORT_KEYS=False,
         DATABASE=os.path.join(app.instance_path, "labyrinth.sqlite"),
         LIBRARY_PATH=os.path.join(app.instance_path, "lib"),
+        BOARD_POOL_SIZES={},
+        GAME_CACHE_SIZE=0,
     )
 
     if test_config is None:
@@ -60,6 +62,8 @@ def create_app(test_config=None):
         schedule_remove_unobserved_games()
         scheduler.start()
 
+    _configure_model_caches(app.config)
+
     try:
         os.makedirs(app.instance_path)
     except OSError:
@@ -98,3 +102,17 @@ def create_app(test_config=None):
         return version_info._asdict()
 
     return app
+
+
+def _configure_model_caches(config):
+    """Fills the board pool and writes the game cache on exit, if they are configured"""
+    if config["BOARD_POOL_SIZES"]:
+        from labyrinth.model.factories import configure_board_pool
+
+        configure_board_pool(config["BOARD_POOL_SIZES"])
+
+    if config["GAME_CACHE_SIZE"]:
+        import atexit
+        from labyrinth.game_cache import close_game_caches
+
+        atexit.register(close_game_caches)
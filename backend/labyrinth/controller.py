@@ -10,7 +10,8 @@ import labyrinth.model.factories as factory
 import labyrinth.mapper.api as mapper
 from labyrinth import exceptions
 from labyrinth.database import DatabaseGateway
-from labyrinth.model.exceptions import LabyrinthDomainException
+from labyrinth.game_cache import game_cache
+from labyrinth.model.exceptions import LabyrinthDomainException, GameNotFoundException
 from labyrinth.model import interactors
 from labyrinth.model.game import Player
 from labyrinth.model import bots
@@ -29,19 +30,24 @@ def add_player(game_id, player_request_dto):
     """
     _ = interactors.OverduePlayerInteractor(game_repository(), logging.get_logger())
     _ = interactors.UpdateOnTurnChangeInteractor(game_repository())
-    game = _get_or_create_game(game_id)
     is_bot, computation_method = mapper.dto_to_type(player_request_dto)
     player_name = mapper.dto_to_player_name(player_request_dto)
-    player_id = _try(game.unused_player_id)
-    player = None
-    if not is_bot:
-        player = Player(player_id, player_name=player_name)
-    else:
-        player = _try(lambda: bots.create_bot(compute_method=computation_method,
-                                              url_supplier=URLSupplier(), player_id=player_id,
-                                              player_name=player_name))
-    _try(lambda: game.add_player(player))
-    DatabaseGateway.get_instance().update_game(game_id, game)
+
+    def add():
+        game = _get_or_create_game(game_id)
+        player_id = _try(game.unused_player_id)
+        player = None
+        if not is_bot:
+            player = Player(player_id, player_name=player_name)
+        else:
+            player = _try(lambda: bots.create_bot(compute_method=computation_method,
+                                                  url_supplier=URLSupplier(), player_id=player_id,
+                                                  player_name=player_name))
+        _try(lambda: game.add_player(player))
+        game_repository().update(game)
+        return game, player, player_id
+
+    game, player, player_id = _try(lambda: interactors.retry_on_conflict(add))
     DatabaseGateway.get_instance().commit()
     logging.get_logger().add_player(player_id, game_id=game_id, is_bot=is_bot, num_players=len(game.players))
     return mapper.player_to_dto(player)
@@ -55,9 +61,14 @@ def delete_player(game_id, player_id):
     """
     _ = interactors.OverduePlayerInteractor(game_repository(), logging.get_logger())
     _ = interactors.UpdateOnTurnChangeInteractor(game_repository())
-    game = _load_game_or_throw(game_id, for_update=True)
-    _try(lambda: game.remove_player(player_id))
-    DatabaseGateway.get_instance().update_game(game_id, game)
+
+    def remove():
+        game = _load_game_or_throw(game_id)
+        _try(lambda: game.remove_player(player_id))
+        game_repository().update(game)
+        return game
+
+    game = _try(lambda: interactors.retry_on_conflict(remove))
     DatabaseGateway.get_instance().commit()
     logging.get_logger().remove_player(player_id, game_id=game_id, num_players=len(game.players))
     return ""
@@ -70,6 +81,8 @@ def change_player_name(game_id, player_id, player_name_dto):
     :param player_id: specifies the player to remove
     :param player_name_dto: contains the new player name."""
     new_name = mapper.dto_to_player_name(player_name_dto)
+    _ = interactors.OverduePlayerInteractor(game_repository(), logging.get_logger())
+    _ = interactors.UpdateOnTurnChangeInteractor(game_repository())
     interactors.PlayerInteractor(game_repository()).change_name(game_id, player_id, new_name)
     DatabaseGateway.get_instance().commit()
 
@@ -84,10 +97,14 @@ def change_game(game_id, game_request_dto):
     new_size = mapper.dto_to_maze_size(game_request_dto)
     _ = interactors.OverduePlayerInteractor(game_repository(), logging.get_logger())
     _ = interactors.UpdateOnTurnChangeInteractor(game_repository())
-    game = _load_game_or_throw(game_id)
-    new_board = _try(lambda: factory.create_board(maze_size=new_size))
-    _try(lambda: game.restart(new_board))
-    DatabaseGateway.get_instance().update_game(game_id, game)
+
+    def restart():
+        game = _load_game_or_throw(game_id)
+        new_board = _try(lambda: factory.create_board(maze_size=new_size))
+        _try(lambda: game.restart(new_board))
+        game_repository().update(game)
+
+    _try(lambda: interactors.retry_on_conflict(restart))
     DatabaseGateway.get_instance().commit()
 
 
@@ -133,6 +150,7 @@ def get_computation_methods():
 def remove_overdue_players(overdue_timedelta):
     """ Uses OverduePlayerInteractor to remove players which block the game by not performing actions """
     interactor = interactors.OverduePlayerInteractor(game_repository(), logging.get_logger())
+    _ = interactors.UpdateOnTurnChangeInteractor(game_repository())
     _try(lambda: interactor.remove_overdue_players(overdue_timedelta))
     DatabaseGateway.get_instance().commit()
 
@@ -147,28 +165,28 @@ def remove_unobserved_games(unobserved_period):
 
 
 def game_repository():
-    return interactors.GameRepository(DatabaseGateway.get_instance())
+    return interactors.GameRepository(DatabaseGateway.get_instance(), game_cache(current_app.config))
 
 
 def _get_or_create_game(game_id):
-    game = DatabaseGateway.get_instance().load_game(game_id)
-    if game is None:
-        game = _create_game(game_id)
-    return game
+    try:
+        return game_repository().find_by_id(game_id)
+    except GameNotFoundException:
+        return _create_game(game_id)
 
 
 def _create_game(game_id):
     game = factory.create_game(game_id=game_id)
-    DatabaseGateway.get_instance().create_game(game, game_id)
+    game_repository().add(game)
     logging.get_logger().add_game(game_id)
     return game
 
 
-def _load_game_or_throw(game_id, for_update=False):
-    game = DatabaseGateway.get_instance().load_game(game_id, for_update=for_update)
-    if game is None:
+def _load_game_or_throw(game_id):
+    try:
+        return game_repository().find_by_id(game_id)
+    except GameNotFoundException:
         raise exceptions.GAME_NOT_FOUND_API_EXCEPTION
-    return game
 
 
 def _try(model_operation):
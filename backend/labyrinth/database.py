@@ -1,33 +1,307 @@
-""" Database access methods """
+""" Database access methods
+
+Connections are taken from a ConnectionPool, which keeps one long-lived connection per thread and database file.
+The connections are configured with the following settings, in addition to 'DATABASE':
+DATABASE_JOURNAL_MODE (default 'WAL'), so that readers do not block behind a writer and vice versa,
+DATABASE_SYNCHRONOUS (default 'NORMAL', which is durable in WAL mode except for the last commits on power loss), and
+DATABASE_STATEMENT_CACHE (default 128), the number of prepared statements cached per connection.
+
+The state of a game is stored in three columns, one for each part of persistence.GameParts: the maze,
+the players and the turn state. Hence, a turn change or a renamed player only writes its own column.
+The parts are stored either as JSON, or in the binary encoding of mapper.binary, as selected with the setting
+GAME_STATE_ENCODING ('json' or 'binary', default 'json'). The encoding of each game is stored with it, and
+partial updates keep it. Hence, existing games are converted to the configured encoding with their next full update.
+
+Concurrent updates of a game are detected with a version column, which is incremented with every update
+of one of its parts. An update only succeeds if the version is still the one which was loaded,
+otherwise VersionConflictException is raised. There are no locks held between loading and updating a game.
+"""
+from collections import namedtuple
 import json
+import os
 import sqlite3
+import threading
+import time
 from flask import current_app, g
-from .mapper.persistence import dto_to_game, game_to_dto, replace_turn_state
+from .mapper import persistence, binary
+from .mapper.persistence import GameParts
+from .model.exceptions import VersionConflictException
+
+ConnectionPoolMetrics = namedtuple("ConnectionPoolMetrics", ["connections", "acquisitions", "opened",
+                                                             "failed_health_checks", "overflows",
+                                                             "last_acquisition_time", "max_acquisition_time",
+                                                             "mean_acquisition_time"])
+ConnectionPoolMetrics.__doc__ = """ Snapshot of the metrics of a ConnectionPool.
+connections is the number of pooled connections, opened the number of connections opened so far.
+overflows counts acquisitions of a thread which already held its pooled connection, and hence got a dedicated one.
+Acquisition times are in seconds, they include the health check and opening a connection if required. """
+
+
+class ConnectionPool:
+    """ Keeps one sqlite connection per thread for a database file.
+
+    Before a connection is handed out, it is checked: uncommitted work of a previous user is rolled back,
+    the connection has to answer a query, and the database file must not have been replaced.
+    Otherwise, the connection is closed and a new one is opened.
+    Connections of threads which have terminated are closed when a new connection is opened.
+
+    :param database: path to the sqlite file
+    :param journal_mode: value of PRAGMA journal_mode
+    :param synchronous: value of PRAGMA synchronous
+    :param cached_statements: size of the prepared-statement cache of each connection
+    """
+
+    def __init__(self, database, journal_mode="WAL", synchronous="NORMAL", cached_statements=128):
+        self._database = database
+        self._journal_mode = journal_mode
+        self._synchronous = synchronous
+        self._cached_statements = cached_statements
+        self._lock = threading.Lock()
+        self._connections = {}
+        self._leased = set()
+        self._acquisitions = 0
+        self._opened = 0
+        self._failed_health_checks = 0
+        self._overflows = 0
+        self._last_acquisition_time = 0.0
+        self._max_acquisition_time = 0.0
+        self._total_acquisition_time = 0.0
+
+    def acquire(self):
+        """ Returns the connection of the calling thread, which has to be given back with release().
+        If the thread already holds its connection, a dedicated connection is opened, and closed on release. """
+        start = time.perf_counter()
+        ident = threading.get_ident()
+        with self._lock:
+            pooled = self._connections.get(ident)
+            overflow = ident in self._leased
+            self._leased.add(ident)
+        if overflow:
+            connection = self._connect()[0]
+        elif pooled is None or not self._is_healthy(*pooled):
+            if pooled is not None:
+                self._close(pooled[0])
+            pooled = self._connect()
+            with self._lock:
+                self._connections[ident] = pooled
+                self._close_connections_of_terminated_threads()
+            connection = pooled[0]
+        else:
+            connection = pooled[0]
+        duration = time.perf_counter() - start
+        with self._lock:
+            self._acquisitions += 1
+            self._overflows += overflow
+            self._last_acquisition_time = duration
+            self._max_acquisition_time = max(self._max_acquisition_time, duration)
+            self._total_acquisition_time += duration
+        return connection
+
+    def release(self, connection):
+        """ Gives a connection back to the pool. Uncommitted changes are rolled back """
+        ident = threading.get_ident()
+        with self._lock:
+            pooled = self._connections.get(ident)
+            is_pooled = pooled is not None and pooled[0] is connection
+            if is_pooled:
+                self._leased.discard(ident)
+        if is_pooled:
+            if self._reset(connection):
+                return
+            with self._lock:
+                self._connections.pop(ident, None)
+        self._close(connection)
+
+    def close_all(self):
+        """ Closes all pooled connections, e.g. before the database file is removed """
+        with self._lock:
+            connections = [pooled[0] for pooled in self._connections.values()]
+            self._connections.clear()
+            self._leased.clear()
+        for connection in connections:
+            self._close(connection)
+
+    def metrics(self):
+        """ Returns a snapshot of the metrics as ConnectionPoolMetrics """
+        with self._lock:
+            mean = self._total_acquisition_time / self._acquisitions if self._acquisitions else 0.0
+            return ConnectionPoolMetrics(len(self._connections), self._acquisitions, self._opened,
+                                         self._failed_health_checks, self._overflows, self._last_acquisition_time,
+                                         self._max_acquisition_time, mean)
+
+    def _connect(self):
+        """ Opens and configures a connection. Returns it together with the identity of the database file """
+        connection = sqlite3.connect(self._database, detect_types=sqlite3.PARSE_DECLTYPES,
+                                     cached_statements=self._cached_statements, check_same_thread=False)
+        connection.row_factory = sqlite3.Row
+        connection.execute("PRAGMA journal_mode={}".format(self._journal_mode))
+        connection.execute("PRAGMA synchronous={}".format(self._synchronous))
+        with self._lock:
+            self._opened += 1
+        return connection, self._file_identity()
+
+    def _is_healthy(self, connection, file_identity):
+        healthy = self._reset(connection) and file_identity == self._file_identity()
+        if healthy:
+            try:
+                connection.execute("SELECT 1").fetchone()
+            except sqlite3.Error:
+                healthy = False
+        if not healthy:
+            with self._lock:
+                self._failed_health_checks += 1
+        return healthy
+
+    def _file_identity(self):
+        try:
+            stat = os.stat(self._database)
+            return stat.st_dev, stat.st_ino
+        except OSError:
+            return None
+
+    def _close_connections_of_terminated_threads(self):
+        alive = {thread.ident for thread in threading.enumerate()}
+        for ident in [ident for ident in self._connections if ident not in alive]:
+            self._leased.discard(ident)
+            self._close(self._connections.pop(ident)[0])
+
+    @staticmethod
+    def _reset(connection):
+        """ Rolls back uncommitted work. Returns False if the connection is unusable """
+        try:
+            if connection.in_transaction:
+                connection.rollback()
+            return True
+        except sqlite3.Error:
+            return False
+
+    @staticmethod
+    def _close(connection):
+        try:
+            connection.close()
+        except sqlite3.Error:
+            pass
+
+
+VersionMetrics = namedtuple("VersionMetrics", ["updates", "conflicts"])
+VersionMetrics.__doc__ = """ Counts the updates of game states,
+and the updates which failed due to a version conflict """
+
+_VERSION_COUNTS = {"updates": 0, "conflicts": 0}
+_VERSION_COUNTS_LOCK = threading.Lock()
+
+
+def version_metrics():
+    """ Returns the VersionMetrics of all gateways of this process """
+    with _VERSION_COUNTS_LOCK:
+        return VersionMetrics(**_VERSION_COUNTS)
+
+
+def _count_update(conflict):
+    with _VERSION_COUNTS_LOCK:
+        _VERSION_COUNTS["updates"] += 1
+        _VERSION_COUNTS["conflicts"] += conflict
+
+
+class _JsonEncoding:
+    """ Stores the parts of a game as JSON of the DTOs of mapper.persistence """
+    NAME = "json"
+
+    @staticmethod
+    def game_to_parts(game):
+        return GameParts(*map(json.dumps, persistence.game_to_parts(game)))
+
+    @staticmethod
+    def parts_to_game(game_parts):
+        return persistence.parts_to_game(GameParts(*map(json.loads, game_parts)))
+
+    @staticmethod
+    def players_to_part(game):
+        return json.dumps(persistence.players_to_dto(game))
+
+    @staticmethod
+    def player_action_to_part(player_action):
+        return json.dumps(persistence.player_action_to_dto(player_action))
+
+
+class _BinaryEncoding:
+    """ Stores the parts of a game in the encoding of mapper.binary """
+    NAME = "binary"
+    game_to_parts = staticmethod(binary.game_to_parts)
+    parts_to_game = staticmethod(binary.parts_to_game)
+    players_to_part = staticmethod(binary.players_to_bytes)
+    player_action_to_part = staticmethod(binary.player_action_to_bytes)
+
+
+_ENCODINGS = {encoding.NAME: encoding for encoding in (_JsonEncoding, _BinaryEncoding)}
+
+_GAME_COLUMNS = "maze, players, turn_state, encoding, version"
+
+_SCHEMA = """
+    DROP TABLE IF EXISTS games;
+
+    CREATE TABLE games (
+        id INTEGER PRIMARY KEY,
+        maze BLOB NOT NULL,
+        players BLOB NOT NULL,
+        turn_state BLOB,
+        encoding TEXT NOT NULL,
+        version INTEGER NOT NULL DEFAULT 0,
+        player_action_timestamp timestamp,
+        last_observed_timestamp timestamp
+    );
+    """
+
+_POOLS = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def connection_pool(settings):
+    """ Returns the ConnectionPool for the database given in the settings, creating it if required """
+    database = settings["DATABASE"]
+    with _POOLS_LOCK:
+        if database not in _POOLS:
+            _POOLS[database] = ConnectionPool(database,
+                                              journal_mode=settings.get("DATABASE_JOURNAL_MODE", "WAL"),
+                                              synchronous=settings.get("DATABASE_SYNCHRONOUS", "NORMAL"),
+                                              cached_statements=settings.get("DATABASE_STATEMENT_CACHE", 128))
+        return _POOLS[database]
+
+
+def close_connection_pools():
+    """ Closes the connections of all pools """
+    with _POOLS_LOCK:
+        pools = list(_POOLS.values())
+        _POOLS.clear()
+    for pool in pools:
+        pool.close_all()
 
 
 class DatabaseGateway:
     """ This gateway allows encapsulates a database connection and
     allows managing via database access methods.
 
-    It opens the connection lazily, but does not close it automatically.
-    'commit' has to be called manually to persist the changes.
+    It acquires a connection from the ConnectionPool lazily, but does not release it automatically.
+    'commit' has to be called manually to persist the changes. Releasing the connection rolls back uncommitted changes.
 
     There are two ways to use this gateway. The first is to use it as a singleton, calling
     get_instance() to get an instance. It will register itself in the request-wide application context.
-    'commit' will be called in the controller, and the application will close this instance at request teardown.
+    'commit' will be called in the controller, and the application will release the connection at request teardown.
 
     If it should be use without a request context, it can be instantiated directly. Users should then take
-    care to commit their changes and close the connection themselves. A convenient way to do so is a with-statement:
+    care to commit their changes and release the connection themselves. A convenient way to do so is a with-statement:
 
             with DatabaseGateway(settings) as gateway:
                 gateway.update_game(7, game)
 
-    This will open a connection, update a game, commit and close the connection.
+    This will acquire a connection, update a game, commit and release the connection.
     The settings parameter is required to a be a dictionary with an entry 'DATABASE', the path to the sqlite file.
     """
 
     def __init__(self, settings=None):
         self._db_connection = None
+        self._loaded = {}
+        self._held = []
         self._game_created_listeners = []
         self._settings = settings or current_app.config
 
@@ -50,24 +324,46 @@ class DatabaseGateway:
         The listener is called with the created game. """
         self._game_created_listeners.append(listener)
 
+    def has_game_created_listeners(self):
+        """ Returns True if a listener has been registered with register_game_created_listener() """
+        return bool(self._game_created_listeners)
+
+    def notify_game_created(self, game):
+        """ Notifies the listeners about a game which has not been created by this gateway,
+        e.g. a game which is kept in memory by a GameCache """
+        self._notify_listeners(game)
+
     def _notify_listeners(self, game):
         for listener in self._game_created_listeners:
             listener(game)
 
+    def hold(self, resource):
+        """ Acquires a resource, e.g. a lock, and keeps it until the database connection is released,
+        i.e. until the end of the request or of the with-statement.
+
+        :param resource: an object with the methods acquire() and release()
+        """
+        resource.acquire()
+        self._held.append(resource)
+
     def create_game(self, game, game_id=0):
         """ Inserts a game into the database """
-        game_json = json.dumps(game_to_dto(game))
+        encoding = self._encoding()
+        maze, players, turn_state = encoding.game_to_parts(game)
         self._db().execute(
-            "INSERT INTO games(id, game_state) VALUES (?, ?)", (game_id, game_json)
+            "INSERT INTO games(id, maze, players, turn_state, encoding, version) VALUES (?, ?, ?, ?, ?, 0)",
+            (game_id, maze, players, turn_state, encoding.NAME)
         )
+        self._loaded[game_id] = (0, encoding)
         self._notify_listeners(game)
 
-    def load_game(self, game_id, for_update=False, with_timestamps=False):
-        """ Loads a game from the database """
+    def load_game(self, game_id, with_timestamps=False):
+        """ Loads a game from the database. Its version is recorded for the next update """
         game_row = (
-            self._db(exclusive=for_update)
+            self._db()
             .execute(
-                "SELECT game_state, last_observed_timestamp, player_action_timestamp FROM games WHERE id=?",
+                "SELECT id, " + _GAME_COLUMNS + ", last_observed_timestamp, player_action_timestamp "
+                "FROM games WHERE id=?",
                 (game_id,),
             )
             .fetchone()
@@ -84,8 +380,8 @@ class DatabaseGateway:
         """ Loads games where the player_action_timestamp is older than the given requested timestamp """
         try:
             game_rows = (
-                self._db(exclusive=True)
-                .execute("SELECT game_state FROM games WHERE player_action_timestamp<?", (timestamp,))
+                self._db()
+                .execute("SELECT id, " + _GAME_COLUMNS + " FROM games WHERE player_action_timestamp<?", (timestamp,))
                 .fetchall()
             )
             return [self._game_row_to_game(game_row) for game_row in game_rows]
@@ -96,8 +392,8 @@ class DatabaseGateway:
         """ Loads games where the last_observed_timestamp is older than the given requested timestamp """
         try:
             game_rows = (
-                self._db(exclusive=True)
-                .execute("SELECT game_state FROM games WHERE last_observed_timestamp<?", (timestamp,))
+                self._db()
+                .execute("SELECT id, " + _GAME_COLUMNS + " FROM games WHERE last_observed_timestamp<?", (timestamp,))
                 .fetchall()
             )
             return [self._game_row_to_game(game_row) for game_row in game_rows]
@@ -105,32 +401,69 @@ class DatabaseGateway:
             return []
 
     def _game_row_to_game(self, game_row):
-        game = dto_to_game(json.loads(game_row["game_state"]))
+        encoding = _ENCODINGS[game_row["encoding"]]
+        self._loaded[game_row["id"]] = (game_row["version"], encoding)
+        game = encoding.parts_to_game(GameParts(game_row["maze"], game_row["players"], game_row["turn_state"]))
         self._notify_listeners(game)
         return game
 
     def update_game(self, game_id, game):
-        """ Updates a game in the database """
-        game_json = json.dumps(game_to_dto(game))
-        self._db().execute(
-            "UPDATE games SET game_state=? WHERE ID=?", (game_json, game_id)
-        )
+        """ Updates all parts of a game in the database, in the configured encoding.
+
+        If the game has been loaded with this gateway, the update only succeeds if no other gateway has updated it
+        in the meantime. Otherwise, VersionConflictException is raised. """
+        encoding = self._encoding()
+        maze, players, turn_state = encoding.game_to_parts(game)
+        version, _ = self._loaded.get(game_id, (None, None))
+        self._update_columns(game_id, version, encoding,
+                             {"maze": maze, "players": players, "turn_state": turn_state, "encoding": encoding.NAME})
+
+    def update_players(self, game_id, game):
+        """ Updates only the players of a game in the database, e.g. after a player has been renamed.
+        Like update_game(), this detects concurrent updates of games loaded with this gateway. """
+        version, encoding = self._loaded.get(game_id, (None, None))
+        if encoding is None:
+            self.update_game(game_id, game)
+        else:
+            self._update_columns(game_id, version, encoding, {"players": encoding.players_to_part(game)})
 
     def update_turn_state(self, game_id, turn_state):
-        """ Updates only the turn state in a game in the database """
-        game_row = (
-            self._db()
-            .execute("SELECT game_state, last_observed_timestamp FROM games WHERE id=?", (game_id,))
-            .fetchone()
-        )
+        """ Updates only the turn state in a game in the database, and increments the version,
+        so that updates of games loaded before fail. Returns False if the game does not exist.
+
+        If the game has been loaded with this gateway, the update is conditional on the loaded version, like
+        update_game(). Otherwise, e.g. for a delayed transition written with a managed gateway, the version of the
+        transitioning game is unknown, and the turn state is overwritten unconditionally (last writer wins). """
+        game_row = self._db().execute("SELECT encoding FROM games WHERE id=?", (game_id,)).fetchone()
         if game_row is None:
             return False
-        game_dto = json.loads(game_row["game_state"])
-        game_dto = replace_turn_state(game_dto, turn_state)
-        game_json = json.dumps(game_dto)
-        self._db().execute(
-            "UPDATE games SET game_state=? WHERE ID=?", (game_json, game_id)
+        version, encoding = self._loaded.get(game_id, (None, _ENCODINGS[game_row["encoding"]]))
+        self._update_columns(game_id, version, encoding, {"turn_state": encoding.player_action_to_part(turn_state)})
+        return True
+
+    def _encoding(self):
+        return _ENCODINGS[self._settings.get("GAME_STATE_ENCODING", "json")]
+
+    def _update_columns(self, game_id, version, encoding, columns):
+        """ Writes the given columns, a dictionary from column name to value, and increments the version.
+        If version is not None, the update is conditional on the version in the database """
+        assignments = "".join(column + "=?, " for column in columns)
+        values = list(columns.values())
+        if version is None:
+            self._db().execute(
+                "UPDATE games SET " + assignments + "version=version+1 WHERE ID=?", values + [game_id]
+            )
+            _count_update(conflict=False)
+            return
+        cursor = self._db().execute(
+            "UPDATE games SET " + assignments + "version=? WHERE ID=? AND version=?",
+            values + [version + 1, game_id, version]
         )
+        conflict = cursor.rowcount == 0
+        _count_update(conflict)
+        if conflict:
+            raise VersionConflictException("Game {} has been updated concurrently.".format(game_id))
+        self._loaded[game_id] = (version + 1, encoding)
 
     def delete_game(self, game_id):
         """ Deletes a game from the database """
@@ -162,48 +495,38 @@ class DatabaseGateway:
         If this method is not called (e.g. due to a prior exception), changes are lost. """
         self._db().commit()
 
-    def _db(self, exclusive=False):
+    def _db(self):
         """ Returns the database. The first time this method is called during a request,
-        a sqlite connection is opened and stored in the global context """
+        a sqlite connection is acquired from the pool """
         if not self._db_connection:
-            self._db_connection = sqlite3.connect(
-                self._settings["DATABASE"], detect_types=sqlite3.PARSE_DECLTYPES
-            )
-            self._db_connection.row_factory = sqlite3.Row
-            if exclusive:
-                self._db_connection.isolation_level = None
-                self._db_connection.execute("BEGIN EXCLUSIVE")
+            self._db_connection = connection_pool(self._settings).acquire()
         return self._db_connection
 
     @classmethod
     def init_database(cls):
         """ Executes the schema definition """
-        cls.get_instance()._db().executescript(
-            """
-        DROP TABLE IF EXISTS games;
-
-        CREATE TABLE games (
-            id INTEGER PRIMARY KEY,
-            game_state TEXT NOT NULL,
-            player_action_timestamp timestamp,
-            last_observed_timestamp timestamp
-        );
-        """
-        )
+        cls.get_instance()._db().executescript(_SCHEMA)
 
     @classmethod
     def close_database(cls):
-        """ Closes the database connection """
-        gateway = cls.get_instance()
-        if gateway._db_connection:
-            gateway._db_connection.close()
-            gateway._db_connection = None
+        """ Releases the database connection and held resources. Uncommitted changes are rolled back """
+        cls.get_instance()._release()
+
+    def _release(self):
+        """ Returns the connection to the pool, and releases the held resources even if this fails """
+        connection, self._db_connection = self._db_connection, None
+        try:
+            if connection:
+                connection_pool(self._settings).release(connection)
+        finally:
+            while self._held:
+                self._held.pop().release()
 
     def __enter__(self):
         return self
 
     def __exit__(self, exc_type, exc_value, traceback):
-        self.commit()
-        if self._db_connection:
-            self._db_connection.close()
-            self._db_connection = None
+        try:
+            self.commit()
+        finally:
+            self._release()
@@ -5,7 +5,7 @@ It also maps domain exceptions to these pre-defined factories. """
 from labyrinth.model.exceptions import InvalidStateException, PlayerNotFoundException, \
     InvalidLocationException, InvalidShiftLocationException, MoveUnreachableException, \
     InvalidRotationException, TurnActionViolationException, GameFullException, InvalidSizeException, \
-    InvalidComputeMethodException, GameNotFoundException
+    InvalidComputeMethodException, GameNotFoundException, VersionConflictException
 from labyrinth.mapper.api import exception_to_dto
 
 
@@ -52,4 +52,6 @@ def domain_to_api_exception(domain_exception):
                             400)
     if isinstance(domain_exception, GameNotFoundException):
         return GAME_NOT_FOUND_API_EXCEPTION
+    if isinstance(domain_exception, VersionConflictException):
+        return ApiException("CONFLICT", "The game has been changed concurrently, please retry.", 409)
     return ApiException("UNKNOWN_ERROR", "An unknown error has occurred.", 500)
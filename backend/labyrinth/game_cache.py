@@ -0,0 +1,385 @@
+""" An in-process cache of live games, which GameRepository uses instead of loading each game from the database.
+
+The cache keeps up to GAME_CACHE_SIZE games per database (default 0, which disables the cache). If it is full,
+the least recently used game is evicted. A cached game is the same Game instance for all requests, including its
+running turn progression. Hence, a request holds the game for the rest of its unit of work, see DatabaseGateway.hold().
+Requests to the same game are serialized, instead of detecting concurrent updates with the version of the game.
+The delayed turn transitions of a cached game are serialized with the requests as well.
+If an update fails nevertheless, e.g. due to a version conflict, the game is discarded from the cache, so that
+it is loaded again with its persisted state.
+
+GAME_CACHE_DURABILITY selects how updates are persisted:
+'write-through' (default) writes every update to the database within the request, as without the cache.
+Only the loading of games is saved.
+'write-behind' only marks the game as changed. Changed games are written to the database on a worker thread of
+the TimerScheduler, GAME_CACHE_FLUSH_INTERVAL_S seconds (default 5) after their first change, and when they are
+evicted. If the process terminates unexpectedly, the updates of the last interval are lost.
+
+The cache assumes that it is the only writer of the games of its database, i.e. that there is only one process.
+Use game_cache() to retrieve the cache of a database.
+"""
+from collections import namedtuple, OrderedDict
+import threading
+
+from labyrinth.database import DatabaseGateway
+from labyrinth.model import timers
+
+WRITE_THROUGH = "write-through"
+WRITE_BEHIND = "write-behind"
+
+GAME = "game"
+TURN_STATE = "turn_state"
+PLAYER_ACTION_TIMESTAMP = "player_action_timestamp"
+LAST_OBSERVED_TIMESTAMP = "last_observed_timestamp"
+
+GameCacheMetrics = namedtuple("GameCacheMetrics", ["games", "hits", "misses", "evictions", "dirty", "written"])
+GameCacheMetrics.__doc__ = """ Snapshot of the metrics of a GameCache.
+games is the number of cached games, dirty the number of games with updates which have not been written yet.
+written counts the games written to the database by flushes. """
+
+
+class CachedGame:
+    """ A cached game, together with its timestamps and the parts which have to be written to the database.
+
+    It is acquired and released by the requests which use the game, and by its delayed turn transitions.
+    removed is set when the game has been deleted, discarded when the cached state has to be loaded again. """
+
+    __slots__ = ("game", "last_observed_timestamp", "player_action_timestamp", "dirty", "leases", "removed",
+                 "discarded", "_lock")
+
+    def __init__(self, game, last_observed_timestamp=None, player_action_timestamp=None):
+        self.game = game
+        self.last_observed_timestamp = last_observed_timestamp
+        self.player_action_timestamp = player_action_timestamp
+        self.dirty = set()
+        self.leases = 0
+        self.removed = False
+        self.discarded = False
+        self._lock = threading.RLock()
+        game.turns.guard_transitions(self)
+
+    def acquire(self):
+        self._lock.acquire()
+        self.leases += 1
+
+    def release(self):
+        self.leases -= 1
+        self._lock.release()
+
+
+class GameCache:
+    """ Keeps the most recently used games of a database in memory.
+
+    The methods which hand out games take the data access of the caller, a DatabaseGateway. It is used to load
+    games which are not cached, and holds the returned games until it is released.
+
+    :param settings: the settings of the DatabaseGateways which write the changed games
+    :param capacity: the maximum number of cached games. Games which are in use are not evicted,
+    so the capacity can be exceeded temporarily.
+    :param durability: either WRITE_THROUGH or WRITE_BEHIND
+    :param flush_interval: the delay in seconds between the first change of a game and its write, for WRITE_BEHIND
+    :param scheduler: the TimerScheduler which runs the flushes, defaults to the scheduler shared by the process
+    """
+
+    def __init__(self, settings, capacity, durability=WRITE_THROUGH, flush_interval=5, scheduler=None):
+        if durability not in (WRITE_THROUGH, WRITE_BEHIND):
+            raise ValueError("Unknown durability {}, expected {} or {}".format(durability, WRITE_THROUGH,
+                                                                               WRITE_BEHIND))
+        self._settings = settings
+        self._capacity = capacity
+        self._write_behind = durability == WRITE_BEHIND
+        self._flush_interval = flush_interval
+        self._scheduler = scheduler or timers.default_scheduler()
+        self._lock = threading.Lock()
+        self._games = OrderedDict()
+        self._evicted = {}
+        self._pending_flush = None
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._written = 0
+
+    def find(self, game_id, data_access):
+        """ Returns the CachedGame with the given identifier, which is loaded with the data access if it is
+        not cached. The game is held by the data access. Returns None if the game does not exist. """
+        while True:
+            with self._lock:
+                cached = self._lookup(game_id)
+                if cached is None:
+                    self._misses += 1
+                else:
+                    self._hits += 1
+            if cached is None:
+                break
+            handed_out = self._hand_out(cached, data_access)
+            if not cached.discarded:
+                return handed_out
+        loaded = data_access.load_game(game_id, with_timestamps=True)
+        if loaded is None:
+            return None
+        game, last_observed_timestamp, player_action_timestamp = loaded
+        return self._insert(CachedGame(game, last_observed_timestamp, player_action_timestamp), data_access)
+
+    def find_all(self, games, data_access, timestamp_name, timestamp):
+        """ Replaces loaded games by their cached instances, and selects the games by their cached timestamp.
+        The games have been loaded because their timestamp in the database is older than the given one.
+        For cached games, the timestamp in the database may be outdated, so they are selected with the cached one.
+        Games which are not cached are yielded as they are, and are not added to the cache.
+
+        Cached games are yielded one at a time, in the order of their identifiers. Each is held until the caller
+        requests the next game, then the changes of the data access are committed and the game is released.
+        Its timestamp is compared again after it has been acquired, as a request may have changed it meanwhile.
+
+        :param games: games loaded with the data access
+        :param timestamp_name: PLAYER_ACTION_TIMESTAMP or LAST_OBSERVED_TIMESTAMP
+        :return: a generator of games
+        """
+        loaded_ids = {game.identifier for game in games}
+        with self._lock:
+            cached_games = dict(self._evicted)
+            cached_games.update(self._games)
+        for game in games:
+            if game.identifier not in cached_games:
+                yield game
+        for game_id in sorted(cached_games):
+            cached = cached_games[game_id]
+            if not self._is_before(cached, timestamp_name, timestamp, game_id in loaded_ids):
+                continue
+            cached.acquire()
+            try:
+                if cached.removed or cached.discarded or \
+                        not self._is_before(cached, timestamp_name, timestamp, game_id in loaded_ids):
+                    continue
+                self._register_listeners(cached, data_access)
+                yield cached.game
+                data_access.commit()
+            finally:
+                cached.release()
+
+    def add(self, game, data_access):
+        """ Caches a game which has just been created with the data access. The game is held by the data access """
+        return self._insert(CachedGame(game), data_access)
+
+    def remove(self, game_id):
+        """ Removes a game from the cache, e.g. because it has been deleted. Pending updates are discarded """
+        with self._lock:
+            cached = self._games.pop(game_id, None) or self._evicted.pop(game_id, None)
+            if cached is not None:
+                cached.removed = True
+                cached.dirty.clear()
+
+    def discard(self, game):
+        """ Removes a cached game whose changes could not be written, e.g. due to a version conflict.
+        Pending updates, its delayed turn transition and its turn change listeners are discarded,
+        so that its state is not written anymore. The next request loads the game again.
+
+        :param game: the changed game. Has no effect if it is not the cached instance.
+        """
+        with self._lock:
+            cached = self._cached_instance(game)
+            if cached is None:
+                return
+            if self._games.get(game.identifier) is cached:
+                del self._games[game.identifier]
+            else:
+                del self._evicted[game.identifier]
+            cached.discarded = True
+            cached.dirty.clear()
+        game.turns.cancel_pending_transition()
+        game.clear_turn_change_listeners()
+
+    def defer(self, game, part):
+        """ Records that a part of a game has changed, if it is written behind.
+
+        :param game: the changed game. Has to be the cached instance.
+        :param part: GAME, TURN_STATE or one of the timestamps
+        :return: True if the change will be written by a flush, False if the caller has to write it
+        """
+        if not self._write_behind:
+            return False
+        with self._lock:
+            cached = self._cached_instance(game)
+            if cached is None:
+                return False
+            cached.dirty.add(part)
+            self._schedule_flush()
+        return True
+
+    def set_timestamp(self, game, timestamp_name, timestamp):
+        """ Updates a timestamp of a cached game.
+
+        :param timestamp_name: PLAYER_ACTION_TIMESTAMP or LAST_OBSERVED_TIMESTAMP
+        :return: True if the change will be written by a flush, False if the caller has to write it
+        """
+        with self._lock:
+            cached = self._cached_instance(game)
+            if cached is not None:
+                setattr(cached, timestamp_name, timestamp)
+        return self.defer(game, timestamp_name)
+
+    def flush(self):
+        """ Writes the changed games to the database. Returns the number of written games """
+        with self._lock:
+            self._pending_flush = None
+            changed = [(game_id, cached) for game_id, cached in list(self._games.items()) + list(self._evicted.items())
+                       if cached.dirty]
+        written = 0
+        for game_id, cached in changed:
+            cached.acquire()
+            try:
+                with self._lock:
+                    dirty, cached.dirty = cached.dirty, set()
+                if dirty:
+                    self._write(game_id, cached, dirty)
+                    written += 1
+            finally:
+                cached.release()
+            with self._lock:
+                if self._evicted.get(game_id) is cached and not cached.dirty:
+                    del self._evicted[game_id]
+        with self._lock:
+            self._written += written
+        return written
+
+    def close(self):
+        """ Writes all changed games and empties the cache """
+        with self._lock:
+            if self._pending_flush is not None:
+                self._pending_flush.cancel()
+                self._pending_flush = None
+        self.flush()
+        with self._lock:
+            self._games.clear()
+            self._evicted.clear()
+
+    def metrics(self):
+        """ Returns a snapshot of the metrics as GameCacheMetrics """
+        with self._lock:
+            dirty = sum(1 for cached in list(self._games.values()) + list(self._evicted.values()) if cached.dirty)
+            return GameCacheMetrics(len(self._games), self._hits, self._misses, self._evictions, dirty,
+                                    self._written)
+
+    def _lookup(self, game_id):
+        """ Returns the cached game, and marks it as most recently used. Revives evicted games which have not
+        been written yet. Requires the lock """
+        cached = self._games.get(game_id)
+        if cached is None:
+            cached = self._evicted.pop(game_id, None)
+            if cached is None:
+                return None
+            self._games[game_id] = cached
+        self._games.move_to_end(game_id)
+        return cached
+
+    @staticmethod
+    def _is_before(cached, timestamp_name, timestamp, is_loaded):
+        """ Compares the cached timestamp. If the game has no cached timestamp, the one of the database is used,
+        which has been compared by the query, i.e. the game is before the timestamp if it has been loaded """
+        cached_timestamp = getattr(cached, timestamp_name)
+        if cached_timestamp is None:
+            return is_loaded
+        return cached_timestamp < timestamp
+
+    def _cached_instance(self, game):
+        """ Returns the CachedGame of this game instance, or None. Requires the lock """
+        cached = self._games.get(game.identifier) or self._evicted.get(game.identifier)
+        if cached is None or cached.game is not game:
+            return None
+        return cached
+
+    def _hand_out(self, cached, data_access):
+        """ Holds a cached game for the data access. If the data access has listeners, they replace the turn change
+        listeners of the previous data access. Otherwise, these are kept, so that delayed turn transitions are
+        still persisted. Returns None if the game has been removed or discarded while waiting for it """
+        data_access.hold(cached)
+        if cached.removed or cached.discarded:
+            return None
+        self._register_listeners(cached, data_access)
+        return cached
+
+    @staticmethod
+    def _register_listeners(cached, data_access):
+        if data_access.has_game_created_listeners():
+            cached.game.clear_turn_change_listeners()
+            data_access.notify_game_created(cached.game)
+
+    def _insert(self, cached, data_access):
+        data_access.hold(cached)
+        game_id = cached.game.identifier
+        while True:
+            with self._lock:
+                existing = self._lookup(game_id)
+                if existing is None:
+                    self._games[game_id] = cached
+                    self._evict()
+            if existing is None:
+                return cached
+            handed_out = self._hand_out(existing, data_access)
+            if not existing.discarded:
+                return handed_out
+
+    def _evict(self):
+        """ Evicts least recently used games which are not in use, until the capacity is met.
+        Changed games are kept aside until they have been written. Requires the lock """
+        for game_id, cached in list(self._games.items()):
+            if len(self._games) <= self._capacity:
+                return
+            if cached.leases:
+                continue
+            del self._games[game_id]
+            self._evictions += 1
+            if cached.dirty:
+                self._evicted[game_id] = cached
+                self._scheduler.schedule(0, self.flush, blocking=True)
+
+    def _schedule_flush(self):
+        """ Schedules a flush after the flush interval, if there is none pending. Requires the lock """
+        if self._pending_flush is None:
+            self._pending_flush = self._scheduler.schedule(self._flush_interval, self.flush, blocking=True)
+
+    def _write(self, game_id, cached, dirty):
+        """ Writes the changed parts of a game. If this fails, they are written with the next flush """
+        try:
+            with DatabaseGateway(self._settings) as gateway:
+                if GAME in dirty:
+                    gateway.update_game(game_id, cached.game)
+                elif TURN_STATE in dirty:
+                    gateway.update_turn_state(game_id, cached.game.turns.next_player_action())
+                if PLAYER_ACTION_TIMESTAMP in dirty:
+                    gateway.update_action_timestamp(game_id, cached.player_action_timestamp)
+                if LAST_OBSERVED_TIMESTAMP in dirty:
+                    gateway.update_observed_timestamp(game_id, cached.last_observed_timestamp)
+        except Exception:
+            with self._lock:
+                if not cached.removed:
+                    cached.dirty |= dirty
+                    self._schedule_flush()
+            raise
+
+
+_CACHES = {}
+_CACHES_LOCK = threading.Lock()
+
+
+def game_cache(settings):
+    """ Returns the GameCache for the database given in the settings, creating it if required.
+    Returns None if the cache is disabled, i.e. if GAME_CACHE_SIZE is 0 or missing """
+    capacity = int(settings.get("GAME_CACHE_SIZE", 0))
+    if not capacity:
+        return None
+    database = settings["DATABASE"]
+    with _CACHES_LOCK:
+        if database not in _CACHES:
+            _CACHES[database] = GameCache(settings, capacity,
+                                          durability=settings.get("GAME_CACHE_DURABILITY", WRITE_THROUGH),
+                                          flush_interval=float(settings.get("GAME_CACHE_FLUSH_INTERVAL_S", 5)))
+        return _CACHES[database]
+
+
+def close_game_caches():
+    """ Writes the changed games of all caches, and removes the caches """
+    with _CACHES_LOCK:
+        caches = list(_CACHES.values())
+        _CACHES.clear()
+    for cache in caches:
+        cache.close()
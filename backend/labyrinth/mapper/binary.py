@@ -0,0 +1,209 @@
+""" Mapper implementation, maps between Model objects and a compact binary encoding.
+
+The encoding holds the same information as the DTOs of the persistence mapper, but avoids building
+one dictionary per maze card, and the encoding and parsing of JSON. All numbers are little-endian.
+Like the persistence mapper, a game is mapped to three separately persisted parts, see persistence.GameParts.
+Each part starts with the magic bytes b"LB" and the format version.
+
+The maze part continues with the maze size, game identifier, turn prepare delay in seconds,
+previous shift location (-1, -1 if there is none), and the identifier of the objective maze card (-1 if there is none).
+It is followed by the maze cards, the leftover card first and then the maze in the order of its locations.
+They are encoded as three packed arrays: identifiers (int32), out paths masks and rotations
+(one byte each, the rotation in multiples of 90 degrees).
+
+The players part continues with the number of players, and one record per player: identifier,
+identifier of the piece's maze card, score, piece index and a flag for bots. It is followed by the player name and,
+for bots, the computation method, library path, shift url and move url. Each string is encoded as
+a presence flag (0 for None), its length (uint32) and its UTF-8 bytes.
+Parts of format version 2 are still read. Their strings were prefixed by a uint16 length, 0xFFFF denoting None.
+
+The turn state part continues with the identifier of the next player and the index of the next action,
+both -1 if there is none.
+"""
+import struct
+from datetime import timedelta
+
+from labyrinth.model.game import Game, Board, MazeCard, Maze, BoardLocation, PlayerAction
+from labyrinth.model import out_paths_dict
+from labyrinth.mapper.persistence import GameParts, player_to_dto, dto_to_player, dto_to_turns
+from labyrinth.mapper.constants import (ID, MAZE_CARD_ID, SCORE, PIECE_INDEX, PLAYER_NAME, IS_BOT, COMPUTATION_METHOD,
+                                        LIBRARY_PATH, SHIFT_URL, MOVE_URL, PLAYER_ID, ACTION)
+
+MAGIC = b"LB"
+FORMAT_VERSION = 3
+_READABLE_VERSIONS = (2, FORMAT_VERSION)
+
+_HEADER = struct.Struct("<2sB")
+_MAZE = struct.Struct("<Bqdbbi")
+_PLAYERS = struct.Struct("<B")
+_TURN_STATE = struct.Struct("<ib")
+_PLAYER = struct.Struct("<iiiBB")
+_STRING_HEADER = struct.Struct("<BI")
+_STRING_LENGTH_V2 = struct.Struct("<H")
+_NONE_LENGTH_V2 = 0xFFFF
+
+_ACTIONS = (PlayerAction.PREPARE_SHIFT, PlayerAction.SHIFT_ACTION, PlayerAction.PREPARE_MOVE, PlayerAction.MOVE_ACTION)
+_ACTION_INDEX = {action: index for index, action in enumerate(_ACTIONS)}
+_OUT_PATHS_BY_MASK = {mask: "".join(direction for direction, bit in out_paths_dict.bit_by_out_path.items()
+                                    if mask & bit)
+                      for mask in range(16)}
+_BOT_FIELDS = (COMPUTATION_METHOD, LIBRARY_PATH, SHIFT_URL, MOVE_URL)
+
+
+def game_to_parts(game: Game):
+    """ Maps a game to the binary encodings of its parts, which can be restored with parts_to_game()
+
+    :param game: an instance of model.Game
+    :return: an instance of persistence.GameParts, with a bytes object for each part
+    """
+    return GameParts(_maze_to_bytes(game), players_to_bytes(game),
+                     player_action_to_bytes(game.turns.next_player_action()))
+
+
+def parts_to_game(game_parts):
+    """ Maps the binary encodings of the parts of a game, as created by game_to_parts(), to a game
+
+    :param game_parts: an instance of persistence.GameParts, with a bytes-like object for each part
+    :raises ValueError: if one of the parts is not a binary encoding of a supported format version
+    :return: a Game instance whose state is equal to the encoded one
+    """
+    board, identifier, prepare_delay, previous_shift_location, maze_card_by_id = _bytes_to_board(game_parts.maze)
+    players = _bytes_to_players(game_parts.players, board, maze_card_by_id)
+    board._pieces = [player.piece for player in players]
+    data, offset, _ = _unpack_header(game_parts.turn_state)
+    next_player_id, next_action_index = _TURN_STATE.unpack_from(data, offset)
+    next_action_dto = None
+    if next_action_index != -1:
+        next_action_dto = {PLAYER_ID: next_player_id, ACTION: _ACTIONS[next_action_index]}
+    turns = dto_to_turns(next_action_dto, players=players, prepare_delay=prepare_delay)
+    game = Game(identifier, board=board, players=players, turns=turns)
+    for player in players:
+        player.set_game(game)
+    game.previous_shift_location = previous_shift_location
+    return game
+
+
+def players_to_bytes(game: Game):
+    """ Maps the players of a game to the binary encoding of the players part """
+    return b"".join([_HEADER.pack(MAGIC, FORMAT_VERSION), _PLAYERS.pack(len(game.players))] +
+                    [_player_to_bytes(player) for player in game.players])
+
+
+def player_action_to_bytes(player_action):
+    """ Maps the next action of a game to the binary encoding of the turn state part """
+    if not player_action:
+        turn_state = _TURN_STATE.pack(-1, -1)
+    else:
+        turn_state = _TURN_STATE.pack(player_action.player.identifier, _ACTION_INDEX[player_action.action])
+    return _HEADER.pack(MAGIC, FORMAT_VERSION) + turn_state
+
+
+def _maze_to_bytes(game):
+    board = game.board
+    maze_cards = [board.leftover_card] + board.maze.maze_cards
+    previous = game.previous_shift_location
+    objective = board.objective_maze_card
+    return b"".join([_HEADER.pack(MAGIC, FORMAT_VERSION),
+                     _MAZE.pack(board.maze.maze_size, game.identifier, game.turns.prepare_delay.total_seconds(),
+                                previous.row if previous else -1, previous.column if previous else -1,
+                                objective.identifier if objective else -1),
+                     struct.pack("<{}i".format(len(maze_cards)),
+                                 *[maze_card.identifier if maze_card else -1 for maze_card in maze_cards]),
+                     bytes(maze_card.out_paths_mask if maze_card else 0 for maze_card in maze_cards),
+                     bytes(maze_card.rotation // 90 if maze_card else 0 for maze_card in maze_cards)])
+
+
+def _bytes_to_board(maze_part):
+    """ Decodes the maze part. Returns the board, game identifier, prepare delay, previous shift location,
+    and a dictionary of the maze cards by identifier """
+    data, offset, _ = _unpack_header(maze_part)
+    maze_size, identifier, prepare_delay, previous_row, previous_column, objective_id = _MAZE.unpack_from(data, offset)
+    offset += _MAZE.size
+    num_cards = maze_size * maze_size + 1
+    identifiers = struct.unpack_from("<{}i".format(num_cards), data, offset)
+    offset += 4 * num_cards
+    masks = data[offset:offset + num_cards]
+    rotations = data[offset + num_cards:offset + 2 * num_cards]
+
+    maze_card_by_id = {}
+    maze_cards = []
+    for maze_card_id, mask, rotation in zip(identifiers, masks, rotations):
+        maze_card = None
+        if maze_card_id != -1:
+            maze_card = MazeCard(maze_card_id, _OUT_PATHS_BY_MASK[mask], rotation * 90)
+            maze_card_by_id[maze_card_id] = maze_card
+        maze_cards.append(maze_card)
+    maze = Maze(maze_size=maze_size)
+    for location, maze_card in zip(maze.maze_locations, maze_cards[1:]):
+        maze[location] = maze_card
+    board = Board(maze, maze_cards[0], objective_maze_card=maze_card_by_id.get(objective_id))
+    previous_shift_location = BoardLocation(previous_row, previous_column) if previous_row != -1 else None
+    return board, identifier, timedelta(seconds=prepare_delay), previous_shift_location, maze_card_by_id
+
+
+def _bytes_to_players(players_part, board, maze_card_by_id):
+    data, offset, format_version = _unpack_header(players_part)
+    num_players, = _PLAYERS.unpack_from(data, offset)
+    offset += _PLAYERS.size
+    players = []
+    for _ in range(num_players):
+        player_dto, offset = _bytes_to_player_dto(data, offset, format_version)
+        players.append(dto_to_player(player_dto, board, maze_card_by_id))
+    return players
+
+
+def _unpack_header(part):
+    """ Validates the header of a part.
+    Returns the part as memoryview, the offset after the header, and the format version """
+    data = memoryview(part)
+    magic, format_version = _HEADER.unpack_from(data, 0)
+    if magic != MAGIC or format_version not in _READABLE_VERSIONS:
+        raise ValueError("Unsupported game state encoding {!r}, version {}".format(magic, format_version))
+    return data, _HEADER.size, format_version
+
+
+def _player_to_bytes(player):
+    player_dto = player_to_dto(player)
+    is_bot = player_dto.get(IS_BOT, False)
+    parts = [_PLAYER.pack(player_dto[ID], player_dto[MAZE_CARD_ID], player_dto[SCORE], player_dto[PIECE_INDEX],
+                          int(is_bot)),
+             _string_to_bytes(player_dto[PLAYER_NAME])]
+    if is_bot:
+        parts.extend(_string_to_bytes(player_dto[field]) for field in _BOT_FIELDS)
+    return b"".join(parts)
+
+
+def _bytes_to_player_dto(data, offset, format_version):
+    """ Decodes the record of a player into a DTO as created by persistence.player_to_dto.
+    Returns the DTO and the offset after the record """
+    identifier, maze_card_id, score, piece_index, is_bot = _PLAYER.unpack_from(data, offset)
+    offset += _PLAYER.size
+    player_name, offset = _bytes_to_string(data, offset, format_version)
+    player_dto = {ID: identifier, MAZE_CARD_ID: maze_card_id, SCORE: score, PIECE_INDEX: piece_index,
+                  PLAYER_NAME: player_name}
+    if is_bot:
+        player_dto[IS_BOT] = True
+        for field in _BOT_FIELDS:
+            player_dto[field], offset = _bytes_to_string(data, offset, format_version)
+    return player_dto, offset
+
+
+def _string_to_bytes(value):
+    if value is None:
+        return _STRING_HEADER.pack(0, 0)
+    encoded = value.encode("utf-8")
+    return _STRING_HEADER.pack(1, len(encoded)) + encoded
+
+
+def _bytes_to_string(data, offset, format_version):
+    if format_version == 2:
+        length, = _STRING_LENGTH_V2.unpack_from(data, offset)
+        offset += _STRING_LENGTH_V2.size
+        if length == _NONE_LENGTH_V2:
+            return None, offset
+    else:
+        is_present, length = _STRING_HEADER.unpack_from(data, offset)
+        offset += _STRING_HEADER.size
+        if not is_present:
+            return None, offset
+    return str(data[offset:offset + length], "utf-8"), offset + length
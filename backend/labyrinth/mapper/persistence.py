@@ -2,8 +2,10 @@
 
 These DTOs are structures built of dictionaries and lists,
 which in turn are automatically translatable to structured text (JSON or XML)
+
+A game can be mapped to one DTO, or to the DTOs of its separately persisted parts, see GameParts.
 """
-import copy
+from collections import namedtuple
 from datetime import timedelta
 
 from labyrinth.model.game import Game, Board, Piece, MazeCard, Turns, Maze, Player, PlayerAction
@@ -15,6 +17,12 @@ from labyrinth.mapper.constants import (ID, OBJECTIVE, PLAYERS, MAZE, NEXT_ACTIO
                                         TURN_PREPARE_DELAY, LIBRARY_PATH, PLAYER_NAME)
 
 
+GameParts = namedtuple("GameParts", ["maze", "players", "turn_state"])
+GameParts.__doc__ = """ The parts of a game which are persisted and updated separately.
+maze contains the game identifier, the turn prepare delay, the maze cards, the objective and
+the previous shift location. players contains the players with their pieces, turn_state the next action. """
+
+
 def game_to_dto(game: Game):
     """Maps a game to a DTO, which can be restored with dto_to_game()
 
@@ -23,7 +31,7 @@ def game_to_dto(game: Game):
     """
     return {
         ID: game.identifier,
-        PLAYERS: [_player_to_dto(player) for player in game.players],
+        PLAYERS: [player_to_dto(player) for player in game.players],
         MAZE: _board_to_dto(game.board),
         NEXT_ACTION: _turns_to_next_action_dto(game.turns),
         TURN_PREPARE_DELAY: _timedelta_to_dto_(game.turns.prepare_delay),
@@ -32,11 +40,34 @@ def game_to_dto(game: Game):
     }
 
 
-def replace_turn_state(game_dto, player_action):
-    """ Returns a copy of the given game DTO, with the next action replaced by the given PlayerAction """
-    result = copy.deepcopy(game_dto)
-    result[NEXT_ACTION] = _player_action_to_dto(player_action)
-    return result
+def game_to_parts(game: Game):
+    """ Maps a game to the DTOs of its parts, which can be restored with parts_to_game()
+
+    :param game: an instance of model.Game
+    :return: an instance of GameParts
+    """
+    return GameParts({ID: game.identifier,
+                      MAZE: _board_to_dto(game.board),
+                      TURN_PREPARE_DELAY: _timedelta_to_dto_(game.turns.prepare_delay),
+                      OBJECTIVE: _objective_to_dto(game.board.objective_maze_card),
+                      PREVIOUS_SHIFT_LOCATION: _board_location_to_dto(game.previous_shift_location)},
+                     players_to_dto(game),
+                     _turns_to_next_action_dto(game.turns))
+
+
+def parts_to_game(game_parts):
+    """ Maps the DTOs of the parts of a game, as created by game_to_parts(), to a game """
+    return dto_to_game({**game_parts.maze, PLAYERS: game_parts.players, NEXT_ACTION: game_parts.turn_state})
+
+
+def players_to_dto(game: Game):
+    """ Maps the players of a game to the DTO of the players part """
+    return [player_to_dto(player) for player in game.players]
+
+
+def player_action_to_dto(player_action):
+    """ Maps the next action of a game to the DTO of the turn state part """
+    return _player_action_to_dto(player_action)
 
 
 def dto_to_game(game_dto):
@@ -50,11 +81,11 @@ def dto_to_game(game_dto):
     maze, leftover_card, maze_card_by_id = _dto_to_maze_cards_and_dictionary(game_dto[MAZE])
     objective_maze_card = maze_card_by_id[game_dto[OBJECTIVE]]
     board = Board(maze, leftover_card, objective_maze_card=objective_maze_card)
-    players = [_dto_to_player(player_dto, board, maze_card_by_id)
+    players = [dto_to_player(player_dto, board, maze_card_by_id)
                for player_dto in game_dto[PLAYERS]]
     board._pieces = [player.piece for player in players]
     turns_prepare_delay = _dto_to_timedelta(game_dto[TURN_PREPARE_DELAY])
-    turns = _dto_to_turns(game_dto[NEXT_ACTION], players=players, prepare_delay=turns_prepare_delay)
+    turns = dto_to_turns(game_dto[NEXT_ACTION], players=players, prepare_delay=turns_prepare_delay)
     identifier = game_dto[ID]
     game = Game(identifier, board=board, players=players, turns=turns)
     for player in players:
@@ -82,7 +113,7 @@ def _dto_to_timedelta(delta_dto):
     return timedelta(seconds=float(delta_dto))
 
 
-def _player_to_dto(player: Player):
+def player_to_dto(player: Player):
     """Maps a player to a DTO
 
     :param piece: an instance of model.Piece
@@ -121,11 +152,11 @@ def _timedelta_to_dto_(delta: timedelta):
     return str(delta.total_seconds())
 
 
-def _dto_to_player(player_dto, board, maze_card_dict):
+def dto_to_player(player_dto, board, maze_card_dict):
     """ maps a DTO to a Player
 
     :param player: a dictionary representing game's (sub-)structure of a player,
-    as created by _player_to_dto
+    as created by player_to_dto
     :param maze_card_dict: a dictionary between maze card ids and MazeCard instances
     :raises KeyError: if maze_card_dict does not contain the maze card or objective id in player_dto
     :return: a Player instance
@@ -161,7 +192,7 @@ def _dto_to_maze_card(maze_card_dto):
     return maze_card, location
 
 
-def _dto_to_turns(next_action_dto, players, prepare_delay=timedelta(0)):
+def dto_to_turns(next_action_dto, players, prepare_delay=timedelta(0)):
     """ Maps a DTO to a Turns instance
 
     :param next_action_dto: a dictionary representing the next player action,
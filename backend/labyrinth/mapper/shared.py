@@ -61,8 +61,7 @@ def _maze_cards_to_dto(board):
     :return: a list of DTOs.
     """
     dto = [_maze_card_to_dto(board.leftover_card, None)]
-    for location in board.maze.maze_locations:
-        maze_card = board.maze[location]
+    for location, maze_card in zip(board.maze.maze_locations, board.maze.maze_cards):
         dto.append(_maze_card_to_dto(maze_card, location))
     return dto
 
@@ -5,7 +5,6 @@ The computation of player actions is performed by external shared libraries (Lib
 Clients should use the factory method create_bot() to create a Bot instance.
 """
 
-import copy
 import functools
 import glob
 from datetime import timedelta
@@ -21,7 +20,7 @@ import requests
 import labyrinth.mapper.api
 import labyrinth.model.external_library as extlib
 from labyrinth.model import exceptions
-from .reachable import Graph
+from labyrinth.model import timers
 from .game import Player, Turns, PlayerAction
 
 
@@ -59,11 +58,12 @@ def get_available_computation_methods():
     return [extract_basename(filename) for filename in filenames]
 
 
-class Bot(Player, Thread):
+class Bot(Player):
     """ This class represents an artifical player.
 
-    If the bot is requested to make its action, it starts a thread for time keeping,
-    and a thread for letting the compute method determine the next shift and move action.
+    If the bot is requested to make its action, it starts a thread for letting the compute method
+    determine the next shift and move action. The subsequent steps are scheduled with the TimerScheduler of the turns,
+    so that no thread is blocked while waiting.
     Computation methods are time-restricted. After the computation timeout, they will be asked to abort.
     They will then receive a short grace period to finish their current work and return a result.
     :param library_binding_factory: a method creating a LibraryBinding,
@@ -78,8 +78,9 @@ class Bot(Player, Thread):
 
     def __init__(self, library_binding_factory, url_supplier=None, shift_url=None, move_url=None, **kwargs):
         Player.__init__(self, **kwargs)
-        Thread.__init__(self)
         self._library_binding_factory = library_binding_factory
+        self._compute_method = None
+        self._scheduler = timers.default_scheduler()
         self._shift_url = shift_url
         self._move_url = move_url
         self._url_supplier = url_supplier
@@ -89,6 +90,7 @@ class Bot(Player, Thread):
         """ Registers itself in a Turns manager.
         Overwrites superclass method. """
         self._prepare_delay = turns.prepare_delay
+        self._scheduler = turns.scheduler
         turns.add_player(self, turn_callback=self.notify_turn_change)
 
     def set_game(self, game):
@@ -99,23 +101,46 @@ class Bot(Player, Thread):
 
     def notify_turn_change(self, action):
         if action is PlayerAction.PREPARE_SHIFT:
-            self.start()
+            self._start_computation()
+            self._scheduler.schedule(self._computation_time(), self._abort_computation)
 
     def run(self):
-        compute_method = self._library_binding_factory(self._board, self._piece, self._game)
-        compute_method.start()
-        time.sleep(max(self.COMPUTATION_TIMEOUT, self._prepare_delay).total_seconds())
-        compute_method.abort_search()
+        """ Performs all steps of a turn on the calling thread, waiting in between """
+        self._start_computation()
+        time.sleep(self._computation_time().total_seconds())
+        self._compute_method.abort_search()
         time.sleep(self.WAIT_FOR_RESULT.total_seconds())
-        shift_action = compute_method.shift_action
-        move_action = compute_method.move_action
+        move_action = self._post_computed_shift()
+        time.sleep(self._move_idle_time().total_seconds())
+        self._post_move(move_action)
+
+    def _start_computation(self):
+        self._compute_method = self._library_binding_factory(self._board, self._piece, self._game)
+        self._compute_method.start()
+
+    def _abort_computation(self):
+        self._compute_method.abort_search()
+        self._scheduler.schedule(self.WAIT_FOR_RESULT, self._post_shift_and_schedule_move, blocking=True)
+
+    def _post_shift_and_schedule_move(self):
+        move_action = self._post_computed_shift()
+        self._scheduler.schedule(self._move_idle_time(), self._post_move, move_action, blocking=True)
 
+    def _post_computed_shift(self):
+        """ Posts the computed shift action, or a random one if the computation has not finished.
+        Returns the corresponding move action """
+        shift_action = self._compute_method.shift_action
+        move_action = self._compute_method.move_action
         if shift_action is None or move_action is None:
             shift_action, move_action = self.random_actions()
-
         self._post_shift(*shift_action)
-        time.sleep(max(self.MOVE_ACTION_IDLE_TIME, self._prepare_delay).total_seconds())
-        self._post_move(move_action)
+        return move_action
+
+    def _computation_time(self):
+        return max(self.COMPUTATION_TIMEOUT, self._prepare_delay)
+
+    def _move_idle_time(self):
+        return max(self.MOVE_ACTION_IDLE_TIME, self._prepare_delay)
 
     @property
     def shift_url(self):
@@ -148,16 +173,17 @@ class Bot(Player, Thread):
                 self._move_url = self._url_supplier.get_move_url(self._game.identifier, self.identifier)
 
     def random_actions(self):
-        board = copy.deepcopy(self._board)
-        piece = next(piece for piece in board.pieces if piece.maze_card.identifier == self._piece.maze_card.identifier)
-        shift_location = choice(tuple(self._game.get_enabled_shift_locations()))
-        shift_rotation = choice([0, 90, 180, 270])
-        board.shift(shift_location, shift_rotation)
-        piece_location = board.maze.maze_card_location(piece.maze_card)
-        reachable_locations = Graph(board.maze).reachable_locations(piece_location)
-        shift_action = (shift_location, shift_rotation)
-        move_action = choice(tuple(reachable_locations))
-        return shift_action, move_action
+        """ Draws a random enabled shift action with a distinct rotation of the leftover card,
+        and then a random location which is reachable after this shift """
+        board = self._board.clone()
+        piece = board.pieces[self._board.pieces.index(self._piece)]
+        shift_location = choice(sorted(self._game.get_enabled_shift_locations(),
+                                       key=lambda location: (location.row, location.column)))
+        rotation = choice(board.leftover_card.distinct_rotations())
+        outcome = board.shift_outcome(piece, shift_location, rotation)
+        move_location = choice(sorted(outcome.reachable_locations,
+                                      key=lambda location: (location.row, location.column)))
+        return (shift_location, rotation), move_location
 
 
 class LibraryBinding(Thread, extlib.ExternalLibraryBinding):
@@ -11,7 +11,8 @@ __all__ = ["InvalidStateException",
            "GameFullException",
            "InvalidSizeException",
            "InvalidComputeMethodException",
-           "GameNotFoundException"]
+           "GameNotFoundException",
+           "VersionConflictException"]
 
 
 class LabyrinthDomainException(Exception):
@@ -81,3 +82,8 @@ class InvalidComputeMethodException(LabyrinthDomainException):
 class GameNotFoundException(LabyrinthDomainException):
     """ If a game could not be found in the game repository """
     pass
+
+
+class VersionConflictException(LabyrinthDomainException):
+    """ If a game could not be updated, because it has been updated concurrently since it was loaded """
+    pass
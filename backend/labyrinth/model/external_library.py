@@ -51,8 +51,6 @@ class STATUS(ctypes.Structure):
 class ExternalLibraryBinding:
     """ Binds to an external library at given path.
     Translates the game datastructures to the ctypes structures and back """
-    _OUT_PATH_TO_BIT = {"N": 1, "E": 2, "S": 4, "W": 8}
-
     _ERROR_LOCATION = BoardLocation(-1, -1)
 
     def __init__(self, path, board, piece, previous_shift_location=None):
@@ -88,10 +86,7 @@ class ExternalLibraryBinding:
     @staticmethod
     def _create_node(maze_card):
         """ creates a NODE from a MazeCard """
-        out_paths = 0
-        for out_path in maze_card.out_paths:
-            out_paths |= ExternalLibraryBinding._OUT_PATH_TO_BIT[out_path]
-        return NODE(maze_card.identifier, out_paths, maze_card.rotation)
+        return NODE(maze_card.identifier, maze_card.out_paths_mask, maze_card.rotation)
 
     @staticmethod
     def _create_graph(board):
@@ -101,7 +96,7 @@ class ExternalLibraryBinding:
         """
         maze = board.maze
         extent = maze.maze_size
-        node_array = [ExternalLibraryBinding._create_node(maze[location]) for location in maze.maze_locations]
+        node_array = [ExternalLibraryBinding._create_node(maze_card) for maze_card in maze.maze_cards]
         node_array.append(ExternalLibraryBinding._create_node(board.leftover_card))
         nodes = (NODE * len(node_array))(*node_array)
         return GRAPH(extent=extent, num_nodes=len(node_array), nodes=nodes)
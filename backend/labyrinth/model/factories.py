@@ -1,12 +1,20 @@
 """ This module contains methods to build and initialize games, boards and mazes.
 
 There are two ways of creating these objects: either by fully specifying all details, or
-by randomly generating layouts based with certain restrictions, based on the original game. """
+by randomly generating layouts based with certain restrictions, based on the original game.
+
+Randomly generated boards can be drawn from a BoardPool, which generates boards of configured maze sizes
+in the background. The pool is disabled by default, see configure_board_pool(). """
+from collections import deque, namedtuple
+import logging
 import random
 import math
+import threading
 from labyrinth.model.game import MazeCard, Maze, BoardLocation, Board, Game, Turns
 from labyrinth.model.exceptions import InvalidSizeException
 
+_LOGGER = logging.getLogger(__name__)
+
 
 class MazeCardFactory:
     """ Constructs maze cards, taking care of unique ids """
@@ -136,11 +144,149 @@ def _even(number):
 def create_board(maze_size=7):
     """ Creates a board with a given maze size.
 
-    The maze and the leftover obey the generalized original-game layout and maze card distribution rules """
+    The maze and the leftover obey the generalized original-game layout and maze card distribution rules.
+    If a board pool is configured for this size, the board is taken from the pool. """
+    if _BOARD_POOL is not None:
+        board = _BOARD_POOL.take(maze_size)
+        if board is not None:
+            return board
+    return _generate_board(maze_size)
+
+
+def _generate_board(maze_size):
     maze, leftover = create_maze_and_leftover(size=maze_size)
     return Board(maze=maze, leftover_card=leftover)
 
 
+BoardPoolMetrics = namedtuple("BoardPoolMetrics", ["hits", "misses", "generated", "pooled"])
+BoardPoolMetrics.__doc__ = """ Snapshot of the metrics of a BoardPool.
+hits and misses count the requests for a board of a pooled size, depending on whether the pool had a board available.
+generated is the number of boards generated by the background thread.
+pooled maps each maze size to the number of boards currently available. """
+
+
+class BoardPool:
+    """ A bounded pool of randomly generated boards, one per maze size.
+    A daemon thread refills the pool whenever a board has been taken.
+    Each board is handed out at most once.
+
+    :param capacities: maps maze sizes to the maximum number of pooled boards of this size
+    :param generate: a function generating a board for a given maze size, defaults to a random board
+    """
+
+    def __init__(self, capacities, generate=_generate_board):
+        for maze_size in capacities:
+            if _even(maze_size) or not 2 < maze_size < 32:
+                raise InvalidSizeException("Requested size {} is not an odd number between 2 and 32.".format(maze_size))
+        self._capacities = {maze_size: capacity for maze_size, capacity in capacities.items() if capacity > 0}
+        self._generate = generate
+        self._boards = {maze_size: deque() for maze_size in self._capacities}
+        self._condition = threading.Condition()
+        self._thread = None
+        self._stopped = False
+        self._hits = 0
+        self._misses = 0
+        self._generated = 0
+
+    def start(self):
+        """ Starts the background thread, which fills the pool """
+        with self._condition:
+            self._stopped = False
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._loop, name="board-pool", daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        """ Stops the background thread after the board it is currently generating """
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+
+    def take(self, maze_size):
+        """ Removes a board of the given size from the pool and returns it.
+        Returns None if the size is not pooled, or if there is currently no board available """
+        with self._condition:
+            boards = self._boards.get(maze_size)
+            if boards is None:
+                return None
+            if not boards:
+                self._misses += 1
+                return None
+            self._hits += 1
+            board = boards.popleft()
+            self._condition.notify_all()
+            return board
+
+    def fill(self):
+        """ Fills the pool on the calling thread, until all sizes have reached their capacity """
+        maze_size = self._next_size()
+        while maze_size is not None:
+            self._add(maze_size)
+            maze_size = self._next_size()
+
+    def metrics(self):
+        """ Returns a snapshot of the metrics as BoardPoolMetrics """
+        with self._condition:
+            pooled = {maze_size: len(boards) for maze_size, boards in self._boards.items()}
+            return BoardPoolMetrics(self._hits, self._misses, self._generated, pooled)
+
+    def _next_size(self):
+        """ Returns the size with the fewest pooled boards relative to its capacity, or None if the pool is full """
+        with self._condition:
+            return self._emptiest_size()
+
+    def _emptiest_size(self):
+        missing = [(len(self._boards[maze_size]) / capacity, maze_size)
+                   for maze_size, capacity in self._capacities.items()
+                   if len(self._boards[maze_size]) < capacity]
+        return min(missing)[1] if missing else None
+
+    def _add(self, maze_size):
+        board = self._generate(maze_size)
+        with self._condition:
+            self._boards[maze_size].append(board)
+            self._generated += 1
+
+    def _loop(self):
+        while True:
+            with self._condition:
+                while not self._stopped and self._emptiest_size() is None:
+                    self._condition.wait()
+                if self._stopped:
+                    return
+                maze_size = self._emptiest_size()
+            try:
+                self._add(maze_size)
+            except Exception:
+                _LOGGER.exception("Generating a board of size %s failed, stopping the board pool", maze_size)
+                self.stop()
+
+
+_BOARD_POOL = None
+
+
+def configure_board_pool(capacities):
+    """ Configures the pool create_board() draws from, and starts filling it in the background.
+    An existing pool is stopped and replaced.
+
+    :param capacities: maps maze sizes to the number of pooled boards. If empty or None, the pool is disabled.
+    :return: the new BoardPool, or None
+    """
+    global _BOARD_POOL
+    if _BOARD_POOL is not None:
+        _BOARD_POOL.stop()
+        _BOARD_POOL = None
+    if capacities:
+        _BOARD_POOL = BoardPool(capacities)
+        _BOARD_POOL.start()
+    return _BOARD_POOL
+
+
+def board_pool():
+    """ Returns the pool create_board() draws from, or None if the pool is disabled """
+    return _BOARD_POOL
+
+
 def create_game(maze_size=7, game_id=0, with_delay=True):
     """ Creates a game instance with a random board. Player and piece initialization
     is not done here. """
@@ -14,42 +14,77 @@ A Piece represents a player, with a unique ID,
 a reference to a maze card the piece is currently positioned on and an objective.
 BoardLocation is a wrapper for a row and a column. If both are positive, the position is in the maze.
 """
+from collections import namedtuple
+from contextlib import contextmanager
 import itertools
-from threading import Thread
-import time
 import random
 from datetime import timedelta
 
 from labyrinth.model import exceptions
 from labyrinth.model import out_paths_dict
-from labyrinth.model.reachable import Graph
+from labyrinth.model import timers
+from labyrinth.model import zobrist
+from labyrinth.model.reachable import ComponentIndex, Graph
 
 
 class BoardLocation:
     """ A board location, defined by the row and the column.
     The location does now know the extent of the maze.
-    """
 
-    _HASH_MAX = 31
+    BoardLocations are immutable values. Locations with a row and a column between 0 and 31,
+    i.e. all locations of mazes up to the maximum size, are interned: BoardLocation(row, column)
+    returns the same instance for equal arguments, so that they are compared by identity in most cases.
+    The hash is free of collisions for rows and columns below 2**28.
+    """
 
-    def __init__(self, row: int, column: int):
-        self.row = row
-        self.column = column
+    __slots__ = ("row", "column", "_hash")
+
+    _INTERNED_SIZE = 32
+    _interned = [None] * (_INTERNED_SIZE * _INTERNED_SIZE)
+
+    def __new__(cls, row: int, column: int):
+        interned_size = cls._INTERNED_SIZE
+        if 0 <= row < interned_size and 0 <= column < interned_size:
+            index = row * interned_size + column
+            location = cls._interned[index]
+            if location is None:
+                location = cls._interned[index] = cls._create(row, column)
+            return location
+        return cls._create(row, column)
+
+    @classmethod
+    def _create(cls, row, column):
+        location = object.__new__(cls)
+        object.__setattr__(location, "row", row)
+        object.__setattr__(location, "column", column)
+        object.__setattr__(location, "_hash", hash((row << 32) + column))
+        return location
 
     def add(self, row_delta: int, column_delta: int):
         """ Returns a new BoardLocation by adding the deltas to the current location """
         return BoardLocation(self.row + row_delta, self.column + column_delta)
 
-    def __eq__(self, other):
-        return isinstance(self, type(other)) and \
-            self.column == other.column and \
-            self.row == other.row
+    def __setattr__(self, name, value):
+        raise AttributeError("BoardLocation is immutable")
 
-    def __ne__(self, other):
-        return not self.__eq__(other)
+    def __delattr__(self, name):
+        raise AttributeError("BoardLocation is immutable")
+
+    def __eq__(self, other):
+        return self is other or (type(other) is BoardLocation and
+                                 self.column == other.column and self.row == other.row)
 
     def __hash__(self):
-        return self.row*self._HASH_MAX + self.column
+        return self._hash
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        return BoardLocation, (self.row, self.column)
 
     def __str__(self):
         return f"({self.row}, {self.column})"
@@ -73,11 +108,15 @@ class MazeCard:
     T_JUNCT = "NES"
     CROSS = "NESW"
 
-    _DIRECTIONS_BY_OUT_PATHS_ROTATED = out_paths_dict.dictionary
+    _ROTATED_MASKS = out_paths_dict.rotated_masks
+    _DIRECTIONS_BY_MASK = out_paths_dict.directions_by_mask
+    _BIT_BY_DIRECTION = out_paths_dict.bit_by_direction
 
     def __init__(self, identifier=0, out_paths=STRAIGHT, rotation=0):
         self._out_paths = out_paths
+        self._out_paths_mask = out_paths_dict.out_paths_to_mask(out_paths)
         self._rotation = rotation
+        self._rotated_mask = self._ROTATED_MASKS[self._out_paths_mask][(rotation // 90) % 4]
         self._id = identifier
 
     @property
@@ -96,12 +135,33 @@ class MazeCard:
         if value % 90 != 0:
             raise exceptions.InvalidRotationException("Rotation {} is not divisible by 90".format(value))
         self._rotation = value % 360
+        self._rotated_mask = self._ROTATED_MASKS[self._out_paths_mask][self._rotation // 90]
 
     @property
     def out_paths(self):
         """ Getter of read-only out_paths """
         return self._out_paths
 
+    @property
+    def out_paths_mask(self):
+        """ Getter of the out_paths as a 4-bit mask, with the bits N=1, E=2, S=4, W=8 """
+        return self._out_paths_mask
+
+    @property
+    def rotated_out_paths_mask(self):
+        """ Getter of the out paths as a 4-bit mask, taking the rotation into account """
+        return self._rotated_mask
+
+    def clone(self):
+        """ Returns a new MazeCard with the same identifier, out_paths, and rotation """
+        clone = MazeCard.__new__(MazeCard)
+        clone.__dict__ = self.__dict__.copy()
+        return clone
+
+    def distinct_rotations(self):
+        """ Returns the rotations which result in different outgoing connections, e.g. (0, 90) for a straight line """
+        return out_paths_dict.distinct_rotations[self._out_paths_mask]
+
     def has_rotated_out_path(self, direction):
         """ Returns whether there is an outgoing path
         in a given direction, taking the rotation into account.
@@ -109,13 +169,13 @@ class MazeCard:
         :param direction: a tuple describing the direction of the path, e.g. (-1, 0) for north
         :return: true iff there is a path in the given direction
         """
-        return direction in self._DIRECTIONS_BY_OUT_PATHS_ROTATED[(self._out_paths, self._rotation)]
+        return bool(self._rotated_mask & self._BIT_BY_DIRECTION[direction])
 
     def rotated_out_paths(self):
         """ Returns an iterable over all directions
         with outgoing paths, taking rotation into account.
         """
-        return self._DIRECTIONS_BY_OUT_PATHS_ROTATED[(self._out_paths, self._rotation)]
+        return self._DIRECTIONS_BY_MASK[self._rotated_mask]
 
     def __eq__(self, other):
         return isinstance(self, type(other)) and \
@@ -148,25 +208,211 @@ class Piece:
         self.maze_card = maze_card
 
 
+class MazeGeometry:
+    """ Precomputed, immutable tables of a maze of a given size.
+
+    Locations are numbered row by row, i.e. the location (row, column) has the index row * maze_size + column.
+    The tables contain all locations in this order, the neighbors of each index, and for each border location
+    the slice of indices which is shifted when a maze card is inserted at this location and the opposing location.
+    Moreover, they contain the shift locations, the start locations of the pieces in the corners,
+    the indices which are not start locations (i.e. the locations of possible objectives),
+    and for each index the shift locations whose shift moves the maze card at this index.
+    There is only one instance per maze size, it is shared by all mazes and boards of this size.
+    Use MazeGeometry.of(maze_size) to retrieve it. The tables must not be modified.
+    """
+
+    _INSTANCES = {}
+
+    def __init__(self, maze_size):
+        self.maze_size = maze_size
+        self.locations = tuple(BoardLocation(row, column) for row in range(maze_size) for column in range(maze_size))
+        self.neighbors = tuple(tuple(self._neighbors(location)) for location in self.locations)
+        self.shift_lines = {location: self._shift_line(location) for location in self.locations
+                            if location.row in (0, maze_size - 1) or location.column in (0, maze_size - 1)}
+        self.opposing_border_locations = {location: self._opposing_border_location(location)
+                                          for location in self.shift_lines}
+        last = maze_size - 1
+        self.shift_locations = frozenset(self.locations[index] for position in range(1, maze_size, 2)
+                                         for index in (position, position * maze_size,
+                                                       last * maze_size + position, position * maze_size + last))
+        self.start_locations = (self.locations[0], self.locations[last],
+                                self.locations[last * maze_size + last], self.locations[last * maze_size])
+        self.objective_indices = tuple(index for index, location in enumerate(self.locations)
+                                       if location not in self.start_locations)
+        self.shift_locations_by_index = self._shift_locations_by_index()
+
+    @classmethod
+    def of(cls, maze_size):
+        """ Returns the shared instance for the given maze size """
+        geometry = cls._INSTANCES.get(maze_size)
+        if geometry is None:
+            geometry = cls._INSTANCES.setdefault(maze_size, cls(maze_size))
+        return geometry
+
+    def _neighbors(self, location):
+        """ Yields tuples (out_path_bit, mirrored_bit, index) of all neighbors inside the maze.
+        The first bit is the out path leading to the neighbor, the second one the out path of the neighbor leading back.
+        """
+        bit_by_direction = out_paths_dict.bit_by_direction
+        for direction in [(-1, 0), (0, 1), (1, 0), (0, -1)]:
+            row, column = location.row + direction[0], location.column + direction[1]
+            if 0 <= row < self.maze_size and 0 <= column < self.maze_size:
+                mirrored = (-direction[0], -direction[1])
+                yield bit_by_direction[direction], bit_by_direction[mirrored], row * self.maze_size + column
+
+    def _opposing_border_location(self, location):
+        """ Mirrors a border location along the row, if it is in the first or last row, otherwise along the column """
+        limit = self.maze_size - 1
+        if location.row in (0, limit):
+            return self.locations[(limit - location.row) * self.maze_size + location.column]
+        return self.locations[location.row * self.maze_size + limit - location.column]
+
+    def _shift_locations_by_index(self):
+        """ For each index, determines the frozenset of shift locations whose line contains the index """
+        shift_locations_by_index = [[] for _ in self.locations]
+        indices = range(len(self.locations))
+        for shift_location in self.shift_locations:
+            for index in indices[self.shift_lines[shift_location]]:
+                shift_locations_by_index[index].append(shift_location)
+        return tuple(frozenset(shift_locations) for shift_locations in shift_locations_by_index)
+
+    def _shift_line(self, location):
+        """ Returns the slice of indices from the given border location to the opposite border.
+        Determines the direction in the same order of precedence as it was done for corners before. """
+        size = self.maze_size
+        if location.row == size - 1:
+            step = -size
+        elif location.row == 0:
+            step = size
+        elif location.column == size - 1:
+            step = -1
+        else:
+            step = 1
+        start = location.row * size + location.column
+        stop = start + step * size
+        return slice(start, stop if stop >= 0 else None, step)
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        return MazeGeometry.of, (self.maze_size,)
+
+
 class Maze:
     """ Represent the state of the maze.
-    The state is maintained in a 2-d array of MazeCard instances.
+    The state is maintained in a flat list of MazeCard instances, in the order of maze_locations.
+    Index computations are supported by the shared MazeGeometry of the maze size.
+
+    Each change of the maze increments its version. Derived data, such as the connected components and the
+    Zobrist hash, is cached for the current version, and updated incrementally by changes while it is current.
+    Hence, maze cards must not be rotated while they are part of the maze.
+    The index of each maze card is maintained in a dictionary by identifier, so that maze cards can be located
+    in constant time.
     """
 
     def __init__(self, maze_size=7):
         self._maze_size = maze_size
-        self._maze_locations = [BoardLocation(row, column) for row in range(maze_size) for column in range(maze_size)]
-        self._maze_cards = [[None for _ in range(maze_size)] for _ in range(maze_size)]
+        self._geometry = MazeGeometry.of(maze_size)
+        self._maze_cards = [None] * (maze_size * maze_size)
+        self._index_by_identifier = {}
+        self._version = 0
+        self._component_index = None
+        self._component_index_version = None
+        self._zobrist_hash = 0
+        self._zobrist_hash_version = None
 
     @property
     def maze_size(self):
         """ Getter for maze_size """
         return self._maze_size
 
+    @property
+    def geometry(self):
+        """ Getter for the shared MazeGeometry of this maze's size """
+        return self._geometry
+
+    @property
+    def maze_cards(self):
+        """ Returns all MazeCards of this maze, in the order of maze_locations.
+        The returned list must not be modified. """
+        return self._maze_cards
+
+    @property
+    def version(self):
+        """ Getter for version, which is incremented on every change of the maze """
+        return self._version
+
+    def component_index(self):
+        """ Returns a ComponentIndex of the current state of the maze.
+        It is computed lazily and cached until the maze changes. """
+        if self._component_index_version != self._version:
+            self._component_index = ComponentIndex(self)
+            self._component_index_version = self._version
+        return self._component_index
+
+    def zobrist_hash(self):
+        """ Returns the Zobrist hash of the maze cards with their locations and rotations.
+        It is computed lazily, and then updated with each change of the maze. """
+        if self._zobrist_hash_version != self._version:
+            self._zobrist_hash = self._compute_zobrist_hash()
+            self._zobrist_hash_version = self._version
+        return self._zobrist_hash
+
+    def _compute_zobrist_hash(self):
+        zobrist_hash = 0
+        for index, maze_card in enumerate(self._maze_cards):
+            if maze_card is not None:
+                zobrist_hash ^= zobrist.maze_card_key(maze_card.identifier, maze_card.rotation, index)
+        return zobrist_hash
+
+    def clone(self):
+        """ Returns a copy of this maze with cloned maze cards.
+        If the component index is current, it is copied as well. """
+        clone = Maze.__new__(Maze)
+        clone._maze_size = self._maze_size
+        clone._geometry = self._geometry
+        clone._maze_cards = [maze_card.clone() if maze_card is not None else None for maze_card in self._maze_cards]
+        clone._index_by_identifier = dict(self._index_by_identifier)
+        clone._version = self._version
+        clone._component_index = None
+        clone._component_index_version = None
+        if self._component_index_version == self._version:
+            clone._component_index = self._component_index.clone(clone)
+            clone._component_index_version = self._version
+        clone._zobrist_hash = self._zobrist_hash
+        clone._zobrist_hash_version = self._zobrist_hash_version
+        return clone
+
+    @contextmanager
+    def temporary_changes(self):
+        """ Context for a series of changes which are all reverted before the context is left,
+        e.g. shifts followed by unshifts in reverse order.
+
+        The component index and the Zobrist hash are not updated during these changes, unless they are requested.
+        When leaving the context, the values which were current on entering become current again,
+        without any recomputation.
+        """
+        component_index = self._component_index
+        component_index_is_current = self._component_index_version == self._version
+        zobrist_hash = self._zobrist_hash
+        zobrist_hash_is_current = self._zobrist_hash_version == self._version
+        self._component_index_version = None
+        self._zobrist_hash_version = None
+        try:
+            yield self
+        finally:
+            if component_index_is_current:
+                self._component_index = component_index
+                self._component_index_version = self._version
+            if zobrist_hash_is_current:
+                self._zobrist_hash = zobrist_hash
+                self._zobrist_hash_version = self._version
+
     @property
     def maze_locations(self):
         """ Returns all BoardLocations of this maze """
-        return self._maze_locations
+        return self._geometry.locations
 
     def __getitem__(self, location):
         """ Retrieves the maze card at a given location
@@ -175,8 +421,7 @@ class Maze:
         :raises InvalidLocationException: if location is outside of the board
         :return: the MazeCard instance
         """
-        self._validate_location(location)
-        return self._maze_cards[location.row][location.column]
+        return self._maze_cards[self._index(location)]
 
     def __setitem__(self, location, maze_card):
         """ Sets the maze card at a given location
@@ -185,99 +430,176 @@ class Maze:
         :raises InvalidLocationException: if location is outside of the board
         :param maze_card: the maze card to set
         """
-        self._validate_location(location)
-        self._maze_cards[location.row][location.column] = maze_card
+        index = self._index(location)
+        zobrist_hash_is_current = self._zobrist_hash_version == self._version
+        replaced = self._maze_cards[index]
+        if replaced is not None and self._index_by_identifier.get(replaced.identifier) == index:
+            del self._index_by_identifier[replaced.identifier]
+        self._maze_cards[index] = maze_card
+        if maze_card is not None:
+            self._index_by_identifier[maze_card.identifier] = index
+        self._version += 1
+        if zobrist_hash_is_current:
+            self._update_zobrist_hash([replaced], [maze_card], [index])
+            self._zobrist_hash_version = self._version
 
     def maze_card_location(self, maze_card):
         """ Returns the BoardLocation of the given MazeCard,
         or None if the card is not in the maze """
-        for location in self.maze_locations:
-            if self[location] == maze_card:
-                return location
-        return None
+        index = self.maze_card_index(maze_card)
+        return self._geometry.locations[index] if index is not None else None
+
+    def maze_card_index(self, maze_card):
+        """ Returns the index of the given MazeCard in maze_cards,
+        or None if the card is not in the maze """
+        if maze_card is None:
+            return None
+        index = self._index_by_identifier.get(maze_card.identifier)
+        if index is None or self._maze_cards[index] != maze_card:
+            return None
+        return index
 
     def shift(self, location, inserted_maze_card):
         """ Performs a shifting action on the maze
 
+        The maze cards of the shifted line are rotated in place.
         :param location: the location of the inserted maze card
         :param inserted_maze_card: the maze card to insert
         :raises InvalidShiftLocationException: for invalid shift location
         :return: the pushed out maze card
         """
         self._validate_shift_location(location)
-        direction = self._determine_shift_direction(location)
-        shift_line_locations = []
-        current_location = location
-        while current_location is not None:
-            shift_line_locations.append(current_location)
-            current_location = self._neighbor(current_location, direction)
-        pushed_out = self[shift_line_locations[-1]]
-        self._shift_all(shift_line_locations)
-        self[shift_line_locations[0]] = inserted_maze_card
+        shift_line = self._shift_line(location)
+        line_cards = self._maze_cards[shift_line]
+        pushed_out = line_cards.pop()
+        line_cards.insert(0, inserted_maze_card)
+        self._replace_line(shift_line, line_cards, pushed_out, -1)
         return pushed_out
 
-    def _shift_all(self, shift_locations):
-        """ Shifts the maze cards along the given locations """
-        for source, target in reversed(list(zip(shift_locations, shift_locations[1:]))):
-            self[target] = self[source]
+    def unshift(self, location, pushed_out_maze_card):
+        """ Reverts a shifting action on the maze
 
-    def _determine_shift_direction(self, shift_location):
-        """ Returns the direction to shift to for a given location
+        :param location: the location of the inserted maze card, as given to shift()
+        :param pushed_out_maze_card: the maze card returned by shift()
+        :raises InvalidShiftLocationException: for invalid shift location
+        :return: the maze card which was inserted by shift()
+        """
+        self._validate_shift_location(location)
+        shift_line = self._shift_line(location)
+        line_cards = self._maze_cards[shift_line]
+        inserted = line_cards.pop(0)
+        line_cards.append(pushed_out_maze_card)
+        self._replace_line(shift_line, line_cards, inserted, 0)
+        return inserted
+
+    def _replace_line(self, shift_line, line_cards, removed_maze_card, removed_position):
+        """ Writes the maze cards of a shifted line, and keeps the index of maze cards,
+        the component index and the Zobrist hash up to date.
+
+        :param shift_line: the slice of indices of the line
+        :param line_cards: the new maze cards of the line
+        :param removed_maze_card: the maze card which is no longer part of the maze
+        :param removed_position: the position in the line where the removed maze card was located
+        """
+        component_index_is_current = self._component_index_version == self._version
+        zobrist_hash_is_current = self._zobrist_hash_version == self._version
+        maze_cards = self._maze_cards
+        indices = range(len(maze_cards))[shift_line]
+        if zobrist_hash_is_current:
+            self._update_zobrist_hash(maze_cards[shift_line], line_cards, indices)
+        maze_cards[shift_line] = line_cards
+        index_by_identifier = self._index_by_identifier
+        if removed_maze_card is not None and \
+                index_by_identifier.get(removed_maze_card.identifier) == indices[removed_position]:
+            del index_by_identifier[removed_maze_card.identifier]
+        for maze_card, index in zip(line_cards, indices):
+            if maze_card is not None:
+                index_by_identifier[maze_card.identifier] = index
+        self._version += 1
+        if component_index_is_current:
+            self._component_index.update(self._geometry.locations[shift_line])
+            self._component_index_version = self._version
+        if zobrist_hash_is_current:
+            self._zobrist_hash_version = self._version
+
+    def _update_zobrist_hash(self, old_line_cards, new_line_cards, indices):
+        """ Replaces the keys of the old maze cards of a line by the keys of the new maze cards """
+        zobrist_hash = self._zobrist_hash
+        maze_card_key = zobrist.maze_card_key
+        for old_maze_card, new_maze_card, index in zip(old_line_cards, new_line_cards, indices):
+            if old_maze_card is not None:
+                zobrist_hash ^= maze_card_key(old_maze_card.identifier, old_maze_card.rotation, index)
+            if new_maze_card is not None:
+                zobrist_hash ^= maze_card_key(new_maze_card.identifier, new_maze_card.rotation, index)
+        self._zobrist_hash = zobrist_hash
+
+    def _shift_line(self, shift_location):
+        """ Returns the slice of indices to shift for a given location
 
         :param shift_location: the location of the pushed in maze card
         :raises InvalidShiftLocationException: if the location is not on the border
-        :return: the direction as a tuple
-        """
-        if shift_location.row == self._maze_size - 1:
-            return (-1, 0)
-        if shift_location.row == 0:
-            return (1, 0)
-        if shift_location.column == self._maze_size - 1:
-            return (0, -1)
-        if shift_location.column == 0:
-            return (0, 1)
-        raise exceptions.InvalidShiftLocationException(
-            "Location {} is not shiftable (not on border)".format(str(shift_location)))
-
-    def _neighbor(self, location, direction):
-        """ Determines the neighbor of a location, if possible.
-
-        :param location: the location the neighbor is requested for
-        :param direction: a tuple describing the position of the requested neighbor,
-        relative to the given location, e.g. (-1, 0) for the northern neighbor
-        :return: a new location in the given direction,
-        or None, if the location is outside of the maze's extent
-        """
-        new_location = location.add(*direction)
-        if not self.is_inside(new_location):
-            new_location = None
-        return new_location
+        :return: a slice of indices, starting at the given location
+        """
+        try:
+            return self._geometry.shift_lines[shift_location]
+        except KeyError:
+            raise exceptions.InvalidShiftLocationException(
+                "Location {} is not shiftable (not on border)".format(str(shift_location)))
 
     def is_inside(self, location):
         """ Determines if the given location is inside the maze """
-        return location.row >= 0 and \
-            location.column >= 0 and \
-            location.row < self._maze_size and \
-            location.column < self._maze_size
+        return 0 <= location.row < self._maze_size and 0 <= location.column < self._maze_size
+
+    def _index(self, location):
+        """ Returns the index of the location in the flat list of maze cards.
+
+        :raises InvalidLocationException: if location is outside of the board """
+        row, column, size = location.row, location.column, self._maze_size
+        if 0 <= row < size and 0 <= column < size:
+            return row * size + column
+        raise exceptions.InvalidLocationException("Location {} is outside of the maze.".format(str(location)))
 
     def _validate_location(self, location):
-        if not self.is_inside(location):
-            raise exceptions.InvalidLocationException("Location {} is outside of the maze.".format(str(location)))
+        self._index(location)
 
     def _validate_shift_location(self, location):
         self._validate_location(location)
 
 
+ShiftUndoToken = namedtuple("ShiftUndoToken", ["shift_location", "leftover_rotation", "moved_pieces"])
+ShiftUndoToken.__doc__ = """ Returned by Board.shift(), holds the state which is required to revert the shift.
+The pushed out maze card is not part of the token, as it is the leftover card until the shift is reverted. """
+
+
+ShiftOutcome = namedtuple("ShiftOutcome", ["shift_location", "rotation", "reachable_locations", "reaches_objective",
+                                           "objective_location"])
+ShiftOutcome.__doc__ = """ Result of Board.evaluate_shifts() for one shift action.
+reachable_locations is the frozenset of BoardLocations the piece can move to after the shift,
+reaches_objective is True iff the objective is one of them.
+objective_location is the location of the objective after the shift, or None if it is the leftover card. """
+
+
+LegalAction = namedtuple("LegalAction", ["shift_location", "rotation", "move_location"])
+LegalAction.__doc__ = """ An action of a player, as generated by Board.legal_actions() """
+
+
 class Board:
     """
     The board state of a game of labyrinth, including the maze, the pieces, and the objective
+
+    New objectives are drawn with the random number generator rng. If it is None, the random module is used.
+    It can be set to a seeded instance of random.Random for reproducible games.
     """
-    def __init__(self, maze=None, leftover_card=None, objective_maze_card=None):
+
+    _OBJECTIVE_DRAWS = 64
+
+    def __init__(self, maze=None, leftover_card=None, objective_maze_card=None, rng=None):
         self._pieces = []
+        self._rng = rng
         if not maze:
             maze = Maze()
         self._maze = maze
-        self._shift_locations = self._generate_shift_locations()
+        self._shift_locations = maze.geometry.shift_locations
         if not leftover_card:
             leftover_card = MazeCard()
         self._leftover_card = leftover_card
@@ -310,6 +632,53 @@ class Board:
         """ Getter for shift_locations """
         return self._shift_locations
 
+    @property
+    def rng(self):
+        """ Getter for the random number generator which draws new objectives, None for the random module """
+        return self._rng
+
+    @rng.setter
+    def rng(self, value):
+        """ Setter for the random number generator which draws new objectives, None for the random module """
+        self._rng = value
+
+    def clone(self):
+        """ Returns a copy of this board, which can be altered without affecting this board.
+
+        Maze cards, the leftover card and the pieces are cloned, the pieces of the clone are in the same order
+        and reference the corresponding cloned maze cards. Immutable state, such as the shift locations, is shared.
+        The random number generator is shared as well.
+        """
+        clone = Board.__new__(Board)
+        clone._rng = self._rng
+        clone._maze = self._maze.clone()
+        clone._shift_locations = self._shift_locations
+        clone._leftover_card = self._leftover_card.clone()
+
+        def cloned_maze_card(maze_card):
+            if maze_card is self._leftover_card:
+                return clone._leftover_card
+            location = self._maze.maze_card_location(maze_card)
+            return clone._maze[location] if location is not None else maze_card
+
+        clone._pieces = [Piece(piece.piece_index, cloned_maze_card(piece.maze_card)) for piece in self._pieces]
+        clone._objective_maze_card = cloned_maze_card(self._objective_maze_card)
+        return clone
+
+    def zobrist_hash(self):
+        """ Returns a 64-bit Zobrist hash of the position on this board.
+        It covers the maze cards with their locations and rotations, the leftover card with its rotation,
+        the locations of the pieces, and the location of the objective.
+        The hash of the maze is maintained by the maze, the keys of the remaining components are added in O(#pieces).
+        """
+        maze = self._maze
+        leftover = self._leftover_card
+        zobrist_hash = maze.zobrist_hash() ^ zobrist.leftover_key(leftover.identifier, leftover.rotation)
+        zobrist_hash ^= zobrist.objective_key(maze.maze_card_index(self._objective_maze_card))
+        for piece in self._pieces:
+            zobrist_hash ^= zobrist.piece_key(piece.piece_index, maze.maze_card_index(piece.maze_card))
+        return zobrist_hash
+
     def clear_pieces(self):
         """ Removes all pieces currently on the board """
         self._pieces.clear()
@@ -335,11 +704,7 @@ class Board:
         piece.maze_card = self._maze[start_location]
 
     def _start_locations(self):
-        maze_size = self.maze.maze_size
-        return [BoardLocation(0, 0),
-                BoardLocation(0, maze_size - 1),
-                BoardLocation(maze_size - 1, maze_size - 1),
-                BoardLocation(maze_size - 1, 0)]
+        return self._maze.geometry.start_locations
 
     def _next_free_piece_index(self):
         current_piece_indices = set(map(lambda piece: piece.piece_index, self._pieces))
@@ -355,13 +720,122 @@ class Board:
         self._pieces.remove(piece)
 
     def shift(self, shift_location: BoardLocation, leftover_rotation: int):
-        """ Performs a shifting action """
+        """ Performs a shifting action.
+
+        :return: a ShiftUndoToken, which can be passed to unshift() to revert this shift.
+        """
         self._validate_shift_location(shift_location)
-        self._leftover_card.rotation = leftover_rotation
         pushed_card = self._leftover_card
-        self._leftover_card = self._maze.shift(shift_location, self._leftover_card)
-        for card_piece in self._find_pieces_by_maze_card(self._leftover_card):
+        previous_rotation = pushed_card.rotation
+        pushed_card.rotation = leftover_rotation
+        self._leftover_card = self._maze.shift(shift_location, pushed_card)
+        moved_pieces = self._find_pieces_by_maze_card(self._leftover_card)
+        for card_piece in moved_pieces:
             card_piece.maze_card = pushed_card
+        return ShiftUndoToken(shift_location, previous_rotation, moved_pieces)
+
+    def unshift(self, token):
+        """ Reverts the last shift, restoring maze, leftover card, its rotation, and the locations of the pieces.
+        Shifts have to be reverted in the reverse order in which they were performed,
+        and pieces must not have moved in between.
+
+        :param token: the ShiftUndoToken returned by shift()
+        """
+        pushed_out_card = self._leftover_card
+        inserted_card = self._maze.unshift(token.shift_location, pushed_out_card)
+        inserted_card.rotation = token.leftover_rotation
+        self._leftover_card = inserted_card
+        for card_piece in token.moved_pieces:
+            card_piece.maze_card = pushed_out_card
+
+    def evaluate_shifts(self, piece, shift_locations=None):
+        """ Determines for each given shift location and each rotation of the leftover card,
+        where the piece could move to after this shift, without altering the board.
+
+        :param piece: the piece to move after the shift
+        :param shift_locations: an iterable of shift locations, defaults to all shift locations of the board
+        :raises InvalidShiftLocationException: if one of the shift locations is invalid
+        :return: a list of ShiftOutcome, ordered by shift location and rotation, see iter_shift_outcomes()
+        """
+        return list(self.iter_shift_outcomes(piece, shift_locations))
+
+    def iter_shift_outcomes(self, piece, shift_locations=None):
+        """ Lazily evaluates the shift actions of evaluate_shifts(), one ShiftOutcome at a time.
+
+        Rotations which result in the same outgoing connections of the leftover card are only evaluated once,
+        with the smallest of these rotations.
+        Each shift is performed and reverted before its outcome is yielded, so the board is unaltered
+        whenever the caller receives an outcome. It must not be altered until the iteration is finished, though.
+        Only the component of the piece is determined, with a BFS, as relabeling the components of the maze
+        twice per shift action is considerably slower.
+        """
+        if shift_locations is None:
+            shift_locations = self._shift_locations
+        rotations = self._leftover_card.distinct_rotations()
+        graph = Graph(self._maze)
+        reachable_by_maze = {}
+        for shift_location in sorted(shift_locations, key=lambda location: (location.row, location.column)):
+            for rotation in rotations:
+                yield self._evaluate_shift(piece, shift_location, rotation, graph, reachable_by_maze)
+
+    def shift_outcome(self, piece, shift_location, rotation):
+        """ Evaluates a single shift action, without altering the board, see iter_shift_outcomes().
+
+        :param piece: the piece to move after the shift
+        :param shift_location: the location to insert the leftover card at
+        :param rotation: the rotation of the leftover card
+        :raises InvalidShiftLocationException: if the shift location is invalid
+        :return: a ShiftOutcome
+        """
+        return self._evaluate_shift(piece, shift_location, rotation, Graph(self._maze), {})
+
+    def _evaluate_shift(self, piece, shift_location, rotation, graph, reachable_by_maze):
+        """ Performs and reverts a shift, and determines the reachable locations of the piece in between.
+        Only the shifted line differs from the current maze, so two shift actions result in the same maze
+        iff the out paths along this line are equal. The reachable locations are shared between these actions
+        with reachable_by_maze, keyed by the location of the piece and the out paths of the line. """
+        maze = self._maze
+        with maze.temporary_changes():
+            token = self.shift(shift_location, rotation)
+            piece_location = maze.maze_card_location(piece.maze_card)
+            key = (piece_location, self._shifted_line_masks(shift_location))
+            reachable_locations = reachable_by_maze.get(key)
+            if reachable_locations is None:
+                reachable_locations = frozenset(graph.reachable_locations(piece_location))
+                reachable_by_maze[key] = reachable_locations
+            objective_location = maze.maze_card_location(self._objective_maze_card)
+            self.unshift(token)
+        return ShiftOutcome(shift_location, rotation, reachable_locations,
+                            objective_location in reachable_locations, objective_location)
+
+    def _shifted_line_masks(self, shift_location):
+        """ Returns the first index and the rotated out paths masks of the line of the shift location,
+        in the order of the indices, so that both shift locations of a line yield comparable keys """
+        size = self._maze.maze_size
+        shift_line = self._maze.geometry.shift_lines[shift_location]
+        if abs(shift_line.step) == size:
+            first = shift_line.start % size
+            line_cards = self._maze.maze_cards[first::size]
+        else:
+            first = shift_line.start - shift_line.start % size
+            line_cards = self._maze.maze_cards[first:first + size]
+        return first, tuple(maze_card.rotated_out_paths_mask for maze_card in line_cards)
+
+    def legal_actions(self, piece, shift_locations=None):
+        """ Lazily generates all distinct actions of a piece, i.e. combinations of a shift action
+        and a reachable location after this shift.
+
+        The shift actions are those of iter_shift_outcomes(), so equivalent rotations of the leftover card
+        are omitted. The reachable locations are determined once per resulting maze, see iter_shift_outcomes().
+
+        :param piece: the piece to move after the shift
+        :param shift_locations: an iterable of shift locations, defaults to all shift locations of the board
+        :return: a generator of LegalActions, ordered by shift location, rotation and move location
+        """
+        for outcome in self.iter_shift_outcomes(piece, shift_locations):
+            for move_location in sorted(outcome.reachable_locations,
+                                        key=lambda location: (location.row, location.column)):
+                yield LegalAction(outcome.shift_location, outcome.rotation, move_location)
 
     def move(self, piece, target_location):
         """ Performs a move action. Returns True iff objective was reached. """
@@ -376,17 +850,13 @@ class Board:
 
     def opposing_border_location(self, border_location):
         """ Returns the location directly opposite of the given location on the border """
-        row, column = border_location.row, border_location.column
-        limit = self.maze.maze_size - 1
-        borders = {0, limit}
-        if row in borders:
-            return BoardLocation(limit - row, column)
-        if column in borders:
-            return BoardLocation(row, limit - column)
-        raise exceptions.InvalidStateException("Location {} is not on the border".format(border_location))
+        opposing_location = self._maze.geometry.opposing_border_locations.get(border_location)
+        if opposing_location is None:
+            raise exceptions.InvalidStateException("Location {} is not on the border".format(border_location))
+        return opposing_location
 
     def _validate_move_location(self, piece_location, target_location):
-        if not Graph(self._maze).is_reachable(piece_location, target_location):
+        if not self._maze.component_index().is_reachable(piece_location, target_location):
             raise exceptions.MoveUnreachableException("Locations {} and {} are not connected".format(
                 piece_location, target_location))
 
@@ -395,16 +865,6 @@ class Board:
             raise exceptions.InvalidShiftLocationException(
                 "Location {} is not shiftable (fixed maze cards)".format(str(location)))
 
-    def _generate_shift_locations(self):
-        maze_size = self.maze.maze_size
-        shift_locations = []
-        for position in range(1, maze_size, 2):
-            shift_locations.append(BoardLocation(0, position))
-            shift_locations.append(BoardLocation(position, 0))
-            shift_locations.append(BoardLocation(maze_size - 1, position))
-            shift_locations.append(BoardLocation(position, maze_size - 1))
-        return frozenset(shift_locations)
-
     def _find_pieces_by_maze_card(self, maze_card):
         """ Finds pieces whose maze_card field matches the given maze card
 
@@ -413,14 +873,29 @@ class Board:
         return [piece for piece in self._pieces if piece.maze_card is maze_card]
 
     def _find_new_objective_maze_card(self):
-        """ Finds a random maze card not occupied by a player's piece """
-        start_locations = self._start_locations()
-        possible_locations = [location for location in self._maze.maze_locations if location not in start_locations]
-        maze_cards = set([self._maze[location]
-                          for location in possible_locations] + [self._leftover_card])
-        for piece in self._pieces:
-            maze_cards.discard(piece.maze_card)
-        return random.choice(tuple(maze_cards))
+        """ Finds a random maze card not occupied by a player's piece.
+
+        The objective is drawn uniformly from the leftover card and the maze cards which are not on a start location.
+        The candidate locations are precomputed by the maze geometry. A drawn candidate which is occupied
+        by a piece is rejected, and another one is drawn. As there are at most four pieces, the expected number
+        of draws is constant. If no candidate is found after _OBJECTIVE_DRAWS draws, all candidates are scanned.
+        """
+        rng = self._rng if self._rng is not None else random
+        candidate_indices = self._maze.geometry.objective_indices
+        maze_cards = self._maze.maze_cards
+        occupied_cards = {piece.maze_card for piece in self._pieces}
+        num_candidates = len(candidate_indices) + 1
+        for _ in range(self._OBJECTIVE_DRAWS):
+            position = rng.randrange(num_candidates)
+            if position < len(candidate_indices):
+                maze_card = maze_cards[candidate_indices[position]]
+            else:
+                maze_card = self._leftover_card
+            if maze_card is not None and maze_card not in occupied_cards:
+                return maze_card
+        candidates = [maze_cards[index] for index in candidate_indices] + [self._leftover_card]
+        return rng.choice([maze_card for maze_card in candidates
+                           if maze_card is not None and maze_card not in occupied_cards])
 
 
 class Player:
@@ -484,7 +959,8 @@ class Player:
 
 class PlayerAction:
     """ This class represent the action of a specific player.
-    This class should only be used inside of Turns """
+    Turns does not store instances of this class. They describe the next action to mappers and listeners,
+    and are accepted by Turns to set the next action. """
 
     MOVE_ACTION = "MOVE"
     SHIFT_ACTION = "SHIFT"
@@ -542,60 +1018,100 @@ class Turns:
     """ This class contains the turn progression.
 
     It manages player's turns and the correct order of their actions.
+
+    Each player occupies a slot, in the order in which they were added. Each turn of a player consists of
+    four phases: PREPARE_SHIFT, SHIFT, PREPARE_MOVE, and MOVE. The state of the progression is a single integer,
+    slot * 4 + phase, so that transitions and checks are constant-time integer operations.
+    PlayerAction instances are only created by next_player_action(), for callers outside of the model.
+
+    The transitions after the prepare delay are scheduled with a TimerScheduler, which defaults to the
+    scheduler shared by the process. A pending transition is cancelled if the state changes in the meantime,
+    e.g. because the player is removed. If the game is shared between threads, set a lock with
+    guard_transitions(), which is held while a delayed transition is performed.
     """
 
-    def __init__(self, prepare_delay=timedelta(0), players=None, next_action=None):
+    _PREPARE_SHIFT, _SHIFT, _PREPARE_MOVE, _MOVE = range(4)
+    _PHASES = (PlayerAction.PREPARE_SHIFT, PlayerAction.SHIFT_ACTION,
+               PlayerAction.PREPARE_MOVE, PlayerAction.MOVE_ACTION)
+    _PHASE_BY_ACTION = {action: phase for phase, action in enumerate(_PHASES)}
+    _PERFORMABLE_PHASES = {PlayerAction.SHIFT_ACTION: _SHIFT, PlayerAction.MOVE_ACTION: _MOVE}
+
+    def __init__(self, prepare_delay=timedelta(0), players=None, next_action=None, scheduler=None):
         self._turn_changed_listeners = []
-        self._turn_states = []
         self._prepare_delay = prepare_delay
+        self._scheduler = scheduler or timers.default_scheduler()
+        self._pending_transition = None
+        self._transition_guard = None
         self.init(players)
-        self._next = self._turn_states.index(next_action) if next_action else 0
+        self._next = self._state_of(next_action) if next_action else 0
         if self._next_action_is_prepare() and not self._prepare_delay:
             self._next += 1
 
+    def clone(self, players):
+        """ Returns a copy of this turn progression for the given players, e.g. for Game.clone().
+
+        The clone has no prepare delay, no turn callbacks and no listeners.
+        If this progression is currently in a preparation phase, the clone continues with the subsequent action.
+        :param players: a list of players, containing a player with the same identifier for each player in this turns
+        """
+        player_by_identifier = {player.identifier: player for player in players}
+        clone = Turns.__new__(Turns)
+        clone._turn_changed_listeners = []
+        clone._prepare_delay = timedelta(0)
+        clone._scheduler = self._scheduler
+        clone._pending_transition = None
+        clone._transition_guard = None
+        clone._players = [player_by_identifier[player.identifier] for player in self._players]
+        clone._turn_callbacks = [None] * len(self._players)
+        clone._slot_by_identifier = dict(self._slot_by_identifier)
+        clone._next = self._next
+        if clone._next_action_is_prepare():
+            clone._next = (clone._next + 1) % (4 * len(clone._players))
+        return clone
+
     def init(self, players=None):
         """ clears turn progression, adds all players """
-        self._turn_states = []
+        self._players = []
+        self._turn_callbacks = []
+        self._slot_by_identifier = {}
+        self._next = 0
         if players:
             for player in players:
                 player.register_in_turns(self)
 
     def _num_players(self):
-        return len(self._turn_states) // 4
+        return len(self._players)
 
     def add_player(self, player, turn_callback=None):
         """ Adds a player to the turn progression, if he is not present already """
-        already_present = any(
-            player_action.player == player
-            for player_action in self._turn_states
-        )
-        if not already_present:
-            self._turn_states.append(PlayerAction(player, PlayerAction.PREPARE_SHIFT, turn_callback))
-            self._turn_states.append(PlayerAction(player, PlayerAction.SHIFT_ACTION, turn_callback))
-            self._turn_states.append(PlayerAction(player, PlayerAction.PREPARE_MOVE, turn_callback))
-            self._turn_states.append(PlayerAction(player, PlayerAction.MOVE_ACTION, turn_callback))
+        if player.identifier not in self._slot_by_identifier:
+            self._slot_by_identifier[player.identifier] = len(self._players)
+            self._players.append(player)
+            self._turn_callbacks.append(turn_callback)
 
     def remove_player(self, player_to_remove):
-        """ Removes all PlayerActions with this player. If it was this player's turn to play, the next
+        """ Removes the slot of this player. If it was this player's turn to play, the next
         Player has to play and listeners have to be notified. """
-        def next_player(state_list):
-            next_player_index = (self._next + 4) % len(state_list)
-            return state_list[next_player_index].player
-
-        old_next_player_action = self.next_player_action()
-        old_player_actions = self._turn_states
-        self._turn_states = [player_action for player_action in self._turn_states
-                             if player_action.player != player_to_remove]
-        if self._turn_states:
-            if old_next_player_action.player == player_to_remove:
-                new_next_player_action = PlayerAction(next_player(old_player_actions), PlayerAction.PREPARE_SHIFT)
-                self.set_next(new_next_player_action)
-            else:
-                self._next = self._turn_states.index(old_next_player_action)
+        removed_slot = self._slot_by_identifier.get(player_to_remove.identifier)
+        if removed_slot is None:
+            return
+        next_slot, phase = divmod(self._next, 4)
+        del self._players[removed_slot]
+        del self._turn_callbacks[removed_slot]
+        self._slot_by_identifier = {player.identifier: slot for slot, player in enumerate(self._players)}
+        if not self._players:
+            self.cancel_pending_transition()
+            self._next = 0
+        elif next_slot == removed_slot:
+            self.set_next(index=4 * (removed_slot % len(self._players)) + self._PREPARE_SHIFT)
+        else:
+            if next_slot > removed_slot:
+                next_slot -= 1
+            self._next = 4 * next_slot + phase
 
     def start(self):
         """ Starts the progression, informs player if necessary """
-        if self._turn_states:
+        if self._players:
             self.set_next(index=0)
 
     def is_action_possible(self, player, action):
@@ -605,8 +1121,9 @@ class Turns:
         :param action: one of PlayerAction.MOVE_ACTION and PlayerAction.SHIFT_ACTION
         :return: true, iff the action is to be performed by the player
         """
-        return (action is PlayerAction.MOVE_ACTION or action is PlayerAction.SHIFT_ACTION) and \
-            self.next_player_action() == PlayerAction(player, action)
+        phase = self._PERFORMABLE_PHASES.get(action)
+        slot = self._slot_by_identifier.get(player.identifier)
+        return phase is not None and slot is not None and self._next == 4 * slot + phase
 
     def perform_action(self, player, action):
         """Method to call when a player performed the given action.
@@ -623,44 +1140,104 @@ class Turns:
         self.set_next()
 
     def _next_action_is_prepare(self):
-        return self.next_player_action() and self.next_player_action().is_prepare()
+        return bool(self._players) and self._next % 2 == 0
+
+    def _state_of(self, player_action):
+        """ Returns the state of the given PlayerAction.
+        :raises ValueError: if the player is not part of the progression """
+        slot = self._slot_by_identifier.get(player_action.player.identifier)
+        if slot is None:
+            raise ValueError("Player {} is not part of the turn progression".format(player_action.player.identifier))
+        return 4 * slot + self._PHASE_BY_ACTION[player_action.action]
 
     def set_next(self, player_action=None, index=None):
-        assert self._turn_states
+        """ Sets the next state of the progression, and notifies callbacks and listeners
+
+        :param player_action: a PlayerAction, the next expected action
+        :param index: the next state as integer, i.e. 4 * slot of the player + phase
+        If neither is given, the progression advances by one state.
+        """
+        assert self._players
+        self.cancel_pending_transition()
         if player_action:
-            next_index = self._turn_states.index(player_action)
+            next_index = self._state_of(player_action)
         elif index is not None:
             next_index = index
         else:
-            next_index = (self._next + 1) % len(self._turn_states)
+            next_index = (self._next + 1) % (4 * len(self._players))
         self._next = next_index
-        if self.next_player_action().is_prepare():
+        if self._next_action_is_prepare():
             if self._prepare_delay:
                 self._notify_turn_changed_listeners()
-                Thread(target=self._delay_next_state, args=[self.next_player_action()]).start()
+                self._pending_transition = self._scheduler.schedule(self._prepare_delay, self._delay_next_state,
+                                                                    self._state_key(), blocking=True)
             else:
                 self.set_next()
         else:
             self._notify_turn_changed_listeners()
 
-    def _delay_next_state(self, next_player_action):
-        time.sleep(self._prepare_delay.total_seconds())
-        # check that state was not changed, e.g. due to removed player
-        if next_player_action == self.next_player_action():
-            self.set_next()
+    def _state_key(self):
+        """ Identifies the current state independently of slots, which change when players are removed """
+        if not self._players:
+            return None
+        return self._players[self._next // 4].identifier, self._next % 4
+
+    def _delay_next_state(self, state_key):
+        guard = self._transition_guard
+        if guard is not None:
+            guard.acquire()
+        try:
+            # check that state was not changed, e.g. due to removed player
+            if state_key == self._state_key():
+                self._pending_transition = None
+                self.set_next()
+        finally:
+            if guard is not None:
+                guard.release()
+
+    def guard_transitions(self, guard):
+        """ Sets a lock which is held while a delayed transition is performed,
+        e.g. the lock of a game which is shared by the requests of a GameCache.
+
+        :param guard: an object with methods acquire() and release(), or None
+        """
+        self._transition_guard = guard
+
+    def cancel_pending_transition(self):
+        """ Cancels the delayed transition after the prepare delay, if there is one """
+        if self._pending_transition is not None:
+            self._pending_transition.cancel()
+            self._pending_transition = None
+
+    def next_player(self):
+        """ Returns the player who has to perform the next action, or None if there are no players """
+        if not self._players:
+            return None
+        return self._players[self._next // 4]
+
+    def next_action(self):
+        """ Returns the next action, one of the constants of PlayerAction, or None if there are no players """
+        if not self._players:
+            return None
+        return self._PHASES[self._next % 4]
 
     def next_player_action(self):
         """ Returns the next PlayerAction in the turn progression """
-        try:
-            return self._turn_states[self._next]
-        except IndexError:
+        if not self._players:
             return None
+        slot, phase = divmod(self._next, 4)
+        return PlayerAction(self._players[slot], self._PHASES[phase], self._turn_callbacks[slot])
 
     @property
     def prepare_delay(self):
         """ Getter of prepare_delay """
         return self._prepare_delay
 
+    @property
+    def scheduler(self):
+        """ Getter of the TimerScheduler, which performs the delayed transitions """
+        return self._scheduler
+
     def register_turn_changed_listener(self, listener):
         """ Register a listener which is notified whenever the turn changes.
 
@@ -668,9 +1245,10 @@ class Turns:
         self._turn_changed_listeners.append(listener)
 
     def _notify_turn_changed_listeners(self):
-        player_action = self.next_player_action()
-        if player_action and player_action.turn_callback:
-            player_action.turn_callback(player_action.action)
+        if self._players:
+            turn_callback = self._turn_callbacks[self._next // 4]
+            if turn_callback:
+                turn_callback(self._PHASES[self._next % 4])
         for listener in self._turn_changed_listeners:
             listener()
 
@@ -680,12 +1258,16 @@ class Game:
 
     The game is started as soon as the first player is added.
     By default, it creates a turn progression with a delay of one second.
-    To use no delay, or a delay of your choice, provide a Turns instance."""
+    To use no delay, or a delay of your choice, provide a Turns instance.
+
+    The players are indexed by their identifiers. Players added with add_player() are kept in the order of
+    the indices of their pieces, i.e. they occupy the slot of their piece."""
     MAX_PLAYERS = 4
 
     def __init__(self, identifier, board=None, players=None, turns=None):
         self._id = identifier
         self._players = players or []
+        self._player_by_identifier = {player.identifier: player for player in self._players}
         self._board = board or Board()
         self._turns = turns or Turns(prepare_delay=timedelta(milliseconds=800))
         self._turns.register_turn_changed_listener(self._notify_turn_listeners)
@@ -712,25 +1294,55 @@ class Game:
         """ Getter for identifier """
         return self._id
 
+    def clone(self):
+        """ Returns a copy of this game, e.g. to simulate actions without affecting this game.
+
+        The board is cloned with Board.clone(). All players are cloned as instances of Player,
+        with the same identifiers, names and scores, and with the cloned pieces.
+        The turns are cloned with Turns.clone(), the clone has no turn listeners.
+        """
+        board = self._board.clone()
+        piece_by_index = {piece.piece_index: piece for piece in board.pieces}
+        players = []
+        for player in self._players:
+            clone_player = Player(player.identifier, piece=piece_by_index[player.piece.piece_index],
+                                  player_name=player.player_name)
+            clone_player.score = player.score
+            players.append(clone_player)
+        clone = Game(self._id, board=board, players=players, turns=self._turns.clone(players))
+        for player in players:
+            player.set_game(clone)
+        clone.previous_shift_location = self.previous_shift_location
+        return clone
+
+    def zobrist_hash(self):
+        """ Returns a 64-bit Zobrist hash of the position of this game,
+        i.e. the hash of the board combined with the previous shift location """
+        previous_shift_index = None
+        if self.previous_shift_location:
+            previous_shift_index = self._board.maze.maze_size * self.previous_shift_location.row + \
+                self.previous_shift_location.column
+        return self._board.zobrist_hash() ^ zobrist.shift_location_key(previous_shift_index)
+
     def unused_player_id(self):
         """ Returns an identifier which is currently unused
         to set the id of a new player.
         Throws GameFullException if there are no slots left."""
         if len(self._players) >= self.MAX_PLAYERS:
             raise exceptions.GameFullException("Already {} players playing the game.".format(self.MAX_PLAYERS))
-        return max((player.identifier for player in self._players), default=0) + 1
+        return max(self._player_by_identifier, default=0) + 1
 
     def add_player(self, player: Player):
         """ Adds a player to the current game, if he is not already one of the current players.
         Throws GameFullException if there are no slots left. """
         if len(self._players) >= self.MAX_PLAYERS:
             raise exceptions.GameFullException("Already {} players playing the game.".format(self.MAX_PLAYERS))
-        if any(player.identifier == current_player.identifier for current_player in self._players):
+        if player.identifier in self._player_by_identifier:
             return
         player.set_game(self)
         player.register_in_turns(self._turns)
-        self._players.append(player)
-        self._players.sort(key=lambda player: player.piece.piece_index)
+        self._player_by_identifier[player.identifier] = player
+        self._insert_in_slot(player)
         if len(self.players) == 1:
             self._turns.start()
 
@@ -741,10 +1353,18 @@ class Game:
         :return: the Player with the given ID
         :raises PlayerNotFoundException: if no player was found
         """
-        try:
-            return next(player for player in self._players if player.identifier == player_id)
-        except StopIteration:
+        player = self._player_by_identifier.get(player_id)
+        if player is None:
             raise exceptions.PlayerNotFoundException("No matching player for id {} in this game".format(player_id))
+        return player
+
+    def _insert_in_slot(self, player):
+        """ Inserts a player in front of the first player with a higher piece index """
+        piece_index = player.piece.piece_index
+        slot = len(self._players)
+        while slot > 0 and self._players[slot - 1].piece.piece_index > piece_index:
+            slot -= 1
+        self._players.insert(slot, player)
 
     def remove_player(self, player_id):
         """ Removes player by ID.
@@ -756,7 +1376,8 @@ class Game:
         player = self.get_player(player_id)
         self.board.remove_piece(player.piece)
         self.turns.remove_player(player)
-        self.players.remove(player)
+        self._players.remove(player)
+        del self._player_by_identifier[player.identifier]
 
     def restart(self, new_board):
         """ Replaces the current board with a new one and resets the game.
@@ -797,6 +1418,28 @@ class Game:
                 player.score += 1
         self._turns.perform_action(player, PlayerAction.MOVE_ACTION)
 
+    def evaluate_shifts(self, player_id):
+        """ Determines for all enabled shift actions where the player's piece could move to after the shift.
+        The state of the game is not altered.
+
+        :param player_id: the ID of the player
+        :raises PlayerNotFoundException: if player does not exist
+        :return: a list of ShiftOutcome, see Board.evaluate_shifts()
+        """
+        player = self.get_player(player_id)
+        return self._board.evaluate_shifts(player.piece, self.get_enabled_shift_locations())
+
+    def legal_actions(self, player_id):
+        """ Lazily generates all distinct legal actions of a player, honouring the no-pushback rule.
+        The state of the game is not altered.
+
+        :param player_id: the ID of the player
+        :raises PlayerNotFoundException: if player does not exist
+        :return: a generator of LegalActions, see Board.legal_actions()
+        """
+        player = self.get_player(player_id)
+        return self._board.legal_actions(player.piece, self.get_enabled_shift_locations())
+
     def get_enabled_shift_locations(self):
         """ Returns all currently enabled shift locations.
         These are the shift locations of the board, without the shift location of the previous turn
@@ -825,12 +1468,17 @@ class Game:
         :param listener: a method with the parameters game, player and next_action"""
         self._turn_listeners.append(listener)
 
+    def clear_turn_change_listeners(self):
+        """ Removes all listeners registered with register_turn_change_listener(),
+        e.g. before a game which is kept in memory is handed to the listeners of the next request """
+        self._turn_listeners = []
+
     def _notify_turn_listeners(self):
-        next_player_action = self._turns.next_player_action()
+        next_player_action = self._turns.next_player_action() if self._turn_listeners else None
         if next_player_action:
             for listener in self._turn_listeners:
                 listener(game=self, next_player_action=next_player_action)
 
     def next_player(self):
         """ The player who is expected to perform the next action """
-        return self._turns.next_player_action().player
+        return self._turns.next_player()
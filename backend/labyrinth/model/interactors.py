@@ -7,28 +7,52 @@ from datetime import datetime, timedelta
 
 from flask import has_request_context
 from labyrinth.database import DatabaseGateway
+from labyrinth import game_cache
 
 from labyrinth.model import exceptions
 
+UPDATE_ATTEMPTS = 3
+
+
+def retry_on_conflict(operation, attempts=UPDATE_ATTEMPTS):
+    """ Calls an operation which loads, changes and updates a game.
+    If the update fails because the game has been updated concurrently, the operation is called again,
+    so that it is applied to the current state of the game. Returns the result of the operation.
+
+    :param operation: a function without parameters
+    :param attempts: the maximum number of calls, before VersionConflictException is passed on
+    """
+    for _ in range(attempts - 1):
+        try:
+            return operation()
+        except exceptions.VersionConflictException:
+            pass
+    return operation()
+
 
 class PlayerActionInteractor:
     """ Interactor class which handles player actions (shift and move)
 
     Both methods (perform_shift and perform_move) follow the same line:
-    load the game, perform the action, update the game state
+    load the game, perform the action, update the game state.
+    If the game has been updated concurrently, this is retried.
     """
     def __init__(self, game_repository):
         self._game_repository = game_repository
 
     def perform_shift(self, game_id, player_id, shift_location, shift_rotation):
-        game = self._game_repository.find_by_id(game_id)
-        game.shift(player_id, shift_location, shift_rotation)
-        self._game_repository.update(game)
+        def shift():
+            game = self._game_repository.find_by_id(game_id)
+            game.shift(player_id, shift_location, shift_rotation)
+            self._game_repository.update(game)
+        retry_on_conflict(shift)
 
     def perform_move(self, game_id, player_id, move_location):
-        game = self._game_repository.find_by_id(game_id)
-        game.move(player_id, move_location)
-        self._game_repository.update(game)
+        def move():
+            game = self._game_repository.find_by_id(game_id)
+            game.move(player_id, move_location)
+            self._game_repository.update(game)
+        retry_on_conflict(move)
 
 
 class PlayerInteractor:
@@ -37,10 +61,12 @@ class PlayerInteractor:
         self._game_repository = game_repository
 
     def change_name(self, game_id, player_id, new_name):
-        game = self._game_repository.find_by_id(game_id)
-        player = game.get_player(player_id)
-        player.player_name = new_name
-        self._game_repository.update(game)
+        def rename():
+            game = self._game_repository.find_by_id(game_id)
+            player = game.get_player(player_id)
+            player.player_name = new_name
+            self._game_repository.update_players(game)
+        retry_on_conflict(rename)
 
 
 class UpdateOnTurnChangeInteractor:
@@ -54,8 +80,7 @@ class UpdateOnTurnChangeInteractor:
 
     def _update_player_action_async(self, game, next_player_action):
         if not has_request_context():
-            with self._game_repository.managed_gateway() as gateway:
-                gateway.update_turn_state(game.identifier, next_player_action)
+            self._game_repository.update_turn_state(game, next_player_action)
 
 
 class OverduePlayerInteractor:
@@ -72,14 +97,18 @@ class OverduePlayerInteractor:
 
         Checks all currently running games.
         Players are automatically removed if it is their turn to play and
-        they have not performed an action for a certain amount of time. """
+        they have not performed an action for a certain amount of time.
+        Games which have been updated concurrently are skipped, they will be checked again in the next run. """
         threshold = datetime.now() - overdue_timedelta
         games = self._game_repository.find_all_before_action_timestamp(threshold)
         for game in games:
             if game.players:
                 player_id_to_remove = game.next_player().identifier
                 game.remove_player(player_id_to_remove)
-                self._game_repository.update(game)
+                try:
+                    self._game_repository.update(game)
+                except exceptions.VersionConflictException:
+                    continue
                 self._logger.remove_player(player_id_to_remove, game_id=game.identifier,
                                            num_players=len(game.players))
 
@@ -121,11 +150,12 @@ class UnobservedGamesInteractor:
     def remove_unobserved_games(self, unobserved_period=timedelta(hours=1)):
         """ Removes the unobserved games, returns identifiers of removed games """
         threshold = datetime.now() - unobserved_period
-        games = self._game_repository.find_all_before_observed_timestamp(threshold)
-        for game in games:
+        removed_ids = []
+        for game in self._game_repository.find_all_before_observed_timestamp(threshold):
             self._game_repository.remove(game)
             self._log_player_removal(game)
-        return [game.identifier for game in games]
+            removed_ids.append(game.identifier)
+        return removed_ids
 
     def _log_player_removal(self, game):
         for index, player in enumerate(game.players):
@@ -138,34 +168,79 @@ class GameRepository:
     """ Manages retrieval, deletion and updates of games
 
     Provides a domain-directed interface, detached from the intrinsics of the
-    underlying data access. """
-    def __init__(self, data_access):
+    underlying data access.
+
+    If a GameCache is given, games are retrieved from the cache, and are held by the data access
+    until it is released. Updates are written with the data access, or deferred by the cache. """
+    def __init__(self, data_access, cache=None):
         self._data_access = data_access
+        self._cache = cache
 
     def find_by_id(self, game_id, with_timestamps=False):
+        if self._cache is not None:
+            cached = self._cache.find(game_id, self._data_access)
+            if cached is None:
+                raise exceptions.GameNotFoundException
+            if with_timestamps:
+                return cached.game, cached.last_observed_timestamp, cached.player_action_timestamp
+            return cached.game
         game = self._data_access.load_game(game_id, with_timestamps=with_timestamps)
         if game is None:
             raise exceptions.GameNotFoundException
         return game
 
     def find_all_before_action_timestamp(self, timestamp):
-        """ Retrieves games where the action timestamp is older than the given requested timestamp """
-        return self._data_access.load_all_games_before_action_timestamp(timestamp)
+        """ Retrieves games where the action timestamp is older than the given requested timestamp.
+        With a cache, the games are generated one at a time, see GameCache.find_all() """
+        games = self._data_access.load_all_games_before_action_timestamp(timestamp)
+        if self._cache is not None:
+            games = self._cache.find_all(games, self._data_access, game_cache.PLAYER_ACTION_TIMESTAMP, timestamp)
+        return games
 
     def find_all_before_observed_timestamp(self, timestamp):
-        """ Retrieves games where the last-observed timestamp is older than the given requested timestamp """
-        return self._data_access.load_all_games_before_observed_timestamp(timestamp)
+        """ Retrieves games where the last-observed timestamp is older than the given requested timestamp.
+        With a cache, the games are generated one at a time, see GameCache.find_all() """
+        games = self._data_access.load_all_games_before_observed_timestamp(timestamp)
+        if self._cache is not None:
+            games = self._cache.find_all(games, self._data_access, game_cache.LAST_OBSERVED_TIMESTAMP, timestamp)
+        return games
+
+    def add(self, game):
+        """ Inserts a new game """
+        self._data_access.create_game(game, game.identifier)
+        if self._cache is not None:
+            self._cache.add(game, self._data_access)
 
     def update_action_timestamp(self, game, timestamp):
-        self._data_access.update_action_timestamp(game.identifier, timestamp)
+        if not self._set_cached_timestamp(game, game_cache.PLAYER_ACTION_TIMESTAMP, timestamp):
+            self._data_access.update_action_timestamp(game.identifier, timestamp)
 
     def update_observed_timestamp(self, game, timestamp):
-        self._data_access.update_observed_timestamp(game.identifier, timestamp)
+        if not self._set_cached_timestamp(game, game_cache.LAST_OBSERVED_TIMESTAMP, timestamp):
+            self._data_access.update_observed_timestamp(game.identifier, timestamp)
 
     def update(self, game):
-        self._data_access.update_game(game.identifier, game)
+        """ Updates the game. Raises VersionConflictException if it has been updated concurrently since it was loaded.
+        Use retry_on_conflict() to load, change and update a game again in this case. """
+        if not self._defer(game, game_cache.GAME):
+            self._write(game, self._data_access.update_game)
+
+    def update_players(self, game):
+        """ Updates only the players of the game. Raises VersionConflictException like update() """
+        if not self._defer(game, game_cache.GAME):
+            self._write(game, self._data_access.update_players)
+
+    def update_turn_state(self, game, next_player_action):
+        """ Updates only the turn state of the game, after it has changed outside of a request.
+        Hence, it is written with a managed gateway, which overwrites the turn state of the database,
+        see DatabaseGateway.update_turn_state(). """
+        if not self._defer(game, game_cache.TURN_STATE):
+            with self.managed_gateway() as gateway:
+                gateway.update_turn_state(game.identifier, next_player_action)
 
     def remove(self, game):
+        if self._cache is not None:
+            self._cache.remove(game.identifier)
         self._data_access.delete_game(game.identifier)
 
     def register_game_created_listener(self, listener):
@@ -177,3 +252,22 @@ class GameRepository:
         It should only be necessary to retrieve this in non-request contexts.
         """
         return DatabaseGateway(self._data_access.settings)
+
+    def _write(self, game, update):
+        """ Writes the game with the given update method of the data access. On a version conflict, the changed
+        game is abandoned, so its delayed turn transition is cancelled. Otherwise, its turn listeners would run
+        in addition to the ones of the game changed by the retry. A cached game is discarded, so that
+        retry_on_conflict() applies the operation to the game loaded again, instead of the changed instance. """
+        try:
+            update(game.identifier, game)
+        except exceptions.VersionConflictException:
+            game.turns.cancel_pending_transition()
+            if self._cache is not None:
+                self._cache.discard(game)
+            raise
+
+    def _defer(self, game, part):
+        return self._cache is not None and self._cache.defer(game, part)
+
+    def _set_cached_timestamp(self, game, timestamp_name, timestamp):
+        return self._cache is not None and self._cache.set_timestamp(game, timestamp_name, timestamp)
@@ -1,35 +1,56 @@
-""" This module contains a dictionary to speed up the computation of rotated out_paths.
+""" This module contains lookup tables to speed up the computation of rotated out_paths.
 
-The dictionary maps tuples of (out_paths, rotation) to a set of directions.
+Out paths are represented as 4-bit masks, with the bits N=1, E=2, S=4, W=8.
+This is the same encoding as the one of the shared libraries in algolibs.
+
+The tables are
+- bit_by_out_path, mapping each of the letters 'NESW' to its bit,
+- bit_by_direction, mapping a direction tuple (x-direction, y-direction) to its bit,
+- rotated_masks, mapping a mask and a number of clockwise quarter turns (0 to 3) to the rotated mask,
+- directions_by_mask, mapping a mask to the frozenset of its directions,
+- distinct_rotations, mapping a mask to the rotations (in degrees) which result in different rotated masks.
 out_paths is a string over 'NESW', a direction is a tuple (x-direction, y-direction).
 
 The module implements a singleton pattern.
-The dictionary is created when the module is imported for the first time.
+The tables are created when the module is imported for the first time.
 """
 
+bit_by_out_path = {"N": 1, "E": 2, "S": 4, "W": 8}
+
+bit_by_direction = {(-1, 0): 1, (0, 1): 2, (1, 0): 4, (0, -1): 8}
+
+
+def out_paths_to_mask(out_paths):
+    """ Converts a string over 'NESW' to a mask """
+    mask = 0
+    for out_path in out_paths:
+        mask |= bit_by_out_path[out_path]
+    return mask
+
+
+def _generate_rotated_masks():
+    def _rotate(mask, turns):
+        return ((mask << turns) | (mask >> (4 - turns))) & 0b1111
+
+    return tuple(tuple(_rotate(mask, turns) for turns in range(4)) for mask in range(16))
+
 
-def _generate_rotated_out_path_dict():
-    _out_path_by_direction = {(-1, 0): "N", (0, 1): "E", (1, 0): "S", (0, -1): "W"}
+def _generate_directions_by_mask():
+    return tuple(frozenset(direction for direction, bit in bit_by_direction.items() if mask & bit)
+                 for mask in range(16))
 
-    def _has_out_path(direction, rotation, out_paths):
-        out_path = _out_path_by_direction[direction]
-        out_path_index = "NESW".find(out_path)
-        turns = (rotation // 90)
-        rotation_aware_index = (out_path_index - turns + 4) % 4
-        rotated_out_path = "NESW"[rotation_aware_index]
-        return rotated_out_path in out_paths
 
-    def _rotated_directions(out_paths, rotation):
-        for direction in _out_path_by_direction:
-            if _has_out_path(direction, rotation, out_paths):
-                yield direction
+def _generate_distinct_rotations():
+    def _distinct(mask):
+        seen = set()
+        for turns in range(4):
+            if rotated_masks[mask][turns] not in seen:
+                seen.add(rotated_masks[mask][turns])
+                yield turns * 90
 
-    out_path_dict = dict()
-    for out_paths in ["NS", "NE", "NES", "NESW"]:
-        for rotation in [0, 90, 180, 270]:
-            rotated_directions = _rotated_directions(out_paths, rotation)
-            out_path_dict[(out_paths, rotation)] = set(rotated_directions)
-    return out_path_dict
+    return tuple(tuple(_distinct(mask)) for mask in range(16))
 
 
-dictionary = _generate_rotated_out_path_dict()
+rotated_masks = _generate_rotated_masks()
+directions_by_mask = _generate_directions_by_mask()
+distinct_rotations = _generate_distinct_rotations()
@@ -1,6 +1,8 @@
 """ This module deals with graph algorithms performed on the maze,
 
-Currently it only has one class to compute all reachable locations.
+There are three classes to compute all reachable locations, which share a common interface.
+Graph performs a BFS over the maze locations, BitboardGraph performs a flood fill on integer bitboards,
+and ComponentIndex labels all connected components of the maze at once.
 """
 from collections import deque
 
@@ -12,7 +14,6 @@ class Graph:
     """
     def __init__(self, maze):
         self._maze = maze
-        self._reached_locations = {}
 
     def is_reachable(self, source_location, target_location) -> bool:
         """ Performs a BFS in a graph represented by the current maze to
@@ -32,26 +33,224 @@ class Graph:
         :param source: a BoardLocations to start from.
         :return: a set of BoardLocations
         """
-        self._reached_locations = {source}
-        next_elements = deque([source])
+        maze = self._maze
+        locations = maze.maze_locations
+        source_index = maze._index(source)
+        reached_indices = {source_index}
+        next_elements = deque([source_index])
         while next_elements:
             current = next_elements.popleft()
-            for neighbor in self._neighbors(current):
-                if neighbor not in self._reached_locations:
-                    self._reached_locations.add(neighbor)
-                    next_elements.append(neighbor)
-        return self._reached_locations
-
-    def _neighbors(self, location):
-        """ Returns an iterator over valid neighbor BoardLocations
-        of the given BoardLocation, with the current state of the maze """
-        def _mirror(delta_tuple):
-            return (-delta_tuple[0], -delta_tuple[1])
-        maze_card = self._maze[location]
-        for delta in maze_card.rotated_out_paths():
-            location_to_test = location.add(*delta)
-            if location_to_test not in self._reached_locations:
-                if self._maze.is_inside(location_to_test):
-                    card_to_test = self._maze[location_to_test]
-                    if card_to_test.has_rotated_out_path(_mirror(delta)):
-                        yield location_to_test
+            for neighbor in self._neighbors(current, reached_indices):
+                reached_indices.add(neighbor)
+                next_elements.append(neighbor)
+        return {locations[index] for index in reached_indices}
+
+    def _neighbors(self, index, reached_indices):
+        """ Returns an iterator over indices of valid neighbors
+        of the location with the given index, with the current state of the maze """
+        maze_cards = self._maze.maze_cards
+        out_paths = maze_cards[index].rotated_out_paths_mask
+        for out_path, mirrored, neighbor in self._maze.geometry.neighbors[index]:
+            if neighbor not in reached_indices and out_paths & out_path:
+                if maze_cards[neighbor].rotated_out_paths_mask & mirrored:
+                    yield neighbor
+
+
+class BitboardGraph:
+    """ Determines reachable locations with a flood fill on bitboards.
+
+    The maze is encoded as arbitrary-precision integers with one bit per maze location,
+    bit row * maze_size + column. For each of the four directions, there is one bitboard
+    with all locations which are connected to their neighbor in this direction.
+    The flood fill expands the set of reached locations by shifting and masking all of them at once.
+    The bitboards are computed on construction, so an instance has to be discarded when the maze changes.
+    """
+    _NORTH, _EAST, _SOUTH, _WEST = 1, 2, 4, 8
+
+    def __init__(self, maze):
+        self._maze = maze
+        self._size = maze.maze_size
+        self._north, self._east, self._south, self._west = self._create_bitboards()
+
+    def is_reachable(self, source_location, target_location) -> bool:
+        """ Performs a flood fill to verify if the source location and the target location are connected.
+
+        :param source_location: the current BoardLocation
+        :param target_location: the requested BoardLocation
+        :return: True, iff there is a path between the two locations
+        """
+        if not self._maze.is_inside(target_location):
+            return False
+        reached = self._flood_fill(self._bit(source_location))
+        return bool(reached & self._bit(target_location))
+
+    def reachable_locations(self, source):
+        """ Performs a flood fill, returning all reachable BoardLocations.
+
+        :param source: a BoardLocation to start from.
+        :return: a set of BoardLocations
+        """
+        reached = self._flood_fill(self._bit(source))
+        return self._to_locations(reached)
+
+    def _flood_fill(self, reached):
+        size = self._size
+        north, east, south, west = self._north, self._east, self._south, self._west
+        while True:
+            expanded = reached | ((reached & east) << 1) | ((reached & west) >> 1) | \
+                ((reached & south) << size) | ((reached & north) >> size)
+            if expanded == reached:
+                return reached
+            reached = expanded
+
+    def _bit(self, location):
+        return 1 << self._maze._index(location)
+
+    def _to_locations(self, bitboard):
+        maze_locations = self._maze.maze_locations
+        locations = set()
+        while bitboard:
+            lowest = bitboard & -bitboard
+            locations.add(maze_locations[lowest.bit_length() - 1])
+            bitboard ^= lowest
+        return locations
+
+    def _create_bitboards(self):
+        """ Creates one bitboard per direction with all locations having an out path in this direction.
+        Then removes all out paths which are not matched by the neighbor's opposite out path,
+        including those leading out of the maze. """
+        size = self._size
+        north = east = south = west = 0
+        for index, maze_card in enumerate(self._maze.maze_cards):
+            bit = 1 << index
+            mask = maze_card.rotated_out_paths_mask
+            if mask & self._NORTH:
+                north |= bit
+            if mask & self._EAST:
+                east |= bit
+            if mask & self._SOUTH:
+                south |= bit
+            if mask & self._WEST:
+                west |= bit
+        last_column = sum(1 << (row * size + size - 1) for row in range(size))
+        first_column = last_column >> (size - 1)
+        connected_east = east & (west >> 1) & ~last_column
+        connected_west = west & (east << 1) & ~first_column
+        connected_south = south & (north >> size)
+        connected_north = north & (south << size)
+        return connected_north, connected_east, connected_south, connected_west
+
+
+class ComponentIndex:
+    """ Labels the connected components of a maze with a union-find over all maze locations.
+
+    After construction, is_reachable is a comparison of two labels. The set of locations of a component
+    is created at the first call to reachable_locations for this component, and then shared by all subsequent calls.
+    If maze cards are replaced, update() relabels only the components which can be affected by the change.
+    Clients should not create instances themselves, but use Maze.component_index(), which caches the index
+    for the current version of the maze and updates it after a shift.
+    """
+
+    def __init__(self, maze):
+        self._maze = maze
+        size = maze.maze_size
+        self._out_paths = [maze_card.rotated_out_paths_mask for maze_card in maze.maze_cards]
+        self._labels = [0] * (size * size)
+        self._members = {}
+        self._components = {}
+        self._relabel(range(size * size))
+
+    def clone(self, maze):
+        """ Returns a copy of this index for a maze with the same connections, e.g. a clone of the maze.
+        The sets of locations, and the lists of members of each component, are shared with this index.
+        This is safe, because update() replaces them instead of modifying them. """
+        clone = ComponentIndex.__new__(ComponentIndex)
+        clone._maze = maze
+        clone._out_paths = list(self._out_paths)
+        clone._labels = list(self._labels)
+        clone._members = dict(self._members)
+        clone._components = dict(self._components)
+        return clone
+
+    def is_reachable(self, source_location, target_location) -> bool:
+        """ Compares the component labels of the source and the target location.
+
+        :param source_location: the current BoardLocation
+        :param target_location: the requested BoardLocation
+        :return: True, iff there is a path between the two locations
+        """
+        source_label = self._label(source_location)
+        if not self._maze.is_inside(target_location):
+            return False
+        return source_label == self._label(target_location)
+
+    def reachable_locations(self, source):
+        """ Returns all BoardLocations in the component of the given location.
+
+        :param source: a BoardLocation to start from.
+        :return: a frozenset of BoardLocations
+        """
+        label = self._label(source)
+        component = self._components.get(label)
+        if component is None:
+            maze_locations = self._maze.maze_locations
+            component = frozenset(maze_locations[index] for index in self._members[label])
+            self._components[label] = component
+        return component
+
+    def update(self, changed_locations):
+        """ Updates the labels after the maze cards at the given locations have been replaced, e.g. by a shift.
+
+        A changed connection always has one end in a changed location, and the other end in a changed location
+        or one of its neighbors. Therefore, only the components containing one of these locations are relabeled.
+        All other components keep their labels and their sets of locations.
+
+        :param changed_locations: an iterable of BoardLocations whose maze cards have been replaced
+        """
+        maze = self._maze
+        maze_cards = maze.maze_cards
+        neighbors = maze.geometry.neighbors
+        changed = [maze._index(location) for location in changed_locations]
+        for index in changed:
+            self._out_paths[index] = maze_cards[index].rotated_out_paths_mask
+        affected = set(changed)
+        for index in changed:
+            affected.update(neighbor for *_, neighbor in neighbors[index])
+        affected_labels = {self._labels[index] for index in affected}
+        relabeled = []
+        for label in affected_labels:
+            relabeled.extend(self._members.pop(label))
+            self._components.pop(label, None)
+        self._relabel(relabeled)
+
+    def _label(self, location):
+        return self._labels[self._maze._index(location)]
+
+    def _relabel(self, indices):
+        """ Joins all pairs of given locations which are connected in the east or in the south.
+        Sets the root of each location as its label. The given locations must form complete components. """
+        size = self._maze.maze_size
+        out_paths = self._out_paths
+        parents = {index: index for index in indices}
+
+        def find(index):
+            while parents[index] != index:
+                parents[index] = parents[parents[index]]
+                index = parents[index]
+            return index
+
+        def union(first, second):
+            first_root, second_root = find(first), find(second)
+            if first_root != second_root:
+                parents[second_root] = first_root
+
+        for index in parents:
+            mask = out_paths[index]
+            if mask & 2 and index % size < size - 1 and out_paths[index + 1] & 8:
+                union(index, index + 1)
+            if mask & 4 and index + size < size * size and out_paths[index + size] & 1:
+                union(index, index + size)
+        for index in parents:
+            label = find(index)
+            self._labels[index] = label
+            self._members.setdefault(label, []).append(index)
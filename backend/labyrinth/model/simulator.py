@@ -0,0 +1,167 @@
+""" This module plays complete games in-process, e.g. for self-play of bots and for benchmarks.
+
+The games are created with factories.create_game() without prepare delay, so that the turns progress synchronously.
+There are no threads, no sleeps and no HTTP requests involved, hence games are played at full CPU speed.
+
+Each player is controlled by a policy. A policy is an object with a method choose_actions(game, player),
+which returns the shift action and the move location of the player, in the format ((location, rotation), location).
+It must not alter the game. RandomPolicy and GreedyPolicy are provided.
+
+Use play_game() to play a single game, and simulate() to play a series of games and measure the throughput.
+"""
+import random
+import time
+from collections import Counter
+
+from labyrinth.model import factories
+from labyrinth.model.game import Player
+
+
+class RandomPolicy:
+    """ Chooses a random enabled shift location, a random rotation, and a random reachable location.
+
+    :param rng: an instance of random.Random, defaults to a new unseeded instance
+    """
+
+    def __init__(self, rng=None):
+        self._rng = rng or random.Random()
+
+    def choose_actions(self, game, player):
+        rng = self._rng
+        shift_location = rng.choice(_sorted_locations(game.get_enabled_shift_locations()))
+        outcome = rng.choice(game.board.evaluate_shifts(player.piece, [shift_location]))
+        move_location = rng.choice(_sorted_locations(outcome.reachable_locations))
+        return (outcome.shift_location, outcome.rotation), move_location
+
+
+class GreedyPolicy:
+    """ Evaluates all enabled shift actions. If the objective can be reached, a random one of these actions is chosen.
+    Otherwise, the piece moves to a location closest to the objective, measured by the Manhattan distance.
+
+    :param rng: an instance of random.Random, used to break ties. Defaults to a new unseeded instance
+    """
+
+    def __init__(self, rng=None):
+        self._rng = rng or random.Random()
+
+    def choose_actions(self, game, player):
+        rng = self._rng
+        outcomes = game.evaluate_shifts(player.identifier)
+        reaching = [outcome for outcome in outcomes if outcome.reaches_objective]
+        if reaching:
+            outcome = rng.choice(reaching)
+            return (outcome.shift_location, outcome.rotation), outcome.objective_location
+        best_distance, best_actions = None, []
+        for outcome in outcomes:
+            if outcome.objective_location is None:
+                continue
+            for location in outcome.reachable_locations:
+                distance = abs(location.row - outcome.objective_location.row) + \
+                    abs(location.column - outcome.objective_location.column)
+                if best_distance is None or distance < best_distance:
+                    best_distance, best_actions = distance, []
+                if distance == best_distance:
+                    best_actions.append(((outcome.shift_location, outcome.rotation), location))
+        if not best_actions:
+            outcome = rng.choice(outcomes)
+            move_location = rng.choice(_sorted_locations(outcome.reachable_locations))
+            return (outcome.shift_location, outcome.rotation), move_location
+        best_actions.sort(key=lambda action: (action[0][0].row, action[0][0].column, action[0][1],
+                                              action[1].row, action[1].column))
+        return rng.choice(best_actions)
+
+
+class GameResult:
+    """ Result of a game played by play_game()
+
+    :param winner: the index of the winning policy, or None if no player reached the target score
+    :param scores: the scores of the players, in the order of the policies
+    :param turns: the number of turns, i.e. the number of move actions
+    """
+
+    def __init__(self, winner, scores, turns):
+        self.winner = winner
+        self.scores = scores
+        self.turns = turns
+
+
+class SimulationReport:
+    """ Aggregated results of a series of games played by simulate()
+
+    :param results: a list of GameResults
+    :param elapsed_seconds: the wall-clock time required to play the games
+    """
+
+    def __init__(self, results, elapsed_seconds):
+        self.results = results
+        self.elapsed_seconds = elapsed_seconds
+
+    @property
+    def games(self):
+        """ The number of played games """
+        return len(self.results)
+
+    @property
+    def moves(self):
+        """ The number of move actions in all games """
+        return sum(result.turns for result in self.results)
+
+    @property
+    def wins(self):
+        """ A Counter of the number of wins per policy index. Games without winner are counted for None """
+        return Counter(result.winner for result in self.results)
+
+    @property
+    def games_per_second(self):
+        """ Played games per second """
+        return self.games / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
+    @property
+    def moves_per_second(self):
+        """ Move actions per second """
+        return self.moves / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
+
+def play_game(policies, maze_size=7, target_score=3, max_turns=1000):
+    """ Plays one game on a new random board, with one player per policy.
+
+    The game ends as soon as a player reaches the target score, or after max_turns turns.
+    :param policies: a list of one to four policies
+    :param maze_size: the size of the maze
+    :param target_score: the number of objectives a player has to reach to win the game
+    :param max_turns: the maximum number of turns
+    :return: a GameResult
+    """
+    game = factories.create_game(maze_size=maze_size, with_delay=False)
+    for player_id in range(len(policies)):
+        game.add_player(Player(player_id))
+    players = [game.get_player(player_id) for player_id in range(len(policies))]
+    turns = 0
+    winner = None
+    while winner is None and turns < max_turns:
+        player = game.next_player()
+        (shift_location, shift_rotation), move_location = policies[player.identifier].choose_actions(game, player)
+        game.shift(player.identifier, shift_location, shift_rotation)
+        game.move(player.identifier, move_location)
+        turns += 1
+        if player.score >= target_score:
+            winner = player.identifier
+    return GameResult(winner, [player.score for player in players], turns)
+
+
+def simulate(policies, games, maze_size=7, target_score=3, max_turns=1000):
+    """ Plays a series of games with play_game(), and measures the elapsed time.
+
+    :param policies: a list of one to four policies
+    :param games: the number of games to play
+    :return: a SimulationReport
+    """
+    start = time.perf_counter()
+    results = [play_game(policies, maze_size=maze_size, target_score=target_score, max_turns=max_turns)
+               for _ in range(games)]
+    return SimulationReport(results, time.perf_counter() - start)
+
+
+def _sorted_locations(locations):
+    """ Sorts locations, so that choices of seeded random generators are reproducible """
+    return sorted(locations, key=lambda location: (location.row, location.column))
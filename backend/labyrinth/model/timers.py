@@ -0,0 +1,176 @@
+""" This module implements a scheduler for delayed actions of the model, e.g. the transitions of
+Turns after the prepare delay, and the steps of bots.
+
+TimerScheduler keeps all pending timers in a heap, ordered by their due time, and runs them on a single daemon thread.
+The thread is started with the first scheduled timer. Hence, the number of threads does not grow with the number
+of games, as opposed to starting one sleeping thread per delayed action.
+
+Callbacks are run on the scheduler's thread, one after the other, so they have to return quickly.
+Callbacks which block, e.g. because they perform HTTP requests, have to be scheduled with blocking=True.
+These are handed over to a small pool of worker threads.
+
+A timer can be cancelled with the handle returned by schedule(). Cancelled timers are discarded lazily,
+when they reach the top of the heap.
+
+Use default_scheduler() to retrieve the scheduler shared by all games of this process.
+"""
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+import heapq
+import itertools
+import logging
+import threading
+import time
+
+_LOGGER = logging.getLogger(__name__)
+
+SchedulerMetrics = namedtuple("SchedulerMetrics", ["queue_depth", "executed", "cancelled", "failed",
+                                                   "last_lateness", "max_lateness", "mean_lateness"])
+SchedulerMetrics.__doc__ = """ Snapshot of the metrics of a TimerScheduler.
+queue_depth is the number of pending timers, which are not cancelled.
+Lateness is the time in seconds between the due time of a timer and the start of its callback. """
+
+
+class TimerHandle:
+    """ A scheduled timer, as returned by TimerScheduler.schedule() """
+
+    __slots__ = ("due", "callback", "args", "blocking", "cancelled", "started", "_scheduler")
+
+    def __init__(self, due, callback, args, blocking, scheduler):
+        self.due = due
+        self.callback = callback
+        self.args = args
+        self.blocking = blocking
+        self.cancelled = False
+        self.started = False
+        self._scheduler = scheduler
+
+    def cancel(self):
+        """ Cancels this timer. Has no effect if the callback has already been started """
+        self._scheduler.cancel(self)
+
+
+class TimerScheduler:
+    """ Runs callbacks after a delay, on a single thread
+
+    :param clock: a function returning the current time in seconds, defaults to time.monotonic
+    :param blocking_workers: the number of worker threads for blocking callbacks
+    """
+
+    def __init__(self, clock=time.monotonic, blocking_workers=4):
+        self._clock = clock
+        self._blocking_workers = blocking_workers
+        self._executor = None
+        self._heap = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._thread = None
+        self._pending = 0
+        self._executed = 0
+        self._cancelled = 0
+        self._failed = 0
+        self._last_lateness = 0.0
+        self._max_lateness = 0.0
+        self._total_lateness = 0.0
+
+    def schedule(self, delay, callback, *args, blocking=False):
+        """ Schedules a callback to be called with the given arguments after the delay.
+
+        :param delay: the delay in seconds, or a timedelta
+        :param callback: the function to call
+        :param blocking: if True, the callback is run on a worker thread instead of the scheduler's thread
+        :return: a TimerHandle, which can be used to cancel the timer
+        """
+        if hasattr(delay, "total_seconds"):
+            delay = delay.total_seconds()
+        with self._condition:
+            handle = TimerHandle(self._clock() + delay, callback, args, blocking, self)
+            heapq.heappush(self._heap, (handle.due, next(self._sequence), handle))
+            self._pending += 1
+            self._ensure_thread()
+            self._condition.notify()
+        return handle
+
+    def cancel(self, handle):
+        """ Cancels a timer. Has no effect if the timer has already been started or cancelled """
+        with self._condition:
+            if handle is not None and not handle.cancelled and not handle.started:
+                handle.cancelled = True
+                self._pending -= 1
+                self._cancelled += 1
+
+    def run_pending(self):
+        """ Runs all timers which are due, on the calling thread. Returns the number of started callbacks.
+        This is used by the scheduler's thread, and can be used to drive a scheduler manually, e.g. in tests. """
+        started = 0
+        while True:
+            with self._condition:
+                handle = self._pop_due()
+            if handle is None:
+                return started
+            self._run(handle)
+            started += 1
+
+    def metrics(self):
+        """ Returns a snapshot of the metrics as SchedulerMetrics """
+        with self._condition:
+            mean_lateness = self._total_lateness / self._executed if self._executed else 0.0
+            return SchedulerMetrics(self._pending, self._executed, self._cancelled, self._failed,
+                                    self._last_lateness, self._max_lateness, mean_lateness)
+
+    def _pop_due(self):
+        """ Removes and returns the next due timer, or None. Discards cancelled timers on the way """
+        now = self._clock()
+        while self._heap and (self._heap[0][2].cancelled or self._heap[0][0] <= now):
+            _, _, handle = heapq.heappop(self._heap)
+            if not handle.cancelled:
+                handle.started = True
+                self._pending -= 1
+                lateness = now - handle.due
+                self._executed += 1
+                self._last_lateness = lateness
+                self._max_lateness = max(self._max_lateness, lateness)
+                self._total_lateness += lateness
+                return handle
+        return None
+
+    def _run(self, handle):
+        if handle.blocking:
+            with self._condition:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self._blocking_workers,
+                                                        thread_name_prefix="timer-worker")
+            self._executor.submit(self._call, handle)
+        else:
+            self._call(handle)
+
+    def _call(self, handle):
+        try:
+            handle.callback(*handle.args)
+        except Exception:
+            _LOGGER.exception("Timer callback %s failed", handle.callback)
+            with self._condition:
+                self._failed += 1
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._loop, name="timer-scheduler", daemon=True)
+            self._thread.start()
+
+    def _loop(self):
+        while True:
+            self.run_pending()
+            with self._condition:
+                while self._heap and self._heap[0][2].cancelled:
+                    heapq.heappop(self._heap)
+                timeout = self._heap[0][0] - self._clock() if self._heap else None
+                if timeout is None or timeout > 0:
+                    self._condition.wait(timeout)
+
+
+_DEFAULT_SCHEDULER = TimerScheduler()
+
+
+def default_scheduler():
+    """ Returns the TimerScheduler shared by all games of this process """
+    return _DEFAULT_SCHEDULER
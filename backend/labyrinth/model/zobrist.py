@@ -0,0 +1,47 @@
+""" This module provides the keys of the Zobrist hash of a game position.
+
+A Zobrist hash is the exclusive or of one 64-bit key per component of the position, e.g. one key for
+each maze card at its location with its rotation. Hence, it can be updated incrementally: when a component changes,
+the key of its old state is removed and the key of its new state is added, both with an exclusive or.
+
+The keys are derived from the values they describe with the finalizer of the splitmix64 generator.
+In contrast to the builtin hash(), they do not depend on the process, so that hashes can be stored and compared
+across processes. Locations are given as indices, i.e. row * maze_size + column.
+"""
+
+_MASK = (1 << 64) - 1
+
+_MAZE_CARD, _LEFTOVER, _PIECE, _OBJECTIVE, _SHIFT_LOCATION = range(5)
+_NO_LOCATION = (1 << 24) - 1
+
+
+def _mix(value):
+    value = (value + 0x9E3779B97F4A7C15) & _MASK
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & _MASK
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & _MASK
+    return value ^ (value >> 31)
+
+
+def maze_card_key(identifier, rotation, index):
+    """ Key of a maze card with a rotation at the location with the given index """
+    return _mix((((identifier << 2 | (rotation // 90) % 4) << 24 | index) << 3) | _MAZE_CARD)
+
+
+def leftover_key(identifier, rotation):
+    """ Key of the leftover maze card with a rotation """
+    return _mix(((identifier << 2 | (rotation // 90) % 4) << 3) | _LEFTOVER)
+
+
+def piece_key(piece_index, index=None):
+    """ Key of a piece at the location with the given index, or outside of the maze if index is None """
+    return _mix(((piece_index << 24 | (_NO_LOCATION if index is None else index)) << 3) | _PIECE)
+
+
+def objective_key(index=None):
+    """ Key of the objective at the location with the given index, or on the leftover card if index is None """
+    return _mix(((_NO_LOCATION if index is None else index) << 3) | _OBJECTIVE)
+
+
+def shift_location_key(index=None):
+    """ Key of the previous shift location with the given index, or of no previous shift if index is None """
+    return _mix(((_NO_LOCATION if index is None else index) << 3) | _SHIFT_LOCATION)
@@ -32,18 +32,12 @@ def schedule_remove_unobserved_games():
 
 
 def _remove_overdue_players(seconds):
-    with scheduler.app.app_context():
-        _init_app()
+    with scheduler.app.app_context(), scheduler.app.test_request_context():
+        current_app.preprocess_request()
         remove_overdue_players(seconds)
 
 
 def _remove_unobserved_games(seconds):
-    with scheduler.app.app_context():
-        _init_app()
+    with scheduler.app.app_context(), scheduler.app.test_request_context():
+        current_app.preprocess_request()
         remove_unobserved_games(seconds)
-
-
-def _init_app():
-    ctx = current_app.test_request_context()
-    ctx.push()
-    current_app.preprocess_request()
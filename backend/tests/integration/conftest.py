@@ -6,6 +6,8 @@ import tempfile
 import pytest
 
 from labyrinth import create_app
+from labyrinth.database import close_connection_pools
+from labyrinth.game_cache import close_game_caches
 
 
 @pytest.fixture
@@ -21,6 +23,8 @@ def app():
         "OVERDUE_PLAYER_TIMEDELTA_S": 30
     })
     yield app
+    close_game_caches()
+    close_connection_pools()
     os.close(file_descriptor)
     os.unlink(db_path)
 
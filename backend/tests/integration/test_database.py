@@ -0,0 +1,204 @@
+""" Tests for the connection handling of module database """
+import os
+import sqlite3
+import threading
+
+import pytest
+
+from labyrinth import database
+from labyrinth.database import ConnectionPool, DatabaseGateway, close_connection_pools, version_metrics
+from labyrinth.model.exceptions import VersionConflictException
+from labyrinth.model.factories import create_game
+from labyrinth.model.game import Player, PlayerAction
+
+
+@pytest.fixture
+def pool(tmp_path):
+    pool = ConnectionPool(str(tmp_path / "labyrinth.sqlite"))
+    connection = pool.acquire()
+    connection.execute("CREATE TABLE numbers (value INTEGER)")
+    connection.commit()
+    pool.release(connection)
+    yield pool
+    pool.close_all()
+
+
+def test_acquire_returns_same_connection_in_wal_mode(pool):
+    """ Tests that a thread gets back its connection, which is configured for WAL journaling """
+    connection = pool.acquire()
+    pool.release(connection)
+    assert pool.acquire() is connection
+    assert connection.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert connection.execute("PRAGMA synchronous").fetchone()[0] == 1
+    metrics = pool.metrics()
+    assert (metrics.connections, metrics.opened, metrics.acquisitions) == (1, 1, 3)
+
+
+def test_release_rolls_back_uncommitted_changes(pool):
+    """ Tests that uncommitted work does not leak to the next user of the connection """
+    connection = pool.acquire()
+    connection.execute("INSERT INTO numbers VALUES (1)")
+    pool.release(connection)
+    connection = pool.acquire()
+    assert connection.execute("SELECT COUNT(*) FROM numbers").fetchone()[0] == 0
+
+
+def test_nested_acquire_returns_dedicated_connection(pool):
+    """ Tests that two gateways of the same thread do not share a transaction """
+    outer = pool.acquire()
+    inner = pool.acquire()
+    assert inner is not outer
+    pool.release(inner)
+    pool.release(outer)
+    assert pool.acquire() is outer
+    metrics = pool.metrics()
+    assert (metrics.connections, metrics.overflows) == (1, 1)
+
+
+def test_replaced_database_file_fails_health_check(pool, tmp_path):
+    """ Tests that the connection is replaced if the database file is replaced """
+    connection = pool.acquire()
+    pool.release(connection)
+    os.replace(tmp_path / "labyrinth.sqlite", tmp_path / "old.sqlite")
+    new_connection = pool.acquire()
+    assert new_connection is not connection
+    assert pool.metrics().failed_health_checks == 1
+
+
+def test_connections_of_terminated_threads_are_closed(pool):
+    """ Tests that a connection of a terminated thread is removed from the pool """
+    thread = threading.Thread(target=lambda: pool.release(pool.acquire()))
+    thread.start()
+    thread.join()
+    assert pool.metrics().connections == 2
+    with pool._lock:
+        pool._close_connections_of_terminated_threads()
+    assert pool.metrics().connections == 1
+
+
+def test_gateway_releases_connection_after_with_statement(pool, tmp_path):
+    """ Tests that DatabaseGateway commits and gives its connection back to the pool """
+    settings = {"DATABASE": str(tmp_path / "labyrinth.sqlite")}
+    with DatabaseGateway(settings) as gateway:
+        gateway._db().execute("INSERT INTO numbers VALUES (1)")
+    try:
+        with DatabaseGateway(settings) as gateway:
+            assert gateway._db().execute("SELECT COUNT(*) FROM numbers").fetchone()[0] == 1
+    finally:
+        close_connection_pools()
+
+
+def test_gateway_releases_held_resources_if_commit_fails(settings):
+    """ Tests that a held lock is released although the commit at the end of the with-statement raises """
+    lock = threading.Lock()
+
+    def fail():
+        raise sqlite3.OperationalError("database is locked")
+
+    with pytest.raises(sqlite3.OperationalError):
+        with DatabaseGateway(settings) as gateway:
+            gateway.hold(lock)
+            gateway._db()
+            gateway.commit = fail
+    assert not lock.locked()
+    assert gateway._db_connection is None
+
+
+@pytest.fixture
+def settings(tmp_path):
+    settings = {"DATABASE": str(tmp_path / "games.sqlite")}
+    with DatabaseGateway(settings) as gateway:
+        gateway._db().executescript(database._SCHEMA)
+        game = create_game(game_id=3, with_delay=False)
+        game.add_player(Player(1))
+        gateway.create_game(game, game_id=3)
+    yield settings
+    close_connection_pools()
+
+
+def test_update_game_of_outdated_version_raises_conflict(settings):
+    """ Tests that the second of two concurrent updates of the same game fails """
+    first, second = DatabaseGateway(settings), DatabaseGateway(settings)
+    first_game, second_game = first.load_game(3), second.load_game(3)
+    first_game.add_player(Player(2))
+    first.update_game(3, first_game)
+    first.commit()
+    before = version_metrics()
+    second_game.add_player(Player(2))
+    with pytest.raises(VersionConflictException):
+        second.update_game(3, second_game)
+    assert version_metrics().conflicts == before.conflicts + 1
+    second._release()
+    first._release()
+
+
+def test_update_game_twice_after_one_load(settings):
+    """ Tests that a gateway continues with the version it has written """
+    with DatabaseGateway(settings) as gateway:
+        game = gateway.load_game(3)
+        gateway.update_game(3, game)
+        gateway.update_game(3, game)
+        assert gateway._db().execute("SELECT version FROM games WHERE id=3").fetchone()[0] == 2
+
+
+def test_update_turn_state_increments_version(settings):
+    """ Tests that a turn state update only writes the turn state, and invalidates games loaded before """
+    stale = DatabaseGateway(settings)
+    game = stale.load_game(3)
+    with DatabaseGateway(settings) as gateway:
+        maze = gateway._db().execute("SELECT maze FROM games WHERE id=3").fetchone()[0]
+        assert gateway.update_turn_state(3, PlayerAction(game.players[0], PlayerAction.MOVE_ACTION))
+        assert gateway._db().execute("SELECT maze FROM games WHERE id=3").fetchone()[0] == maze
+    with pytest.raises(VersionConflictException):
+        stale.update_game(3, game)
+    stale._release()
+    with DatabaseGateway(settings) as gateway:
+        assert gateway.load_game(3).turns.next_action() == PlayerAction.MOVE_ACTION
+
+
+def test_update_turn_state_of_outdated_version_raises_conflict(settings):
+    """ Tests that the turn state of a game which has been updated since it was loaded is not overwritten """
+    stale = DatabaseGateway(settings)
+    game = stale.load_game(3)
+    with DatabaseGateway(settings) as gateway:
+        gateway.update_game(3, gateway.load_game(3))
+    with pytest.raises(VersionConflictException):
+        stale.update_turn_state(3, PlayerAction(game.players[0], PlayerAction.MOVE_ACTION))
+    stale._release()
+    with DatabaseGateway(settings) as gateway:
+        assert gateway.load_game(3).turns.next_action() != PlayerAction.MOVE_ACTION
+
+
+def test_update_players_only_writes_players(settings):
+    """ Tests that a renamed player is persisted without rewriting the other parts """
+    with DatabaseGateway(settings) as gateway:
+        game = gateway.load_game(3)
+        game.players[0].player_name = "renamed"
+        gateway._db().execute("UPDATE games SET maze=? WHERE id=3", ("maze is not written",))
+        gateway.update_players(3, game)
+        row = gateway._db().execute("SELECT maze, players, version FROM games WHERE id=3").fetchone()
+    assert row["maze"] == "maze is not written"
+    assert "renamed" in row["players"]
+    assert row["version"] == 1
+
+
+def test_json_game_is_migrated_to_binary_encoding(settings):
+    """ Tests that a game stored as JSON is read with binary encoding configured, and converted on full update.
+    Partial updates keep the encoding of the game. """
+    binary_settings = {**settings, "GAME_STATE_ENCODING": "binary"}
+    with DatabaseGateway(binary_settings) as gateway:
+        game = gateway.load_game(3)
+        game.players[0].player_name = "renamed"
+        gateway.update_players(3, game)
+        assert gateway._db().execute("SELECT encoding FROM games").fetchone()[0] == "json"
+        game.add_player(Player(2))
+        gateway.update_game(3, game)
+        gateway.update_turn_state(3, PlayerAction(game.players[1], PlayerAction.SHIFT_ACTION))
+    with DatabaseGateway(settings) as gateway:
+        row = gateway._db().execute("SELECT maze, players, turn_state, encoding FROM games").fetchone()
+        assert row["encoding"] == "binary"
+        assert all(isinstance(row[column], bytes) for column in ["maze", "players", "turn_state"])
+        restored = gateway.load_game(3)
+    assert [player.identifier for player in restored.players] == [1, 2]
+    assert restored.players[0].player_name == "renamed"
+    assert restored.turns.next_player_action() == PlayerAction(restored.players[1], PlayerAction.SHIFT_ACTION)
@@ -0,0 +1,295 @@
+""" Tests for module game_cache, and GameRepository with a GameCache """
+from datetime import datetime, timedelta
+import os
+import tempfile
+import threading
+
+import pytest
+
+from labyrinth import create_app, database
+from labyrinth.database import DatabaseGateway, close_connection_pools
+from labyrinth.game_cache import GameCache, WRITE_BEHIND, close_game_caches, game_cache
+from labyrinth.model.factories import create_game
+from labyrinth.model.game import Player
+from labyrinth.model.interactors import GameRepository, UpdateOnTurnChangeInteractor, retry_on_conflict
+from labyrinth.model.timers import TimerScheduler
+
+
+@pytest.fixture
+def settings(tmp_path):
+    settings = {"DATABASE": str(tmp_path / "games.sqlite")}
+    with DatabaseGateway(settings) as gateway:
+        gateway._db().executescript(database._SCHEMA)
+        for game_id in (3, 4):
+            game = create_game(game_id=game_id, with_delay=False)
+            game.add_player(Player(1))
+            gateway.create_game(game, game_id=game_id)
+    yield settings
+    close_connection_pools()
+
+
+def _cache(settings, capacity=2, durability="write-through"):
+    scheduler = TimerScheduler()
+    scheduler._ensure_thread = lambda: None
+    return GameCache(settings, capacity, durability=durability, scheduler=scheduler)
+
+
+def _stored_player_ids(settings, game_id):
+    with DatabaseGateway(settings) as gateway:
+        return [player.identifier for player in gateway.load_game(game_id).players]
+
+
+def test_find_returns_same_game_from_memory(settings):
+    """ Tests that a game is loaded once, and then served from the cache """
+    cache = _cache(settings)
+    with DatabaseGateway(settings) as gateway:
+        first = GameRepository(gateway, cache).find_by_id(3)
+    with DatabaseGateway(settings) as gateway:
+        gateway._db().execute("DELETE FROM games WHERE id=3")
+        assert GameRepository(gateway, cache).find_by_id(3) is first
+    metrics = cache.metrics()
+    assert (metrics.games, metrics.hits, metrics.misses) == (1, 1, 1)
+
+
+def test_least_recently_used_game_is_evicted(settings):
+    """ Tests that the capacity is kept by evicting the game which has not been used for the longest time """
+    cache = _cache(settings, capacity=1)
+    with DatabaseGateway(settings) as gateway:
+        game = GameRepository(gateway, cache).find_by_id(3)
+    with DatabaseGateway(settings) as gateway:
+        GameRepository(gateway, cache).find_by_id(4)
+    with DatabaseGateway(settings) as gateway:
+        assert GameRepository(gateway, cache).find_by_id(3) is not game
+    metrics = cache.metrics()
+    assert (metrics.games, metrics.misses, metrics.evictions) == (1, 3, 2)
+
+
+def test_game_in_use_is_not_evicted(settings):
+    """ Tests that the capacity is exceeded while all games are held """
+    cache = _cache(settings, capacity=1)
+    with DatabaseGateway(settings) as gateway:
+        repository = GameRepository(gateway, cache)
+        repository.find_by_id(3)
+        repository.find_by_id(4)
+        assert cache.metrics().games == 2
+
+
+def test_write_through_updates_database_immediately(settings):
+    """ Tests that updates are written as without cache """
+    cache = _cache(settings)
+    with DatabaseGateway(settings) as gateway:
+        repository = GameRepository(gateway, cache)
+        game = repository.find_by_id(3)
+        game.add_player(Player(2))
+        repository.update(game)
+    assert _stored_player_ids(settings, 3) == [1, 2]
+    assert cache.metrics().dirty == 0
+
+
+def test_write_behind_defers_update_until_flush(settings):
+    """ Tests that an update is only kept in memory, and a flush is scheduled """
+    cache = _cache(settings, durability=WRITE_BEHIND)
+    with DatabaseGateway(settings) as gateway:
+        repository = GameRepository(gateway, cache)
+        game = repository.find_by_id(3)
+        game.add_player(Player(2))
+        repository.update(game)
+        repository.update_observed_timestamp(game, datetime(2020, 1, 1))
+    assert _stored_player_ids(settings, 3) == [1]
+    assert cache.metrics().dirty == 1
+    assert cache._scheduler.metrics().queue_depth == 1
+    assert cache.flush() == 1
+    assert _stored_player_ids(settings, 3) == [1, 2]
+    with DatabaseGateway(settings) as gateway:
+        assert gateway.load_game(3, with_timestamps=True)[1] == datetime(2020, 1, 1)
+    metrics = cache.metrics()
+    assert (metrics.dirty, metrics.written) == (0, 1)
+
+
+def test_evicted_changed_game_is_revived_before_it_is_written(settings):
+    """ Tests that a changed game is kept aside after eviction, so that its changes are neither lost nor read
+    outdated from the database """
+    cache = _cache(settings, capacity=1, durability=WRITE_BEHIND)
+    with DatabaseGateway(settings) as gateway:
+        repository = GameRepository(gateway, cache)
+        game = repository.find_by_id(3)
+        game.add_player(Player(2))
+        repository.update(game)
+    with DatabaseGateway(settings) as gateway:
+        GameRepository(gateway, cache).find_by_id(4)
+    assert cache.metrics().evictions == 1
+    with DatabaseGateway(settings) as gateway:
+        assert GameRepository(gateway, cache).find_by_id(3) is game
+    cache.close()
+    assert _stored_player_ids(settings, 3) == [1, 2]
+
+
+def test_find_all_selects_games_by_cached_timestamp(settings):
+    """ Tests that timestamps which have not been written yet are considered by the queries of the repository """
+    cache = _cache(settings, durability=WRITE_BEHIND)
+    now = datetime.now()
+    with DatabaseGateway(settings) as gateway:
+        repository = GameRepository(gateway, cache)
+        game = repository.find_by_id(3)
+        repository.update_action_timestamp(game, now - timedelta(minutes=5))
+        gateway.update_action_timestamp(4, now - timedelta(minutes=5))
+        other = repository.find_by_id(4)
+        repository.update_action_timestamp(other, now)
+    with DatabaseGateway(settings) as gateway:
+        overdue = list(GameRepository(gateway, cache).find_all_before_action_timestamp(now - timedelta(minutes=1)))
+    assert overdue == [game]
+
+
+def test_find_all_holds_one_game_at_a_time(settings):
+    """ Tests that a selected game is released before the next one is acquired """
+    cache = _cache(settings)
+    with DatabaseGateway(settings) as gateway:
+        repository = GameRepository(gateway, cache)
+        first, second = repository.find_by_id(3), repository.find_by_id(4)
+        for game in (second, first):
+            repository.update_action_timestamp(game, datetime.now() - timedelta(minutes=5))
+    with DatabaseGateway(settings) as gateway:
+        games = GameRepository(gateway, cache).find_all_before_action_timestamp(datetime.now())
+        assert next(games) is first
+        assert (cache._games[3].leases, cache._games[4].leases) == (1, 0)
+        assert next(games) is second
+        assert (cache._games[3].leases, cache._games[4].leases) == (0, 1)
+        assert next(games, None) is None
+        assert cache._games[4].leases == 0
+
+
+def test_find_all_compares_timestamp_after_game_is_acquired(settings):
+    """ Tests that a game is not selected if its timestamp has changed while waiting for it """
+    cache = _cache(settings)
+    now = datetime.now()
+    holding = DatabaseGateway(settings)
+    repository = GameRepository(holding, cache)
+    game = repository.find_by_id(3)
+    repository.update_action_timestamp(game, now - timedelta(minutes=5))
+    selected = []
+
+    def find_overdue():
+        with DatabaseGateway(settings) as gateway:
+            selected.extend(GameRepository(gateway, cache).find_all_before_action_timestamp(now))
+
+    thread = threading.Thread(target=find_overdue)
+    thread.start()
+    thread.join(timeout=0.1)
+    repository.update_action_timestamp(game, now + timedelta(minutes=1))
+    holding._release()
+    thread.join(timeout=1)
+    assert selected == []
+
+
+def test_requests_to_the_same_game_are_serialized(settings):
+    """ Tests that a game is held by a gateway until it is released """
+    cache = _cache(settings)
+    found = threading.Event()
+
+    def find():
+        with DatabaseGateway(settings) as gateway:
+            GameRepository(gateway, cache).find_by_id(3)
+            found.set()
+
+    holding = DatabaseGateway(settings)
+    GameRepository(holding, cache).find_by_id(3)
+    thread = threading.Thread(target=find)
+    thread.start()
+    assert not found.wait(timeout=0.1)
+    holding._release()
+    assert found.wait(timeout=1)
+    thread.join()
+
+
+def test_turn_change_listeners_are_kept_for_data_access_without_listeners(settings):
+    """ Tests that a request which registers no listeners, e.g. a rename, does not remove the listeners
+    which persist delayed turn transitions """
+    cache = _cache(settings)
+    with DatabaseGateway(settings) as gateway:
+        repository = GameRepository(gateway, cache)
+        UpdateOnTurnChangeInteractor(repository)
+        game = repository.find_by_id(3)
+    assert len(game._turn_listeners) == 1
+    with DatabaseGateway(settings) as gateway:
+        GameRepository(gateway, cache).find_by_id(3)
+    assert len(game._turn_listeners) == 1
+    with DatabaseGateway(settings) as gateway:
+        repository = GameRepository(gateway, cache)
+        UpdateOnTurnChangeInteractor(repository)
+        repository.find_by_id(3)
+    assert len(game._turn_listeners) == 1
+
+
+def test_delayed_turn_transition_waits_for_request_holding_the_game(settings):
+    """ Tests that the timer thread does not change a cached game while a request uses it """
+    cache = _cache(settings)
+    holding = DatabaseGateway(settings)
+    game = GameRepository(holding, cache).find_by_id(3)
+    next_action = game.turns.next_action()
+    transition = threading.Thread(target=game.turns._delay_next_state, args=(game.turns._state_key(),))
+    transition.start()
+    transition.join(timeout=0.1)
+    assert transition.is_alive()
+    assert game.turns.next_action() == next_action
+    holding._release()
+    transition.join(timeout=1)
+    assert game.turns.next_action() != next_action
+
+
+def test_conflicting_update_is_retried_with_game_loaded_again(settings):
+    """ Tests that a cached game is discarded on a version conflict, so that the retried operation is not applied
+    to the instance which has already been changed """
+    cache = _cache(settings)
+    found = []
+    with DatabaseGateway(settings) as gateway:
+        repository = GameRepository(gateway, cache)
+
+        def add_player():
+            game = repository.find_by_id(3)
+            found.append(game)
+            game.add_player(Player(2))
+            if len(found) == 1:
+                with DatabaseGateway(settings) as other:
+                    other.update_game(3, other.load_game(3))
+            repository.update(game)
+        retry_on_conflict(add_player)
+    assert found[0] is not found[1]
+    assert _stored_player_ids(settings, 3) == [1, 2]
+    with DatabaseGateway(settings) as gateway:
+        assert GameRepository(gateway, cache).find_by_id(3) is found[1]
+
+
+def test_removed_game_is_not_found(settings):
+    """ Tests that a removed game is removed from the cache, as well as from the database """
+    cache = _cache(settings, durability=WRITE_BEHIND)
+    with DatabaseGateway(settings) as gateway:
+        repository = GameRepository(gateway, cache)
+        game = repository.find_by_id(3)
+        repository.update(game)
+        repository.remove(game)
+    with DatabaseGateway(settings) as gateway:
+        assert gateway.load_game(3) is None
+    assert cache.metrics().dirty == 0
+
+
+def test_api_serves_game_state_from_cache():
+    """ Tests the API with the cache enabled """
+    file_descriptor, db_path = tempfile.mkstemp()
+    app = create_app({"TESTING": True, "DATABASE": db_path, "OVERDUE_PLAYER_TIMEDELTA_S": 30,
+                      "GAME_CACHE_SIZE": 4, "GAME_CACHE_DURABILITY": WRITE_BEHIND})
+    try:
+        client = app.test_client()
+        player_id = client.post("/api/games/0/players", json={}).get_json()["id"]
+        client.put("/api/games/0/players/{}/name".format(player_id), json={"name": "renamed"})
+        for _ in range(3):
+            assert client.get("/api/games/0/state").status_code == 200
+        metrics = game_cache(app.config).metrics()
+        assert (metrics.misses, metrics.hits) == (1, 4)
+        close_game_caches()
+        with app.app_context():
+            assert DatabaseGateway.get_instance().load_game(0).players[0].player_name == "renamed"
+    finally:
+        close_game_caches()
+        close_connection_pools()
+        os.close(file_descriptor)
+        os.unlink(db_path)
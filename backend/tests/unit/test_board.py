@@ -1,8 +1,12 @@
 """ Tests for Game of game.py """
+import copy
+import random
+
 import pytest
 from tests.unit.factories import create_random_maze, MazeCardFactory
-from labyrinth.model.game import Board, BoardLocation
-from labyrinth.model.factories import create_maze
+from labyrinth.model.game import Board, BoardLocation, MazeCard
+from labyrinth.model.reachable import Graph
+from labyrinth.model.factories import create_maze, create_board
 from labyrinth.model.exceptions import InvalidShiftLocationException, InvalidRotationException, \
     MoveUnreachableException, InvalidLocationException
 
@@ -84,6 +88,56 @@ def test_move_new_objective_locations_after_reaching_location():
     _assert_all_piece_and_objective_location_different(board)
 
 
+def test_new_objectives_are_neither_on_start_locations_nor_on_pieces():
+    """ Tests that all candidates, including the leftover, are drawn, but no start location or piece location """
+    board = create_board(maze_size=5)
+    for _ in range(2):
+        board.create_piece()
+    board.pieces[1].maze_card = board.maze[BoardLocation(2, 2)]
+    excluded = {board.maze[location] for location in board.maze.geometry.start_locations}
+    excluded.add(board.pieces[1].maze_card)
+    drawn = {board._find_new_objective_maze_card() for _ in range(1000)}
+    assert drawn == (set(board.maze.maze_cards) | {board.leftover_card}) - excluded
+
+
+def test_new_objective_considers_replaced_maze_card():
+    """ Tests that a maze card which is set after construction of the board is a candidate """
+    board = create_board(maze_size=5)
+    replaced_card = board.maze[BoardLocation(1, 1)]
+    board.maze[BoardLocation(1, 1)] = MazeCard(100, MazeCard.CROSS)
+    drawn = {board._find_new_objective_maze_card().identifier for _ in range(1000)}
+    assert 100 in drawn
+    assert replaced_card.identifier not in drawn
+
+
+def test_new_objectives_are_reproducible_with_seeded_rng():
+    """ Tests that boards with equally seeded generators draw the same objectives """
+    board = create_board()
+    other_board = board.clone()
+    board.rng, other_board.rng = random.Random(5), random.Random(5)
+    for _ in range(20):
+        assert board._find_new_objective_maze_card().identifier == \
+            other_board._find_new_objective_maze_card().identifier
+
+
+def test_new_objective_scans_candidates_if_draws_are_rejected():
+    """ Tests the fallback for a generator which only draws occupied candidates """
+    class OccupiedRng:
+        @staticmethod
+        def randrange(_):
+            return 0
+
+        @staticmethod
+        def choice(sequence):
+            return sequence[0]
+
+    board = create_board()
+    piece = board.create_piece()
+    piece.maze_card = board.maze.maze_cards[board.maze.geometry.objective_indices[0]]
+    board.rng = OccupiedRng()
+    assert board._find_new_objective_maze_card() is board.maze.maze_cards[board.maze.geometry.objective_indices[1]]
+
+
 def _assert_all_piece_and_objective_location_different(board):
     """ asserts for a given Board instance """
     card_ids = {piece.maze_card.identifier for piece in board.pieces}
@@ -131,6 +185,141 @@ def test_shift_raises_error_on_invalid_rotation():
         board.shift(BoardLocation(0, 1), 70)
 
 
+def test_unshift_restores_maze_leftover_and_rotation():
+    """ Tests unshift """
+    board = create_board()
+    maze_cards_before = list(board.maze.maze_cards)
+    leftover = board.leftover_card
+    leftover.rotation = 180
+    token = board.shift(BoardLocation(0, 1), 270)
+    board.unshift(token)
+    assert board.maze.maze_cards == maze_cards_before
+    assert board.leftover_card is leftover
+    assert leftover.rotation == 180
+    assert board.maze.maze_card_location(leftover) is None
+
+
+def test_unshift_restores_pieces_on_pushed_out_card():
+    """ Tests unshift """
+    board = create_board()
+    piece = board.create_piece()
+    piece.maze_card = board.maze[BoardLocation(0, 3)]
+    token = board.shift(BoardLocation(board.maze.maze_size - 1, 3), 90)
+    board.unshift(token)
+    assert piece.maze_card is board.maze[BoardLocation(0, 3)]
+
+
+def test_unshift_series_of_shifts_in_reverse_order_restores_board():
+    """ Tests unshift after a series of shifts, comparing connectivity and piece locations """
+    board = create_board(maze_size=9)
+    for _ in range(4):
+        board.create_piece()
+    maze_cards_before = list(board.maze.maze_cards)
+    rotations_before = [maze_card.rotation for maze_card in maze_cards_before]
+    piece_cards_before = [piece.maze_card for piece in board.pieces]
+    leftover = board.leftover_card
+    reachable_before = board.maze.component_index().reachable_locations(BoardLocation(0, 0))
+    shift_locations = list(board.shift_locations)
+    tokens = []
+    for _ in range(20):
+        tokens.append(board.shift(random.choice(shift_locations), random.choice([0, 90, 180, 270])))
+    for token in reversed(tokens):
+        board.unshift(token)
+    assert board.maze.maze_cards == maze_cards_before
+    assert [maze_card.rotation for maze_card in board.maze.maze_cards] == rotations_before
+    assert [piece.maze_card for piece in board.pieces] == piece_cards_before
+    assert board.leftover_card is leftover
+    assert board.maze.component_index().reachable_locations(BoardLocation(0, 0)) == reachable_before
+
+
+def test_evaluate_shifts_equals_reachable_locations_after_shift_on_copy():
+    """ Tests evaluate_shifts by comparing each outcome with a shift performed on a copy of the board """
+    board = create_board(maze_size=9)
+    piece = board.create_piece()
+    board.create_piece()
+    outcomes = board.evaluate_shifts(piece)
+    assert len(outcomes) == len(board.shift_locations) * len(board.leftover_card.distinct_rotations())
+    for outcome in outcomes:
+        board_copy = copy.deepcopy(board)
+        piece_copy = board_copy.pieces[0]
+        board_copy.shift(outcome.shift_location, outcome.rotation)
+        piece_location = board_copy.maze.maze_card_location(piece_copy.maze_card)
+        expected = Graph(board_copy.maze).reachable_locations(piece_location)
+        objective_location = board_copy.maze.maze_card_location(board_copy.objective_maze_card)
+        assert outcome.reachable_locations == expected
+        assert outcome.reaches_objective == (objective_location in expected)
+
+
+def test_evaluate_shifts_does_not_alter_board():
+    """ Tests that evaluate_shifts leaves board and cached component index unchanged """
+    board = create_board()
+    piece = board.create_piece()
+    component_index = board.maze.component_index()
+    maze_cards_before = list(board.maze.maze_cards)
+    leftover = board.leftover_card
+    leftover_rotation = leftover.rotation
+    piece_card = piece.maze_card
+    board.evaluate_shifts(piece)
+    assert board.maze.maze_cards == maze_cards_before
+    assert board.leftover_card is leftover
+    assert leftover.rotation == leftover_rotation
+    assert piece.maze_card is piece_card
+    assert board.maze.component_index() is component_index
+
+
+def test_evaluate_shifts_skips_equivalent_rotations_of_straight_leftover():
+    """ Tests evaluate_shifts with a straight leftover card """
+    board = create_board()
+    board._leftover_card = MazeCard(100, MazeCard.STRAIGHT, 90)
+    piece = board.create_piece()
+    outcomes = board.evaluate_shifts(piece, [BoardLocation(0, 1)])
+    assert [(outcome.shift_location, outcome.rotation) for outcome in outcomes] == \
+        [(BoardLocation(0, 1), 0), (BoardLocation(0, 1), 90)]
+
+
+def test_clone_has_equal_state_and_is_independent():
+    """ Tests clone """
+    board = create_board()
+    board.create_piece()
+    board.create_piece()
+    clone = board.clone()
+    assert clone.maze.maze_cards == board.maze.maze_cards
+    assert [maze_card.rotation for maze_card in clone.maze.maze_cards] == \
+        [maze_card.rotation for maze_card in board.maze.maze_cards]
+    assert clone.leftover_card == board.leftover_card
+    assert clone.objective_maze_card == board.objective_maze_card
+    assert [piece.maze_card for piece in clone.pieces] == [piece.maze_card for piece in board.pieces]
+    assert all(clone_card is not maze_card for clone_card, maze_card in zip(clone.maze.maze_cards,
+                                                                            board.maze.maze_cards))
+    clone.shift(BoardLocation(0, 1), 90)
+    clone.pieces[0].maze_card = clone.maze[BoardLocation(3, 3)]
+    assert board.maze.maze_cards != clone.maze.maze_cards
+    assert board.pieces[0].maze_card != clone.pieces[0].maze_card
+
+
+def test_clone_references_cloned_objective_on_leftover():
+    """ Tests clone where the objective is the leftover card """
+    board = create_board()
+    board._objective_maze_card = board.leftover_card
+    clone = board.clone()
+    assert clone.objective_maze_card is clone.leftover_card
+
+
+def test_clone_keeps_component_index_current():
+    """ Tests that the clone of the component index is current and belongs to the cloned maze """
+    board = create_board()
+    piece = board.create_piece()
+    board.maze.component_index()
+    clone = board.clone()
+    clone.shift(BoardLocation(0, 1), 90)
+    clone_piece_location = clone.maze.maze_card_location(clone.pieces[0].maze_card)
+    assert clone.maze.component_index().reachable_locations(clone_piece_location) == \
+        Graph(clone.maze).reachable_locations(clone_piece_location)
+    piece_location = board.maze.maze_card_location(piece.maze_card)
+    assert board.maze.component_index().reachable_locations(piece_location) == \
+        Graph(board.maze).reachable_locations(piece_location)
+
+
 def test_move_updates_players_maze_card_correctly():
     """ Tests move
     Instead of calling init_board(), the board is built manually, and
@@ -1,4 +1,9 @@
 """ Tests for BoardLocation of game.py """
+import copy
+import pickle
+
+import pytest
+
 from labyrinth.model.game import BoardLocation
 
 
@@ -16,3 +21,40 @@ def test_add_should_return_correct_location():
     new_location = location.add(1, 0)
     assert new_location.row == 1
     assert new_location.column == 0
+
+
+def test_constructor_returns_interned_instance():
+    """ Tests that equal locations inside the maze are the same instance """
+    assert BoardLocation(3, 5) is BoardLocation(3, 5)
+    assert BoardLocation(31, 31) is BoardLocation(31, 31)
+    assert BoardLocation(0, 0).add(3, 5) is BoardLocation(3, 5)
+
+
+def test_locations_outside_of_interned_range_are_equal():
+    """ Tests equality and hash of locations which are not interned """
+    assert BoardLocation(-1, 0) == BoardLocation(-1, 0)
+    assert hash(BoardLocation(-1, 0)) == hash(BoardLocation(-1, 0))
+    assert BoardLocation(40, 2) != BoardLocation(2, 40)
+
+
+def test_location_is_immutable():
+    """ Tests that row and column cannot be assigned """
+    location = BoardLocation(1, 2)
+    with pytest.raises(AttributeError):
+        location.row = 3
+    with pytest.raises(AttributeError):
+        location.other = 3
+
+
+def test_copies_are_interned_instance():
+    """ Tests that copy, deepcopy and pickle return the interned instance """
+    location = BoardLocation(4, 6)
+    assert copy.copy(location) is location
+    assert copy.deepcopy([location])[0] is location
+    assert pickle.loads(pickle.dumps(location)) is location
+
+
+def test_hash_is_free_of_collisions_for_large_mazes():
+    """ Tests that all locations of a maze of size 64 have distinct hashes """
+    hashes = {hash(BoardLocation(row, column)) for row in range(64) for column in range(64)}
+    assert len(hashes) == 64 * 64
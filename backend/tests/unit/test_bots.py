@@ -1,11 +1,12 @@
 """ Tests for module model.bots. The classes contained in this are multithreaded.
 The tests only run these classes in a single thread, by calling run() directly. """
 import copy
+from datetime import timedelta
 from unittest.mock import Mock, patch
 
 import labyrinth.model.factories as factory
 from labyrinth.model.bots import Bot
-from labyrinth.model.game import Board, BoardLocation, Game, Turns
+from labyrinth.model.game import Board, BoardLocation, Game, Turns, PlayerAction
 
 
 def test_bot__when_register_in_turns__calls_add_player_on_turns_with_callback():
@@ -53,6 +54,34 @@ def given_library_binding__when_library_finished__calls_post_shift_but_not_post_
     post_move.assert_called_once_with(BoardLocation(0, 0))
 
 
+@patch.object(Bot, "_post_shift")
+@patch.object(Bot, "_post_move")
+def test_bot__when_notified_of_prepare_shift__schedules_steps_of_turn(post_move, post_shift):
+    """ Tests that the steps of the bot's turn are scheduled with the scheduler of the turns, without sleeping """
+    scheduler = Mock()
+    game = factory.create_game(with_delay=False)
+    library_factory, library = _mock_library_binding()
+    player = Bot(library_binding_factory=library_factory, move_url="move-url", shift_url="shift-url",
+                 identifier=9)
+    player.register_in_turns(Mock(scheduler=scheduler, prepare_delay=timedelta(0)))
+    player.set_game(game)
+
+    player.notify_turn_change(PlayerAction.PREPARE_SHIFT)
+    library.start.assert_called_once()
+    delay, callback, *args = scheduler.schedule.call_args.args
+    assert delay == Bot.COMPUTATION_TIMEOUT
+    callback(*args)
+    library.abort_search.assert_called_once()
+    post_shift.assert_not_called()
+    _, callback, *args = scheduler.schedule.call_args.args
+    assert scheduler.schedule.call_args.kwargs["blocking"]
+    callback(*args)
+    post_shift.assert_called_once_with(BoardLocation(0, 1), 90)
+    _, callback, *args = scheduler.schedule.call_args.args
+    callback(*args)
+    post_move.assert_called_once_with(BoardLocation(0, 0))
+
+
 def _mock_library_binding():
     mock_computation_method = Mock()
     mock_computation_method.start = Mock()
@@ -1,8 +1,14 @@
 """ Tests for module model.factories """
 import math
+import threading
 from collections import Counter
-from labyrinth.model.factories import create_maze_and_leftover, create_maze
+
+import pytest
+
+import labyrinth.model.factories as factories
+from labyrinth.model.factories import create_maze_and_leftover, create_maze, BoardPool
 from labyrinth.model.game import BoardLocation, MazeCard
+from labyrinth.model.exceptions import InvalidSizeException
 
 
 def test_create_maze_and_leftover_fixed_pieces_for_size_7():
@@ -173,3 +179,67 @@ def _assert_cross_center(maze):
     center = (maze.maze_size - 1) // 2
     center_location = BoardLocation(center, center)
     assert maze[center_location].out_paths == MazeCard.CROSS
+
+
+def test_board_pool_take_counts_hits_and_misses():
+    """ Tests BoardPool.take() and metrics() """
+    pool = BoardPool({7: 2})
+    assert pool.take(7) is None
+    pool.fill()
+    first, second = pool.take(7), pool.take(7)
+    assert first.maze.maze_size == 7
+    assert first is not second
+    assert pool.take(7) is None
+    metrics = pool.metrics()
+    assert (metrics.hits, metrics.misses, metrics.generated) == (2, 2, 2)
+    assert metrics.pooled == {7: 0}
+
+
+def test_board_pool_ignores_sizes_without_capacity():
+    """ Tests that BoardPool.take() returns None for sizes which are not pooled, without counting a miss """
+    pool = BoardPool({7: 1, 9: 0})
+    pool.fill()
+    assert pool.take(9) is None
+    assert pool.take(11) is None
+    assert pool.metrics() == (0, 0, 1, {7: 1})
+
+
+def test_board_pool_rejects_invalid_size():
+    """ Tests that BoardPool validates the sizes like create_maze_and_leftover() """
+    with pytest.raises(InvalidSizeException):
+        BoardPool({8: 1})
+
+
+def test_board_pool_refills_in_background():
+    """ Tests that the thread of BoardPool replaces taken boards """
+    generated = threading.Semaphore(0)
+
+    def generate(maze_size):
+        board = factories.create_board(maze_size)
+        generated.release()
+        return board
+
+    pool = BoardPool({7: 1}, generate=generate)
+    pool.start()
+    try:
+        assert generated.acquire(timeout=5)
+        assert pool.take(7) is not None
+        assert generated.acquire(timeout=5)
+    finally:
+        pool.stop()
+
+
+def test_create_board_draws_from_configured_pool():
+    """ Tests that create_board() takes boards from the pool set up by configure_board_pool() """
+    pool = factories.configure_board_pool({7: 1})
+    try:
+        pool.stop()
+        pool.fill()
+        pooled_board = pool._boards[7][0]
+        assert factories.create_board(7) is pooled_board
+        assert factories.create_board(7) is not pooled_board
+        assert factories.create_board(9).maze.maze_size == 9
+        assert pool.metrics()[:2] == (1, 1)
+    finally:
+        factories.configure_board_pool(None)
+    assert factories.board_pool() is None
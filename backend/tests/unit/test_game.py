@@ -1,7 +1,7 @@
 """ Tests for Game of game.py """
 from unittest.mock import Mock
 import pytest
-from labyrinth.model.game import Game, BoardLocation, Player, PlayerAction, Board, Turns
+from labyrinth.model.game import Game, BoardLocation, Player, PlayerAction, Board, Turns, MazeCard
 import labyrinth.model.factories as factory
 from tests.unit.mazes import ALL_CONNECTED_3
 from labyrinth.model import factories
@@ -31,6 +31,36 @@ def test_add_player_with_duplicate_id_does_not_add():
     assert len(game.players) == 1
 
 
+def test_get_player_raises_exception_for_removed_player():
+    """ Tests that get_player and unused_player_id do not consider a removed player """
+    game = Game(identifier=0, board=factories.create_board(), turns=Turns())
+    game.add_player(Player(3))
+    game.add_player(Player(5))
+    game.remove_player(5)
+    with pytest.raises(PlayerNotFoundException):
+        game.get_player(5)
+    assert game.unused_player_id() == 4
+
+
+def test_get_player_finds_players_passed_to_constructor():
+    """ Tests get_player for a game which is created with players, e.g. by the persistence mapper """
+    players = [Player(2), Player(9)]
+    game = Game(identifier=0, players=players, turns=Turns())
+    assert game.get_player(9) is players[1]
+
+
+def test_add_player_takes_slot_of_its_piece():
+    """ Tests that a player which receives a free piece index is inserted in the order of piece indices """
+    game = Game(identifier=0, board=factories.create_board(), turns=Turns())
+    for player_id in range(4):
+        game.add_player(Player(player_id))
+    game.remove_player(1)
+    game.remove_player(2)
+    game.add_player(Player(7))
+    assert [player.identifier for player in game.players] == [0, 7, 3]
+    assert [player.piece.piece_index for player in game.players] == [0, 1, 3]
+
+
 def test_unused_player_id_returns_new_id():
     """ Tests unused_player_id """
     game = Game(identifier=0)
@@ -125,6 +155,101 @@ def test_get_enabled_shift_locations_with_previous_shift():
     assert expected_disabled not in enabled_shift_locations
 
 
+def test_evaluate_shifts_omits_disabled_shift_location():
+    """ Tests evaluate_shifts where the previous shift is (3, 0) """
+    game = Game(identifier=0, board=factories.create_board(), turns=Turns())
+    game.add_player(Player(0))
+    game.previous_shift_location = BoardLocation(3, 0)
+    outcomes = game.evaluate_shifts(player_id=0)
+    evaluated_locations = {outcome.shift_location for outcome in outcomes}
+    assert evaluated_locations == set(game.get_enabled_shift_locations())
+    assert BoardLocation(3, game.board.maze.maze_size - 1) not in evaluated_locations
+
+
+def test_legal_actions_equal_moves_of_evaluated_shifts():
+    """ Tests that legal_actions yields each reachable location of each evaluated shift exactly once """
+    game = Game(identifier=0, board=factories.create_board(), turns=Turns())
+    game.add_player(Player(0))
+    game.previous_shift_location = BoardLocation(0, 1)
+    expected = {(outcome.shift_location, outcome.rotation, location)
+                for outcome in game.evaluate_shifts(player_id=0) for location in outcome.reachable_locations}
+    actions = list(game.legal_actions(player_id=0))
+    assert len(actions) == len(set(actions))
+    assert set(actions) == expected
+    assert BoardLocation(game.board.maze.maze_size - 1, 1) not in {action.shift_location for action in actions}
+
+
+def test_legal_actions_omit_equivalent_rotations_of_straight_leftover():
+    """ Tests that a straight leftover card results in actions with rotations 0 and 90 only """
+    board = factories.create_board()
+    board._leftover_card = MazeCard(100, MazeCard.STRAIGHT, 180)
+    game = Game(identifier=0, board=board, turns=Turns())
+    game.add_player(Player(0))
+    assert {action.rotation for action in game.legal_actions(player_id=0)} == {0, 90}
+
+
+def test_legal_actions_leave_board_unaltered_during_iteration():
+    """ Tests that the board is restored whenever legal_actions yields an action """
+    game = Game(identifier=0, board=factories.create_board(), turns=Turns())
+    game.add_player(Player(0))
+    maze_cards = list(game.board.maze.maze_cards)
+    leftover_rotation = game.board.leftover_card.rotation
+    for _ in game.legal_actions(player_id=0):
+        assert game.board.maze.maze_cards == maze_cards
+        assert game.board.leftover_card.rotation == leftover_rotation
+
+
+def test_shift_actions_resulting_in_the_same_maze_share_reachable_locations():
+    """ Tests that both shift locations of a line of crossings result in the same reachable locations instance """
+    board = factories.create_board()
+    for row in range(board.maze.maze_size):
+        board.maze[BoardLocation(row, 1)] = MazeCard(100 + row, MazeCard.CROSS, 0)
+    board._leftover_card = MazeCard(200, MazeCard.CROSS, 0)
+    piece = board.create_piece()
+    outcomes = {outcome.shift_location: outcome
+                for outcome in board.iter_shift_outcomes(piece, [BoardLocation(0, 1), BoardLocation(6, 1)])}
+    assert outcomes[BoardLocation(0, 1)].reachable_locations is outcomes[BoardLocation(6, 1)].reachable_locations
+
+
+def test_shift_outcome_equals_evaluated_shift():
+    """ Tests that shift_outcome evaluates a single shift action like evaluate_shifts, without altering the board """
+    board = factories.create_board()
+    piece = board.create_piece()
+    maze_cards = list(board.maze.maze_cards)
+    for expected in board.evaluate_shifts(piece):
+        assert board.shift_outcome(piece, expected.shift_location, expected.rotation) == expected
+    assert board.maze.maze_cards == maze_cards
+
+
+def test_clone_copies_players_board_and_next_action():
+    """ Tests clone """
+    game = Game(identifier=7, board=factories.create_board(), turns=Turns())
+    game.add_player(Player(3, player_name="a"))
+    game.add_player(Player(5, player_name="b"))
+    game.get_player(5).score = 2
+    game.previous_shift_location = BoardLocation(0, 1)
+    game.turns.set_next(PlayerAction(game.get_player(5), PlayerAction.MOVE_ACTION))
+    clone = game.clone()
+    assert clone.identifier == 7
+    assert [(player.identifier, player.player_name, player.score) for player in clone.players] == [
+        (3, "a", 0), (5, "b", 2)]
+    assert all(player.piece in clone.board.pieces for player in clone.players)
+    assert clone.turns.next_player_action() == PlayerAction(clone.get_player(5), PlayerAction.MOVE_ACTION)
+    assert clone.previous_shift_location == BoardLocation(0, 1)
+
+
+def test_clone_is_independent_of_game():
+    """ Tests that actions on the clone do not alter the game """
+    game = Game(identifier=0, board=factories.create_board(), turns=Turns())
+    game.add_player(Player(0))
+    maze_cards = list(game.board.maze.maze_cards)
+    clone = game.clone()
+    clone.shift(0, BoardLocation(0, 1), 90)
+    assert game.board.maze.maze_cards == maze_cards
+    assert game.previous_shift_location is None
+    assert game.turns.is_action_possible(game.get_player(0), PlayerAction.SHIFT_ACTION)
+
+
 def given_game__when_move_to_objective__player_score_is_increased():
     """ Tests that the score on a player is increased once he reaches an objective """
     game = game_with_board_and_one_player()
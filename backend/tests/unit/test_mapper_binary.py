@@ -0,0 +1,108 @@
+""" Tests for module mapper.binary.
+The binary encoding is checked for round trips: a game is encoded and decoded again, and the DTO of
+mapper.persistence of the restored game has to be equal to the one of the original game. """
+import random
+
+import pytest
+
+import labyrinth.mapper.binary as binary
+import labyrinth.mapper.persistence as persistence
+from labyrinth.model.bots import create_bot
+from labyrinth.model.factories import create_game
+from labyrinth.model.game import Game, Player, PlayerAction, Turns
+from tests.unit.test_mapper_persistence import _create_test_game
+
+
+def _assert_round_trip(game):
+    restored = binary.parts_to_game(binary.game_to_parts(game))
+    assert persistence.game_to_dto(restored) == persistence.game_to_dto(game)
+    return restored
+
+
+def test_round_trip_of_hand_made_game_with_bot():
+    """ Tests maze, leftover, objective, players, bot fields, turns and previous shift location """
+    game, _ = _create_test_game()
+    game.add_player(create_bot(player_id=42, compute_method="foo", full_path="/lib/foo.so",
+                               shift_url="shift-url", move_url="move-url"))
+    restored = _assert_round_trip(game)
+    assert restored.board.maze.zobrist_hash() == game.board.maze.zobrist_hash()
+
+
+@pytest.mark.parametrize("maze_size", [3, 7, 9, 15, 31])
+def test_round_trip_of_random_games(maze_size):
+    """ Tests random games of different sizes, with a few actions performed """
+    random.seed(maze_size)
+    game = create_game(maze_size=maze_size, game_id=maze_size, with_delay=False)
+    for player_id in [1, 5, 2]:
+        game.add_player(Player(player_id, player_name="Spieler {} äöü".format(player_id)))
+    _assert_round_trip(game)
+    for _ in range(6):
+        player = game.next_player()
+        if game.turns.next_action() == PlayerAction.SHIFT_ACTION:
+            game.shift(player.identifier, random.choice(sorted(game.get_enabled_shift_locations(), key=str)),
+                       random.choice([0, 90, 180, 270]))
+        else:
+            game.move(player.identifier, game.board.maze.maze_card_location(player.piece.maze_card))
+        _assert_round_trip(game)
+
+
+def test_round_trip_of_game_without_players():
+    """ Tests a game without players, which hence has no next action, and without previous shift location """
+    game = create_game(game_id=2, with_delay=False)
+    restored = _assert_round_trip(game)
+    assert restored.players == []
+    assert restored.previous_shift_location is None
+
+
+@pytest.mark.parametrize("player_name", [None, "", "x" * 0xFFFF, "x" * 70000])
+def test_round_trip_of_player_names(player_name):
+    """ Tests missing, empty and long player names, which do not fit into a 16 bit length """
+    game = create_game(game_id=2, with_delay=False)
+    game.add_player(Player(1, player_name=player_name))
+    restored = _assert_round_trip(game)
+    assert restored.get_player(1).player_name == player_name
+
+
+def test_players_of_format_version_2_are_read():
+    """ Tests that a players part with 16 bit string lengths, as written by format version 2, is still read """
+    game, player_ids = _create_test_game()
+    game_parts = binary.game_to_parts(game)
+    players = [binary._HEADER.pack(binary.MAGIC, 2), binary._PLAYERS.pack(len(game.players))]
+    for player in game.players:
+        name = player.player_name.encode("utf-8") if player.player_name is not None else None
+        players += [binary._PLAYER.pack(player.identifier, player.piece.maze_card.identifier, player.score,
+                                        player.piece.piece_index, 0),
+                    binary._STRING_LENGTH_V2.pack(len(name) if name is not None else 0xFFFF), name or b""]
+    restored = binary.parts_to_game(game_parts._replace(players=b"".join(players)))
+    assert persistence.game_to_dto(restored) == persistence.game_to_dto(game)
+
+
+def test_player_action_to_bytes():
+    """ Tests that the turn state part can be replaced on its own """
+    game, player_ids = _create_test_game()
+    player = game.get_player(player_ids[0])
+    game_parts = binary.game_to_parts(game)
+    turn_state = binary.player_action_to_bytes(PlayerAction(player, PlayerAction.SHIFT_ACTION))
+    restored = binary.parts_to_game(game_parts._replace(turn_state=turn_state))
+    assert restored.turns.next_player_action() == PlayerAction(restored.get_player(player_ids[0]),
+                                                               PlayerAction.SHIFT_ACTION)
+    game.turns.set_next(PlayerAction(player, PlayerAction.SHIFT_ACTION))
+    assert persistence.game_to_dto(restored) == persistence.game_to_dto(game)
+
+
+def test_players_to_bytes():
+    """ Tests that the players part can be replaced on its own """
+    game, player_ids = _create_test_game()
+    game_parts = binary.game_to_parts(game)
+    game.get_player(player_ids[1]).player_name = "renamed"
+    restored = binary.parts_to_game(game_parts._replace(players=binary.players_to_bytes(game)))
+    assert restored.get_player(player_ids[1]).player_name == "renamed"
+
+
+def test_unknown_format_version_raises_value_error():
+    """ Tests that encodings of other format versions are rejected """
+    game_parts = binary.game_to_parts(Game(3, turns=Turns()))
+    maze = bytearray(game_parts.maze)
+    maze[2] = binary.FORMAT_VERSION + 1
+    with pytest.raises(ValueError):
+        binary.parts_to_game(game_parts._replace(maze=bytes(maze)))
@@ -155,3 +155,12 @@ def _assert_games_using_function(game1, game2, func):
     determines if func(game1) == func(game2)
     """
     assert func(game1) == func(game2)
+
+
+def test_mapping_of_parts():
+    """ Tests that a game mapped to its parts is restored like a game mapped to one DTO """
+    created_game, player_ids = _create_test_game()
+    game_parts = mapper.game_to_parts(created_game)
+    assert game_parts.players == mapper.players_to_dto(created_game)
+    game = mapper.parts_to_game(game_parts)
+    assert mapper.game_to_dto(game) == mapper.game_to_dto(created_game)
@@ -1,5 +1,13 @@
 """ Tests for Maze of game.py """
-from labyrinth.model.game import Maze, MazeCard, BoardLocation
+import copy
+import random
+
+import pytest
+
+from labyrinth.model.game import Maze, MazeCard, BoardLocation, MazeGeometry
+from labyrinth.model.reachable import Graph
+from labyrinth.model.factories import create_maze_and_leftover
+from labyrinth.model.exceptions import InvalidShiftLocationException, InvalidLocationException
 from tests.unit.factories import create_random_maze, MazeCardFactory
 
 
@@ -86,6 +94,85 @@ def test_shift_does_not_alter_rest_of_maze():
         assert difference[0] == 5
 
 
+def test_shift_alters_entire_column_correctly_in_both_directions():
+    """ Test shift """
+    card_factory = MazeCardFactory()
+    maze = create_random_maze(card_factory)
+    size = maze.maze_size
+    old_id_matrix = _get_id_matrix(maze)
+    insertion = card_factory.create_random_maze_card()
+    pushed_out = maze.shift(BoardLocation(0, 3), insertion)
+    new_id_matrix = _get_id_matrix(maze)
+    assert pushed_out.identifier == old_id_matrix[size - 1][3]
+    assert new_id_matrix[0][3] == insertion.identifier
+    for row in range(1, size):
+        assert new_id_matrix[row][3] == old_id_matrix[row - 1][3]
+    pushed_out = maze.shift(BoardLocation(size - 1, 3), pushed_out)
+    assert pushed_out == insertion
+    assert _get_id_matrix(maze) == old_id_matrix
+
+
+def test_shift_raises_error_for_location_not_on_border():
+    """ Test shift """
+    maze = create_random_maze()
+    with pytest.raises(InvalidShiftLocationException):
+        maze.shift(BoardLocation(3, 3), MazeCard())
+
+
+def test_getter_raises_error_for_location_outside_of_maze():
+    """ Tests getter """
+    maze = Maze(maze_size=7)
+    with pytest.raises(InvalidLocationException):
+        maze[BoardLocation(0, 7)]
+    with pytest.raises(InvalidLocationException):
+        maze[BoardLocation(-1, 0)]
+
+
+def test_geometry_is_shared_by_mazes_of_same_size():
+    """ Tests geometry """
+    assert Maze(maze_size=7).geometry is Maze(maze_size=7).geometry
+    assert Maze(maze_size=7).geometry is not Maze(maze_size=9).geometry
+    maze = Maze(maze_size=9)
+    assert copy.deepcopy(maze).geometry is maze.geometry
+
+
+def test_geometry_neighbors_are_inside_maze():
+    """ Tests neighbors of MazeGeometry """
+    geometry = MazeGeometry.of(5)
+    assert sorted(index for *_, index in geometry.neighbors[0]) == [1, 5]
+    assert sorted(index for *_, index in geometry.neighbors[12]) == [7, 11, 13, 17]
+    assert sorted(index for *_, index in geometry.neighbors[24]) == [19, 23]
+
+
+def test_geometry_shift_locations_and_start_locations():
+    """ Tests shift_locations and start_locations of MazeGeometry """
+    geometry = MazeGeometry.of(5)
+    assert geometry.shift_locations == {BoardLocation(0, 1), BoardLocation(0, 3), BoardLocation(4, 1),
+                                        BoardLocation(4, 3), BoardLocation(1, 0), BoardLocation(3, 0),
+                                        BoardLocation(1, 4), BoardLocation(3, 4)}
+    assert geometry.start_locations == (BoardLocation(0, 0), BoardLocation(0, 4),
+                                        BoardLocation(4, 4), BoardLocation(4, 0))
+
+
+def test_geometry_opposing_border_locations_are_symmetric():
+    """ Tests opposing_border_locations of MazeGeometry """
+    geometry = MazeGeometry.of(7)
+    assert geometry.opposing_border_locations[BoardLocation(0, 3)] == BoardLocation(6, 3)
+    assert geometry.opposing_border_locations[BoardLocation(5, 6)] == BoardLocation(5, 0)
+    assert BoardLocation(3, 3) not in geometry.opposing_border_locations
+    for location in geometry.shift_locations:
+        assert geometry.opposing_border_locations[geometry.opposing_border_locations[location]] == location
+
+
+def test_geometry_shift_locations_by_index():
+    """ Tests that each index belongs to the lines of the shift locations in its row and column """
+    geometry = MazeGeometry.of(5)
+    assert geometry.shift_locations_by_index[0] == frozenset()
+    assert geometry.shift_locations_by_index[1] == {BoardLocation(0, 1), BoardLocation(4, 1)}
+    assert geometry.shift_locations_by_index[6] == {BoardLocation(0, 1), BoardLocation(4, 1),
+                                                    BoardLocation(1, 0), BoardLocation(1, 4)}
+
+
 def test_maze_locations_returns_list_of_correct_size_for_size_7():
     """ Test maze_locations """
     maze = Maze(maze_size=7)
@@ -139,6 +226,50 @@ def test_maze_card_location_returns_correct_location_for_all_cards():
         assert maze.maze_card_location(maze[location]) == location
 
 
+def test_maze_card_location_returns_none_for_replaced_card():
+    """ Test maze_card_location """
+    maze = create_random_maze()
+    location = BoardLocation(2, 3)
+    replaced = maze[location]
+    maze[location] = MazeCard(100)
+    assert maze.maze_card_location(replaced) is None
+    assert maze.maze_card_location(MazeCard(100)) == location
+
+
+def test_maze_card_location_returns_none_for_pushed_out_card():
+    """ Test maze_card_location """
+    maze = create_random_maze()
+    pushed_out = maze.shift(BoardLocation(0, 1), MazeCard(100))
+    assert maze.maze_card_location(pushed_out) is None
+    assert maze.maze_card_location(MazeCard(100)) == BoardLocation(0, 1)
+
+
+def test_maze_card_location_is_correct_after_shift_of_line_with_missing_card():
+    """ Test maze_card_location after a shift of a line where a maze card in the middle has not been set """
+    maze = Maze(maze_size=3)
+    first, last = MazeCard(1), MazeCard(2)
+    maze[BoardLocation(1, 0)] = first
+    maze[BoardLocation(1, 2)] = last
+    pushed_out = maze.shift(BoardLocation(1, 0), MazeCard(100))
+    assert pushed_out is last
+    assert maze.maze_card_location(MazeCard(100)) == BoardLocation(1, 0)
+    assert maze[BoardLocation(1, 2)] is None
+    assert maze.maze_card_location(first) == BoardLocation(1, 1)
+    assert maze.maze_card_location(last) is None
+
+
+@pytest.mark.parametrize("size", [3, 7, 31])
+def test_maze_card_location_is_correct_after_series_of_shifts(size):
+    """ Test maze_card_location after random shifts, compared with the maze cards at all locations """
+    maze, leftover = create_maze_and_leftover(size)
+    shift_locations = list(maze.geometry.shift_lines)
+    for _ in range(20):
+        leftover = maze.shift(random.choice(shift_locations), leftover)
+        assert maze.maze_card_location(leftover) is None
+        for location in maze.maze_locations:
+            assert maze.maze_card_location(maze[location]) == location
+
+
 def test_is_inside_returns_true_for_inside_location():
     """ Test is_inside """
     maze = Maze(maze_size=7)
@@ -182,6 +313,63 @@ def test_is_inside_returns_false_for_outside_locations():
     assert not maze.is_inside(BoardLocation(5, 9))
 
 
+def test_version_is_incremented_by_setter_and_shift():
+    """ Tests version """
+    card_factory = MazeCardFactory()
+    maze = create_random_maze(card_factory)
+    version = maze.version
+    maze[BoardLocation(3, 3)] = card_factory.create_random_maze_card()
+    assert maze.version > version
+    version = maze.version
+    maze.shift(BoardLocation(0, 1), card_factory.create_random_maze_card())
+    assert maze.version > version
+
+
+def test_component_index_is_cached_until_maze_changes():
+    """ Tests component_index """
+    card_factory = MazeCardFactory()
+    maze = create_random_maze(card_factory)
+    component_index = maze.component_index()
+    assert maze.component_index() is component_index
+    maze[BoardLocation(3, 3)] = card_factory.create_random_maze_card()
+    assert maze.component_index() is not component_index
+
+
+def test_component_index_is_updated_by_shift():
+    """ Tests that shift updates the current component index instead of discarding it """
+    card_factory = MazeCardFactory()
+    maze = create_random_maze(card_factory)
+    component_index = maze.component_index()
+    maze.shift(BoardLocation(0, 1), card_factory.create_random_maze_card())
+    assert maze.component_index() is component_index
+
+
+def test_component_index_reflects_shifted_maze():
+    """ Tests component_index after shift """
+    card_factory = MazeCardFactory()
+    maze = create_random_maze(card_factory)
+    maze.component_index()
+    maze.shift(BoardLocation(3, 0), card_factory.create_random_maze_card())
+    for location in maze.maze_locations:
+        assert maze.component_index().reachable_locations(location) == Graph(maze).reachable_locations(location)
+
+
+@pytest.mark.parametrize("size", [3, 7, 9, 15, 31])
+def test_component_index_equals_graph_after_series_of_shifts(size):
+    """ Cross-checks the incrementally updated component index with Graph after each of a series of random shifts """
+    maze, leftover = create_maze_and_leftover(size)
+    maze.component_index()
+    shift_locations = [location for location in maze.maze_locations
+                       if location.row in [0, size - 1] or location.column in [0, size - 1]
+                       if location.row % 2 == 1 or location.column % 2 == 1]
+    for _ in range(30):
+        leftover.rotation = random.choice([0, 90, 180, 270])
+        leftover = maze.shift(random.choice(shift_locations), leftover)
+        component_index = maze.component_index()
+        for location in maze.maze_locations:
+            assert component_index.reachable_locations(location) == Graph(maze).reachable_locations(location)
+
+
 def _assert_sorted_board_locations(maze_locations):
     assert maze_locations[0] == BoardLocation(0, 0)
     length = len(maze_locations)
@@ -51,3 +51,37 @@ def test_rotated_out_paths_for_corner_with_rotation_0():
     assert (0, 1) in maze_card.rotated_out_paths()
     assert (1, 0) not in maze_card.rotated_out_paths()
     assert (0, -1) not in maze_card.rotated_out_paths()
+
+
+def test_out_paths_mask_for_t_junct():
+    """ Tests out_paths_mask """
+    maze_card = MazeCard(0, MazeCard.T_JUNCT, 90)
+    assert maze_card.out_paths_mask == 0b0111
+
+
+def test_rotated_out_paths_mask_follows_rotation():
+    """ Tests rotated_out_paths_mask after setting the rotation """
+    maze_card = MazeCard(0, MazeCard.CORNER, 0)
+    assert maze_card.rotated_out_paths_mask == 0b0011
+    maze_card.rotation = 270
+    assert maze_card.rotated_out_paths_mask == 0b1001
+    maze_card.rotation = 450
+    assert maze_card.rotated_out_paths_mask == 0b0110
+
+
+@pytest.mark.parametrize("out_paths", [MazeCard.STRAIGHT, MazeCard.CORNER, MazeCard.T_JUNCT, MazeCard.CROSS])
+@pytest.mark.parametrize("rotation", [0, 90, 180, 270])
+def test_rotated_out_paths_mask_agrees_with_rotated_out_paths(out_paths, rotation):
+    """ Tests that both representations of the rotated out paths contain the same directions """
+    maze_card = MazeCard(0, out_paths, rotation)
+    for direction, bit in [((-1, 0), 1), ((0, 1), 2), ((1, 0), 4), ((0, -1), 8)]:
+        assert bool(maze_card.rotated_out_paths_mask & bit) == (direction in maze_card.rotated_out_paths())
+        assert maze_card.has_rotated_out_path(direction) == (direction in maze_card.rotated_out_paths())
+
+
+def test_distinct_rotations_for_all_types():
+    """ Tests distinct_rotations """
+    assert MazeCard(0, MazeCard.STRAIGHT, 90).distinct_rotations() == (0, 90)
+    assert MazeCard(0, MazeCard.CORNER).distinct_rotations() == (0, 90, 180, 270)
+    assert MazeCard(0, MazeCard.T_JUNCT).distinct_rotations() == (0, 90, 180, 270)
+    assert MazeCard(0, MazeCard.CROSS).distinct_rotations() == (0,)
@@ -4,6 +4,7 @@ from unittest.mock import Mock
 from labyrinth.database import DatabaseGateway
 from labyrinth.model import interactors
 from labyrinth.model import factories
+from labyrinth.model.exceptions import VersionConflictException
 from labyrinth.model.game import Player
 from tests.unit import matchers
 
@@ -42,6 +43,19 @@ def test_remove_overdue_players__with_player_just_removed__does_not_raise_except
     interactor.remove_overdue_players()
 
 
+def test_remove_overdue_players__with_concurrently_updated_game__skips_game():
+    game, _ = setup_test()
+    other_game = factories.create_game(game_id=6)
+    other_game.add_player(Player(4))
+    game_repository = when_game_repository_find_all_before_action_timestamp_then_return([game, other_game])
+    game_repository.update = Mock(side_effect=[VersionConflictException(), None])
+
+    interactor = interactors.OverduePlayerInteractor(game_repository, logger)
+    interactor.remove_overdue_players()
+
+    logger.remove_player.assert_called_once_with(4, game_id=6, num_players=0)
+
+
 def test_interactor__when_game_notifies_turn_listeners__updates_player_action_timestamp():
     game, _ = setup_test()
     data_access = DatabaseGateway(settings={"DATABASE": "foo"})
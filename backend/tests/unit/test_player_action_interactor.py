@@ -1,11 +1,14 @@
+from datetime import timedelta
 from unittest.mock import Mock
 
 import pytest
 
 import tests.unit.game_repository_mocks as game_repository_coach
 from labyrinth.model import interactors
-from labyrinth.model.exceptions import InvalidShiftLocationException, TurnActionViolationException
+from labyrinth.model.exceptions import InvalidShiftLocationException, TurnActionViolationException, \
+    VersionConflictException
 from labyrinth.model.game import BoardLocation, Game, Player, Turns
+from labyrinth.model.timers import TimerScheduler
 
 
 @pytest.fixture()
@@ -78,6 +81,45 @@ def test_perform_move__when_exception_raised_by_game__then_no_update(test_setup)
     game_repository.update.assert_not_called()
 
 
+def test_perform_shift__when_update_conflicts__then_retries_with_reloaded_game(test_setup):
+    game, player_action_interactor, game_repository = test_setup()
+    game.shift = Mock()
+    game_repository.update = Mock(side_effect=[VersionConflictException(), None])
+
+    player_action_interactor.perform_shift(game_id=5, player_id=7,
+                                           shift_location=BoardLocation(1, 2), shift_rotation=90)
+
+    assert game_repository.find_by_id.call_count == 2
+    assert game.shift.call_count == 2
+    assert game_repository.update.call_count == 2
+
+
+def test_perform_move__when_update_keeps_conflicting__then_raises(test_setup):
+    game, player_action_interactor, game_repository = test_setup()
+    game.move = Mock()
+    game_repository.update = Mock(side_effect=VersionConflictException())
+
+    with pytest.raises(VersionConflictException):
+        player_action_interactor.perform_move(game_id=5, player_id=7, move_location=BoardLocation(3, 7))
+
+    assert game_repository.update.call_count == interactors.UPDATE_ATTEMPTS
+
+
+def test_update__when_update_conflicts__then_cancels_pending_transition_of_abandoned_game():
+    scheduler = TimerScheduler()
+    scheduler._ensure_thread = lambda: None
+    game = Game(5, turns=Turns(prepare_delay=timedelta(seconds=1), players=[Player(7)], scheduler=scheduler))
+    game.turns.start()
+    data_access = Mock()
+    data_access.update_game = Mock(side_effect=VersionConflictException())
+    game_repository = interactors.GameRepository(data_access)
+
+    with pytest.raises(VersionConflictException):
+        game_repository.update(game)
+
+    assert scheduler.metrics().queue_depth == 0
+
+
 def game_with_previous_shift_location(expected_location):
     class Matcher:
         def __init__(self, expected_location):
@@ -1,8 +1,13 @@
 """ Tests for Graph. A Board instance is created from a string representation of a labyrinth.
 Several validation tests are performed on this instance """
+import random
+
+import pytest
+
 from labyrinth.model.game import BoardLocation
-from labyrinth.model.reachable import Graph
-from labyrinth.model.factories import create_maze
+from labyrinth.model.reachable import Graph, BitboardGraph, ComponentIndex
+from labyrinth.model.factories import create_maze, create_maze_and_leftover
+from labyrinth.model.exceptions import InvalidLocationException
 
 
 def test_is_reachable_for_same_location():
@@ -90,6 +95,93 @@ def test_reachable_locations():
     assert set(reachable) == expected
 
 
+def test_bitboard_graph_reachable_locations():
+    """ Tests reachable_locations of BitboardGraph """
+    maze = create_maze(MAZE_STRING)
+    graph = BitboardGraph(maze)
+    reachable = graph.reachable_locations(BoardLocation(0, 1))
+    expected = {BoardLocation(*coord) for coord in [(0, 1), (0, 2), (0, 3), (1, 3)]}
+    assert reachable == expected
+
+
+def test_bitboard_graph_is_reachable():
+    """ Tests is_reachable of BitboardGraph """
+    maze = create_maze(MAZE_STRING)
+    graph = BitboardGraph(maze)
+    assert graph.is_reachable(BoardLocation(0, 0), BoardLocation(0, 0))
+    assert not graph.is_reachable(BoardLocation(0, 0), BoardLocation(1, 0))
+    assert not graph.is_reachable(BoardLocation(2, 4), BoardLocation(2, 5))
+    assert graph.is_reachable(BoardLocation(1, 4), BoardLocation(5, 0))
+    assert graph.is_reachable(BoardLocation(5, 0), BoardLocation(6, 3))
+    assert graph.is_reachable(BoardLocation(0, 6), BoardLocation(2, 6))
+    assert not graph.is_reachable(BoardLocation(1, 0), BoardLocation(4, 4))
+
+
+def test_bitboard_graph_does_not_wrap_around_rows():
+    """ Tests that the flood fill does not connect the last column of a row with the first column of the next row """
+    maze = create_maze(WRAP_AROUND_MAZE_STRING)
+    graph = BitboardGraph(maze)
+    assert graph.reachable_locations(BoardLocation(0, 2)) == {BoardLocation(0, 2)}
+    assert graph.reachable_locations(BoardLocation(1, 0)) == {BoardLocation(1, 0)}
+
+
+def test_bitboard_graph_is_reachable_for_target_outside_of_maze():
+    """ Tests is_reachable of BitboardGraph """
+    maze = create_maze(MAZE_STRING)
+    graph = BitboardGraph(maze)
+    assert not graph.is_reachable(BoardLocation(0, 0), BoardLocation(-1, 0))
+    with pytest.raises(InvalidLocationException):
+        graph.reachable_locations(BoardLocation(7, 0))
+
+
+@pytest.mark.parametrize("size", [3, 7, 9, 31])
+def test_bitboard_graph_equals_graph_on_random_mazes(size):
+    """ Cross-checks reachable_locations of both engines """
+    for _ in range(10):
+        maze, _ = create_maze_and_leftover(size)
+        for source in random.sample(maze.maze_locations, 5):
+            assert BitboardGraph(maze).reachable_locations(source) == Graph(maze).reachable_locations(source)
+
+
+def test_component_index_reachable_locations():
+    """ Tests reachable_locations of ComponentIndex """
+    maze = create_maze(MAZE_STRING)
+    index = ComponentIndex(maze)
+    reachable = index.reachable_locations(BoardLocation(0, 1))
+    expected = {BoardLocation(*coord) for coord in [(0, 1), (0, 2), (0, 3), (1, 3)]}
+    assert reachable == expected
+
+
+def test_component_index_is_reachable():
+    """ Tests is_reachable of ComponentIndex """
+    maze = create_maze(MAZE_STRING)
+    index = ComponentIndex(maze)
+    assert index.is_reachable(BoardLocation(0, 0), BoardLocation(0, 0))
+    assert not index.is_reachable(BoardLocation(0, 0), BoardLocation(1, 0))
+    assert index.is_reachable(BoardLocation(2, 4), BoardLocation(1, 4))
+    assert index.is_reachable(BoardLocation(3, 1), BoardLocation(3, 2))
+    assert index.is_reachable(BoardLocation(1, 4), BoardLocation(5, 0))
+    assert not index.is_reachable(BoardLocation(1, 0), BoardLocation(4, 4))
+    assert not index.is_reachable(BoardLocation(0, 0), BoardLocation(0, -1))
+
+
+def test_component_index_shares_component_between_locations():
+    """ Tests that all locations of one component return the same set """
+    maze = create_maze(MAZE_STRING)
+    index = ComponentIndex(maze)
+    assert index.reachable_locations(BoardLocation(0, 1)) is index.reachable_locations(BoardLocation(1, 3))
+
+
+@pytest.mark.parametrize("size", [3, 7, 9, 31])
+def test_component_index_equals_graph_on_random_mazes(size):
+    """ Cross-checks reachable_locations of ComponentIndex and Graph """
+    for _ in range(10):
+        maze, _ = create_maze_and_leftover(size)
+        index = ComponentIndex(maze)
+        for source in random.sample(maze.maze_locations, 5):
+            assert index.reachable_locations(source) == Graph(maze).reachable_locations(source)
+
+
 MAZE_STRING = """
 ###|#.#|#.#|###|#.#|#.#|###|
 #..|#..|...|...|#..|..#|..#|
@@ -121,3 +213,18 @@ MAZE_STRING = """
 ---------------------------*
 
 """
+
+WRAP_AROUND_MAZE_STRING = """
+#.#|#.#|###|
+#.#|#.#|...|
+#.#|#.#|###|
+-----------|
+###|#.#|#.#|
+...|#.#|#.#|
+###|#.#|#.#|
+-----------|
+#.#|#.#|#.#|
+#.#|#.#|#.#|
+#.#|#.#|#.#|
+-----------*
+"""
@@ -0,0 +1,37 @@
+""" Tests for module model.simulator """
+import random
+
+import pytest
+
+from labyrinth.model.simulator import RandomPolicy, GreedyPolicy, play_game, simulate
+
+
+@pytest.mark.parametrize("policy_type", [RandomPolicy, GreedyPolicy])
+def test_play_game_ends_with_winner_at_target_score_or_after_max_turns(policy_type):
+    """ Tests play_game with two players of the same policy """
+    result = play_game([policy_type(random.Random(1)), policy_type(random.Random(2))],
+                       maze_size=7, target_score=2, max_turns=300)
+    assert len(result.scores) == 2
+    if result.winner is None:
+        assert result.turns == 300
+        assert max(result.scores) < 2
+    else:
+        assert result.scores[result.winner] == 2
+        assert result.turns <= 300
+
+
+def test_play_game_with_single_greedy_player_reaches_target_score():
+    """ Tests that the greedy policy makes progress on a small maze """
+    result = play_game([GreedyPolicy(random.Random(0))], maze_size=5, target_score=3, max_turns=500)
+    assert result.winner == 0
+    assert result.scores == [3]
+
+
+def test_simulate_reports_games_and_moves():
+    """ Tests simulate """
+    report = simulate([RandomPolicy(), GreedyPolicy()], games=3, maze_size=5, target_score=1, max_turns=200)
+    assert report.games == 3
+    assert report.moves == sum(result.turns for result in report.results)
+    assert sum(report.wins.values()) == 3
+    assert report.games_per_second > 0
+    assert report.moves_per_second > 0
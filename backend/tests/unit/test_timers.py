@@ -0,0 +1,136 @@
+""" Tests for module model.timers """
+from datetime import timedelta
+import threading
+
+from labyrinth.model.game import Turns, Player, PlayerAction
+from labyrinth.model.timers import TimerScheduler
+
+
+class ManualClock:
+    """ A clock which only advances when told to """
+
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def _scheduler_with_manual_clock():
+    clock = ManualClock()
+    scheduler = TimerScheduler(clock=clock)
+    scheduler._ensure_thread = lambda: None
+    return scheduler, clock
+
+
+def _run_pending_and_wait(scheduler):
+    """ Runs the due timers, and waits until the blocking ones have finished on the worker threads """
+    started = scheduler.run_pending()
+    if scheduler._executor is not None:
+        scheduler._executor.shutdown(wait=True)
+        scheduler._executor = None
+    return started
+
+
+def test_run_pending_calls_due_callbacks_in_order_of_due_time():
+    """ Tests schedule and run_pending """
+    scheduler, clock = _scheduler_with_manual_clock()
+    calls = []
+    scheduler.schedule(2, calls.append, "second")
+    scheduler.schedule(timedelta(seconds=1), calls.append, "first")
+    scheduler.schedule(5, calls.append, "third")
+    assert scheduler.run_pending() == 0
+    clock.now += 2
+    assert scheduler.run_pending() == 2
+    assert calls == ["first", "second"]
+
+
+def test_cancelled_timer_is_not_called():
+    """ Tests cancel """
+    scheduler, clock = _scheduler_with_manual_clock()
+    calls = []
+    handle = scheduler.schedule(1, calls.append, "cancelled")
+    scheduler.schedule(1, calls.append, "called")
+    handle.cancel()
+    clock.now += 1
+    scheduler.run_pending()
+    assert calls == ["called"]
+    assert scheduler.metrics().cancelled == 1
+
+
+def test_metrics_report_queue_depth_and_lateness():
+    """ Tests metrics """
+    scheduler, clock = _scheduler_with_manual_clock()
+    scheduler.schedule(1, lambda: None)
+    scheduler.schedule(2, lambda: None)
+    scheduler.schedule(10, lambda: None).cancel()
+    assert scheduler.metrics().queue_depth == 2
+    clock.now += 3
+    scheduler.run_pending()
+    metrics = scheduler.metrics()
+    assert metrics.queue_depth == 0
+    assert metrics.executed == 2
+    assert metrics.max_lateness == 2
+    assert metrics.mean_lateness == 1.5
+
+
+def test_failing_callback_is_counted_and_does_not_stop_scheduler():
+    """ Tests that an exception in a callback does not prevent subsequent callbacks """
+    scheduler, clock = _scheduler_with_manual_clock()
+    calls = []
+    scheduler.schedule(1, lambda: 1 / 0)
+    scheduler.schedule(1, calls.append, "called")
+    clock.now += 1
+    scheduler.run_pending()
+    assert calls == ["called"]
+    assert scheduler.metrics().failed == 1
+
+
+def test_thread_runs_callbacks_after_delay():
+    """ Tests the scheduler thread, with blocking and non-blocking callbacks """
+    scheduler = TimerScheduler()
+    called, called_blocking = threading.Event(), threading.Event()
+    scheduler.schedule(0.01, called.set)
+    scheduler.schedule(0.01, called_blocking.set, blocking=True)
+    assert called.wait(timeout=1)
+    assert called_blocking.wait(timeout=1)
+
+
+def test_turns_schedule_transition_after_prepare_delay():
+    """ Tests that Turns performs the transition from PREPARE_SHIFT to SHIFT with the scheduler """
+    scheduler, clock = _scheduler_with_manual_clock()
+    player = Player(0)
+    turns = Turns(prepare_delay=timedelta(seconds=1), players=[player], scheduler=scheduler)
+    turns.start()
+    assert turns.next_action() == PlayerAction.PREPARE_SHIFT
+    assert scheduler.metrics().queue_depth == 1
+    clock.now += 1
+    _run_pending_and_wait(scheduler)
+    assert turns.next_action() == PlayerAction.SHIFT_ACTION
+
+
+def test_turns_notify_listeners_of_delayed_transition_on_worker_thread():
+    """ Tests that the listeners of a delayed transition, e.g. database writes, do not block the scheduler's thread """
+    scheduler, clock = _scheduler_with_manual_clock()
+    turns = Turns(prepare_delay=timedelta(seconds=1), players=[Player(0)], scheduler=scheduler)
+    thread_names = []
+    turns.start()
+    turns.register_turn_changed_listener(lambda: thread_names.append(threading.current_thread().name))
+    clock.now += 1
+    _run_pending_and_wait(scheduler)
+    assert len(thread_names) == 1
+    assert thread_names[0].startswith("timer-worker")
+
+
+def test_turns_cancel_transition_of_removed_player():
+    """ Tests that the pending transition of a removed player is cancelled, and one for the next player is scheduled """
+    scheduler, clock = _scheduler_with_manual_clock()
+    player1, player2 = Player(1), Player(2)
+    turns = Turns(prepare_delay=timedelta(seconds=1), players=[player1, player2], scheduler=scheduler)
+    turns.start()
+    turns.remove_player(player1)
+    metrics = scheduler.metrics()
+    assert (metrics.queue_depth, metrics.cancelled) == (1, 1)
+    clock.now += 1
+    _run_pending_and_wait(scheduler)
+    assert turns.next_player_action() == PlayerAction(player2, PlayerAction.SHIFT_ACTION)
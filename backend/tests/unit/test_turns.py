@@ -188,6 +188,54 @@ def test_remove_player__with_only_one_player__no_callback_called():
     player.callback.assert_not_called()
 
 
+def test_next_player_and_next_action_follow_progression():
+    """ Tests next_player and next_action """
+    players = [Player(id, 0) for id in [4, 2]]
+    turns = Turns(players=players)
+    assert (turns.next_player(), turns.next_action()) == (players[0], PlayerAction.SHIFT_ACTION)
+    turns.perform_action(players[0], PlayerAction.SHIFT_ACTION)
+    assert (turns.next_player(), turns.next_action()) == (players[0], PlayerAction.MOVE_ACTION)
+    turns.perform_action(players[0], PlayerAction.MOVE_ACTION)
+    assert (turns.next_player(), turns.next_action()) == (players[1], PlayerAction.SHIFT_ACTION)
+    assert (Turns().next_player(), Turns().next_action()) == (None, None)
+
+
+def test_add_player_twice_adds_one_slot():
+    """ Tests that a player with the same identifier is only added once """
+    player = Player(3, 0)
+    turns = Turns(players=[player])
+    turns.add_player(Player(3, 0))
+    turns.perform_action(player, PlayerAction.SHIFT_ACTION)
+    turns.perform_action(player, PlayerAction.MOVE_ACTION)
+    assert turns.next_player_action() == PlayerAction(player, PlayerAction.SHIFT_ACTION)
+
+
+def test_remove_preceding_player_keeps_next_action():
+    """ Tests that removing a player before the next player does not change the next action """
+    players = [Player(id, 0) for id in [1, 2, 3]]
+    turns = Turns(players=players, next_action=PlayerAction(players[2], PlayerAction.MOVE_ACTION))
+    turns.remove_player(players[0])
+    assert turns.next_player_action() == PlayerAction(players[2], PlayerAction.MOVE_ACTION)
+    turns.perform_action(players[2], PlayerAction.MOVE_ACTION)
+    assert turns.is_action_possible(players[1], PlayerAction.SHIFT_ACTION)
+
+
+def test_remove_last_player_when_next_continues_with_first_player():
+    """ Tests remove_player of the player who is expected to play next, in the last slot """
+    players = [Player(id, 0) for id in [1, 2, 3]]
+    turns = Turns(players=players, next_action=PlayerAction(players[2], PlayerAction.SHIFT_ACTION))
+    turns.remove_player(players[2])
+    assert turns.next_player_action() == PlayerAction(players[0], PlayerAction.SHIFT_ACTION)
+
+
+def test_is_action_possible_rejects_prepare_actions_and_unknown_players():
+    """ Tests is_action_possible with actions which cannot be performed, and with a player not in the turns """
+    player = Player(1, 0)
+    turns = Turns(players=[player])
+    assert not turns.is_action_possible(player, PlayerAction.PREPARE_SHIFT)
+    assert not turns.is_action_possible(Player(2, 0), PlayerAction.SHIFT_ACTION)
+
+
 def given_delay__when_start__is_in_prepare_state():
     player = Player(0)
     turns = Turns(prepare_delay=timedelta(milliseconds=10), players=[player])
@@ -289,3 +337,17 @@ def test_given_delay_with_two_players__when_player1_leaves_during_wait__player1_
     time.sleep(timedelta(milliseconds=50).total_seconds())
 
     player1.callback.assert_not_called()
+
+
+def test_clone_in_prepare_phase_continues_with_subsequent_action():
+    """ Tests clone of turns with prepare delay, while waiting for the delay to pass """
+    player1, player2 = Player(7, 0), Player(11, 0)
+    turns = Turns(prepare_delay=timedelta(seconds=5), players=[player1, player2],
+                  next_action=PlayerAction(player2, PlayerAction.PREPARE_SHIFT))
+    clone_players = [Player(7, 0), Player(11, 0)]
+    clone = turns.clone(clone_players)
+    assert clone.prepare_delay == timedelta(0)
+    assert clone.next_player_action() == PlayerAction(clone_players[1], PlayerAction.SHIFT_ACTION)
+    assert clone.next_player_action().player is clone_players[1]
+    clone.perform_action(clone_players[1], PlayerAction.SHIFT_ACTION)
+    assert turns.next_player_action() == PlayerAction(player2, PlayerAction.PREPARE_SHIFT)
@@ -0,0 +1,110 @@
+""" Tests for the Zobrist hashes of Maze, Board and Game """
+import random
+
+import pytest
+
+from labyrinth.mapper.persistence import game_to_dto, dto_to_game
+from labyrinth.model import factories, zobrist
+from labyrinth.model.game import BoardLocation, MazeCard, Player
+
+
+def _game_with_players(maze_size=7, num_players=2):
+    game = factories.create_game(maze_size=maze_size, with_delay=False)
+    for player_id in range(num_players):
+        game.add_player(Player(player_id))
+    return game
+
+
+def _recomputed_hash(game):
+    """ Hash of an equal game, which is restored from a DTO and has to compute its hash from scratch """
+    return dto_to_game(game_to_dto(game)).zobrist_hash()
+
+
+@pytest.mark.parametrize("maze_size", [7, 15])
+def test_hash_after_series_of_actions_equals_recomputed_hash(maze_size):
+    """ Tests that the incrementally updated hash equals the hash of a restored game after each action """
+    game = _game_with_players(maze_size)
+    game.zobrist_hash()
+    for _ in range(20):
+        player = game.next_player()
+        shift_location = random.choice(sorted(game.get_enabled_shift_locations(),
+                                              key=lambda location: (location.row, location.column)))
+        game.shift(player.identifier, shift_location, random.choice([0, 90, 180, 270]))
+        assert game.zobrist_hash() == _recomputed_hash(game)
+        piece_location = game.board.maze.maze_card_location(player.piece.maze_card)
+        target = random.choice(sorted(game.board.maze.component_index().reachable_locations(piece_location),
+                                      key=lambda location: (location.row, location.column)))
+        game.move(player.identifier, target)
+        assert game.zobrist_hash() == _recomputed_hash(game)
+
+
+def test_maze_hash_after_setitem_equals_recomputed_hash():
+    """ Tests that Maze.__setitem__ updates the hash """
+    maze, _ = factories.create_maze_and_leftover()
+    maze.zobrist_hash()
+    maze[BoardLocation(3, 3)] = MazeCard(100, MazeCard.CROSS, 90)
+    assert maze.zobrist_hash() == maze._compute_zobrist_hash()
+
+
+def test_maze_setitem_does_not_update_hash_which_is_not_current(monkeypatch):
+    """ Tests that filling a maze does not compute keys, and the hash is computed when it is requested """
+    maze, _ = factories.create_maze_and_leftover()
+    computed_keys = []
+    monkeypatch.setattr(zobrist, "maze_card_key", lambda *args: computed_keys.append(args) or 1)
+    maze[BoardLocation(3, 3)] = MazeCard(100, MazeCard.CROSS, 90)
+    assert computed_keys == []
+    monkeypatch.undo()
+    assert maze.zobrist_hash() == maze._compute_zobrist_hash()
+
+
+def test_hash_is_restored_by_unshift():
+    """ Tests that shift and unshift result in the initial hash """
+    game = _game_with_players()
+    board = game.board
+    initial_hash = board.zobrist_hash()
+    token = board.shift(BoardLocation(0, 1), 90)
+    assert board.zobrist_hash() != initial_hash
+    board.unshift(token)
+    assert board.zobrist_hash() == initial_hash
+
+
+def test_hash_is_equal_for_clone():
+    """ Tests that a clone has the same hash """
+    game = _game_with_players()
+    game.previous_shift_location = BoardLocation(0, 1)
+    assert game.clone().zobrist_hash() == game.zobrist_hash()
+
+
+def test_hash_depends_on_leftover_rotation():
+    """ Tests that the rotation of the leftover card changes the hash """
+    board = _game_with_players().board
+    initial_hash = board.zobrist_hash()
+    board.leftover_card.rotation += 90
+    assert board.zobrist_hash() != initial_hash
+
+
+def test_hash_depends_on_piece_locations():
+    """ Tests that a piece on another maze card changes the hash """
+    board = _game_with_players().board
+    initial_hash = board.zobrist_hash()
+    board.pieces[0].maze_card = board.maze[BoardLocation(3, 3)]
+    assert board.zobrist_hash() != initial_hash
+
+
+def test_hash_depends_on_objective():
+    """ Tests that another objective changes the hash """
+    board = _game_with_players().board
+    # the random objective may already be the leftover card
+    board._objective_maze_card = board.maze[BoardLocation(3, 3)]
+    initial_hash = board.zobrist_hash()
+    board._objective_maze_card = board.leftover_card
+    assert board.zobrist_hash() != initial_hash
+
+
+def test_hash_depends_on_previous_shift_location():
+    """ Tests that the previous shift location is part of the hash of the game, but not of the board """
+    game = _game_with_players()
+    board_hash, game_hash = game.board.zobrist_hash(), game.zobrist_hash()
+    game.previous_shift_location = BoardLocation(0, 1)
+    assert game.board.zobrist_hash() == board_hash
+    assert game.zobrist_hash() != game_hash
@@ -0,0 +1,17 @@
+""" Helpers shared by the benchmark scripts of this directory, which print each measured row
+and optionally write all rows to a CSV file. """
+import csv
+
+
+def print_row(row, precision=3):
+    """ Prints the values of a row in one line, floats with the given number of decimals. """
+    print(", ".join(f"{key}: {value:.{precision}f}" if isinstance(value, float) else f"{key}: {value}"
+                    for key, value in row.items()))
+
+
+def write_csv(rows, outfile):
+    """ Writes the rows to a CSV file, with the keys of the first row as header. """
+    with open(outfile, "w", newline='') as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=list(rows[0].keys()))
+        writer.writeheader()
+        writer.writerows(rows)
@@ -0,0 +1,59 @@
+""" Measures the memory allocated while restoring a game from its persisted DTO, as it is done by every request.
+
+For each maze size, a game with two players is persisted. Then, the game is restored with dto_to_game,
+and its enabled shift locations are determined, as for validating a shift action.
+The reported values are the peak of traced memory during one restore (tracemalloc), the memory which is still
+referenced by the restored game, and the CPU time of one restore.
+
+    python allocations.py --outfile allocations.csv -s 7 -s 31
+"""
+import json
+import timeit
+import tracemalloc
+
+import click
+
+import labyrinth.mapper.persistence as mapper
+import labyrinth.model.factories as factories
+from labyrinth.model.game import Player
+from model._bench import print_row, write_csv
+
+
+@click.command()
+@click.option("--outfile", default=None, help="csv file to write the results to.")
+@click.option("--size", "-s", "sizes", multiple=True, type=int, default=[7, 15, 31], show_default=True)
+@click.option("--number", default=100, show_default=True, help="Number of restores per time measurement.")
+@click.option("--repeats", default=5, show_default=True)
+def run(outfile, sizes, number, repeats):
+    rows = []
+    for size in sizes:
+        dto = _create_game_dto(size)
+        _restore(dto)
+        tracemalloc.start()
+        game = _restore(dto)
+        retained, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del game
+        row = {"size": size, "peak[KiB]": peak / 1024, "retained[KiB]": retained / 1024,
+               "restore[ms]": min(timeit.repeat(lambda: _restore(dto), number=number, repeat=repeats)) / number * 1000}
+        print_row(row)
+        rows.append(row)
+    if outfile:
+        write_csv(rows, outfile)
+
+
+def _create_game_dto(size):
+    game = factories.create_game(maze_size=size, with_delay=False)
+    for player_id in [1, 2]:
+        game.add_player(Player(player_id))
+    return json.loads(json.dumps(mapper.game_to_dto(game)))
+
+
+def _restore(dto):
+    game = mapper.dto_to_game(dto)
+    game.get_enabled_shift_locations()
+    return game
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,230 @@
+""" This module implements a batch of boards on NumPy arrays, e.g. for Monte-Carlo rollouts of many games at once.
+
+BoardBatch represents N boards of the same maze size, each with the same number of pieces.
+Maze cards are represented by their rotated out paths masks (see out_paths_dict), so that the state consists of
+- masks, uint8 [N, n, n], the rotated out paths of the maze cards,
+- leftover, uint8 [N], the rotated out paths of the leftover cards,
+- pieces, int [N, P, 2], the (row, column) coordinates of the pieces,
+- objective, int [N, 2], the (row, column) coordinates of the objective, or (-1, -1) if it is the leftover card.
+Identifiers of maze cards are not represented.
+
+Shifts are given as indices into BoardBatch.shift_locations, so that they can be drawn with vectorized operations.
+The shift locations, their opposing locations and the shifted lines are taken from the MazeGeometry of the maze size.
+All boards with the same shift location are shifted at once. Reachability is computed with a dilation of the
+set of reached locations, which is masked by the connections between adjacent maze cards.
+
+This module requires numpy, which is not a dependency of the backend. Hence, it is part of the experiments.
+"""
+import numpy as np
+
+from labyrinth.model import out_paths_dict
+from labyrinth.model.game import MazeGeometry
+
+_NORTH, _EAST, _SOUTH, _WEST = 1, 2, 4, 8
+
+_ROTATED = np.array(out_paths_dict.rotated_masks, dtype=np.uint8)
+
+
+def _generate_unrotated():
+    """ Maps each rotated mask to the mask of its maze card type with rotation 0 """
+    unrotated = np.zeros(16, dtype=np.uint8)
+    for out_paths in ["NS", "NE", "NES", "NESW"]:
+        mask = out_paths_dict.out_paths_to_mask(out_paths)
+        for turns in range(4):
+            unrotated[out_paths_dict.rotated_masks[mask][turns]] = mask
+    return unrotated
+
+
+_UNROTATED = _generate_unrotated()
+
+
+class BoardBatch:
+    """ A batch of boards on NumPy arrays
+
+    :param masks: uint8 array [N, n, n] of rotated out paths masks
+    :param leftover: uint8 array [N] of rotated out paths masks of the leftover cards
+    :param pieces: int array [N, P, 2] of piece coordinates
+    :param objective: int array [N, 2] of objective coordinates, (-1, -1) denotes the leftover card
+    """
+
+    def __init__(self, masks, leftover, pieces, objective):
+        self.masks = masks
+        self.leftover = leftover
+        self.pieces = pieces
+        self.objective = objective
+        self.maze_size = masks.shape[1]
+        geometry = MazeGeometry.of(self.maze_size)
+        self.shift_locations = sorted(geometry.shift_locations, key=lambda location: (location.row, location.column))
+        self.opposing_shift_indices = np.array([
+            self.shift_locations.index(geometry.opposing_border_locations[location])
+            for location in self.shift_locations])
+        self._lines = [_line(geometry.shift_lines[location], self.maze_size) for location in self.shift_locations]
+
+    @classmethod
+    def from_boards(cls, boards):
+        """ Creates a batch from a list of Boards, which have the same maze size and number of pieces """
+        masks = np.array([[maze_card.rotated_out_paths_mask for maze_card in board.maze.maze_cards]
+                          for board in boards], dtype=np.uint8)
+        size = boards[0].maze.maze_size
+        masks = masks.reshape((len(boards), size, size))
+        leftover = np.array([board.leftover_card.rotated_out_paths_mask for board in boards], dtype=np.uint8)
+        pieces = np.array([[_coordinates(board.maze.maze_card_location(piece.maze_card)) for piece in board.pieces]
+                           for board in boards], dtype=np.int64).reshape((len(boards), -1, 2))
+        objective = np.array([_coordinates(board.maze.maze_card_location(board.objective_maze_card))
+                              for board in boards], dtype=np.int64)
+        return cls(masks, leftover, pieces, objective)
+
+    @property
+    def size(self):
+        """ The number of boards in this batch """
+        return self.masks.shape[0]
+
+    def shift(self, shift_indices, rotations):
+        """ Performs one shift on each board, with the same semantics as Board.shift().
+
+        :param shift_indices: int array [N] of indices into shift_locations
+        :param rotations: int array [N] of rotations of the leftover cards, in degrees
+        """
+        inserted = _ROTATED[_UNROTATED[self.leftover], (np.asarray(rotations) // 90) % 4]
+        for index in np.unique(shift_indices):
+            selected = np.flatnonzero(shift_indices == index)
+            location = self.shift_locations[index]
+            axis, line, step = self._lines[index]
+            if axis == 0:
+                lines = self.masks[selected, :, line]
+            else:
+                lines = self.masks[selected, line, :]
+            if step == 1:
+                pushed_out = lines[:, -1].copy()
+                shifted = np.concatenate([inserted[selected, None], lines[:, :-1]], axis=1)
+            else:
+                pushed_out = lines[:, 0].copy()
+                shifted = np.concatenate([lines[:, 1:], inserted[selected, None]], axis=1)
+            if axis == 0:
+                self.masks[selected, :, line] = shifted
+            else:
+                self.masks[selected, line, :] = shifted
+            self.leftover[selected] = pushed_out
+            self._shift_pieces(selected, axis, line, step)
+            self._shift_objective(selected, axis, line, step, location)
+
+    def _shift_pieces(self, selected, axis, line, step):
+        """ Moves pieces along the shifted line. A piece on the pushed out card is moved to the inserted card,
+        i.e. the coordinates along the line wrap around. """
+        pieces = self.pieces[selected]
+        on_line = pieces[:, :, 1 - axis] == line
+        pieces[:, :, axis] = np.where(on_line, (pieces[:, :, axis] + step) % self.maze_size, pieces[:, :, axis])
+        self.pieces[selected] = pieces
+
+    def _shift_objective(self, selected, axis, line, step, location):
+        """ Moves the objective along the shifted line. If it is pushed out, it becomes the leftover card,
+        and if it was the leftover, it is inserted. """
+        objective = self.objective[selected]
+        on_leftover = objective[:, 0] < 0
+        on_line = ~on_leftover & (objective[:, 1 - axis] == line)
+        moved = objective[:, axis] + step
+        pushed_out = on_line & ((moved < 0) | (moved >= self.maze_size))
+        objective[:, axis] = np.where(on_line, moved, objective[:, axis])
+        objective[pushed_out] = -1
+        objective[on_leftover] = (location.row, location.column)
+        self.objective[selected] = objective
+
+    def reachable(self, piece_index=0):
+        """ Determines all locations which are reachable by one piece of each board.
+
+        :param piece_index: the position of the piece in the pieces array
+        :return: a bool array [N, n, n]
+        """
+        masks = self.masks
+        connected_east = (masks[:, :, :-1] & _EAST).astype(bool) & (masks[:, :, 1:] & _WEST).astype(bool)
+        connected_south = (masks[:, :-1, :] & _SOUTH).astype(bool) & (masks[:, 1:, :] & _NORTH).astype(bool)
+        reached = np.zeros(masks.shape, dtype=bool)
+        boards = np.arange(self.size)
+        reached[boards, self.pieces[:, piece_index, 0], self.pieces[:, piece_index, 1]] = True
+        while True:
+            expanded = reached.copy()
+            expanded[:, :, 1:] |= reached[:, :, :-1] & connected_east
+            expanded[:, :, :-1] |= reached[:, :, 1:] & connected_east
+            expanded[:, 1:, :] |= reached[:, :-1, :] & connected_south
+            expanded[:, :-1, :] |= reached[:, 1:, :] & connected_south
+            if np.array_equal(expanded, reached):
+                return reached
+            reached = expanded
+
+    def move(self, piece_index, targets):
+        """ Moves one piece of each board. The targets are not validated.
+
+        :param piece_index: the position of the piece in the pieces array
+        :param targets: int array [N, 2] of target coordinates
+        :return: a bool array [N], True for the boards where the piece has reached the objective
+        """
+        self.pieces[:, piece_index] = targets
+        return np.all(targets == self.objective, axis=1)
+
+    def replace_objectives(self, selected, rng):
+        """ Draws new objectives for the selected boards, with the same distribution as Board:
+        uniformly from the leftover and all maze cards which are neither a corner nor occupied by a piece.
+
+        :param selected: int array of board indices
+        :param rng: a numpy.random.Generator
+        """
+        size = self.maze_size
+        candidates = np.ones((len(selected), size, size), dtype=bool)
+        candidates[:, [0, 0, -1, -1], [0, -1, 0, -1]] = False
+        pieces = self.pieces[selected]
+        for piece_index in range(pieces.shape[1]):
+            candidates[np.arange(len(selected)), pieces[:, piece_index, 0], pieces[:, piece_index, 1]] = False
+        counts = candidates.reshape((len(selected), -1)).sum(axis=1)
+        scores = rng.random(candidates.shape) * candidates
+        flat = scores.reshape((len(selected), -1)).argmax(axis=1)
+        objective = np.stack([flat // size, flat % size], axis=1)
+        on_leftover = rng.random(len(selected)) * (counts + 1) < 1
+        objective[on_leftover] = -1
+        self.objective[selected] = objective
+
+
+def random_rollouts(batch, turns, rng=None):
+    """ Plays the given number of turns on all boards of the batch, with random actions.
+
+    The pieces take turns in the order of the pieces array. Each turn consists of a random enabled shift location
+    (honouring the no-pushback rule), a random rotation, and a move to a random reachable location.
+    :param batch: a BoardBatch, which is altered
+    :param turns: the number of turns per board
+    :param rng: a numpy.random.Generator, defaults to a new unseeded generator
+    :return: int array [N, P], the number of objectives reached per board and piece
+    """
+    rng = rng or np.random.default_rng()
+    num_boards, num_pieces = batch.pieces.shape[0], batch.pieces.shape[1]
+    boards = np.arange(num_boards)
+    num_locations = len(batch.shift_locations)
+    size = batch.maze_size
+    scores = np.zeros((num_boards, num_pieces), dtype=np.int64)
+    disabled = np.full(num_boards, -1)
+    for turn in range(turns):
+        piece_index = turn % num_pieces
+        shift_indices = rng.integers(num_locations - 1, size=num_boards)
+        shift_indices = np.where((disabled >= 0) & (shift_indices >= disabled), shift_indices + 1, shift_indices)
+        shift_indices = np.where(disabled < 0, rng.integers(num_locations, size=num_boards), shift_indices)
+        batch.shift(shift_indices, rng.integers(4, size=num_boards) * 90)
+        disabled = batch.opposing_shift_indices[shift_indices]
+        reached = batch.reachable(piece_index)
+        flat = (rng.random(reached.shape) * reached).reshape((num_boards, -1)).argmax(axis=1)
+        targets = np.stack([flat // size, flat % size], axis=1)
+        has_reached = batch.move(piece_index, targets)
+        scores[boards[has_reached], piece_index] += 1
+        if has_reached.any():
+            batch.replace_objectives(boards[has_reached], rng)
+    return scores
+
+
+def _line(shift_line, size):
+    """ Translates the slice of flat indices of a shifted line (see MazeGeometry.shift_lines) to the axis along which
+    the line is shifted (0 for columns, 1 for rows), the index of the line, and the direction of the shift """
+    direction = 1 if shift_line.step > 0 else -1
+    if abs(shift_line.step) == size:
+        return 0, shift_line.start % size, direction
+    return 1, shift_line.start // size, direction
+
+
+def _coordinates(location):
+    return (location.row, location.column) if location is not None else (-1, -1)
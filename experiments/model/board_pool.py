@@ -0,0 +1,58 @@
+""" Measures the latency of creating a game, as it happens when the first player joins or the maze size is changed.
+
+For each maze size, games are created with factories.create_game() one after the other, with a short pause in between,
+as requests would arrive. This is done once without and once with a board pool for this size.
+The reported values are the median and 95th percentile of the latency of one creation, and the hit rate of the pool.
+
+    python board_pool.py --outfile board_pool.csv -s 7 -s 31
+"""
+import random
+import statistics
+import time
+
+import click
+
+import labyrinth.model.factories as factories
+from model._bench import print_row, write_csv
+
+
+@click.command()
+@click.option("--outfile", default=None, help="csv file to write the results to.")
+@click.option("--size", "-s", "sizes", multiple=True, type=int, default=[7, 15, 31], show_default=True)
+@click.option("--games", "num_games", default=200, show_default=True, help="Number of created games per size.")
+@click.option("--capacity", default=8, show_default=True, help="Capacity of the pool.")
+@click.option("--pause", default=20, show_default=True, help="Pause between two creations in milliseconds.")
+def run(outfile, sizes, num_games, capacity, pause):
+    rows = []
+    for size in sizes:
+        random.seed(size)
+        row = {"size": size}
+        for name, capacities in (("sync", None), ("pool", {size: capacity})):
+            pool = factories.configure_board_pool(capacities)
+            if pool:
+                pool.fill()
+            latencies = _measure(size, num_games, pause / 1000)
+            row[f"{name}-median[ms]"] = statistics.median(latencies) * 1000
+            row[f"{name}-p95[ms]"] = statistics.quantiles(latencies, n=20)[-1] * 1000
+            if pool:
+                metrics = pool.metrics()
+                row["hit-rate"] = metrics.hits / (metrics.hits + metrics.misses)
+        factories.configure_board_pool(None)
+        print_row(row)
+        rows.append(row)
+    if outfile:
+        write_csv(rows, outfile)
+
+
+def _measure(size, num_games, pause):
+    latencies = []
+    for game_id in range(num_games):
+        start = time.perf_counter()
+        factories.create_game(maze_size=size, game_id=game_id, with_delay=False)
+        latencies.append(time.perf_counter() - start)
+        time.sleep(pause)
+    return latencies
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,86 @@
+""" Measures the cost of locating the pieces of a board, once per turn.
+
+For each maze size, a board with four pieces is created. Each turn consists of a random shift,
+followed by locating all four pieces in the maze. Two variants of the lookup are timed:
+- 'scan' compares the pieces' maze cards with all maze cards of the maze, as Maze.maze_card_location did before,
+- 'index' uses Maze.maze_card_location, which looks up the maintained index of the maze card.
+The reported values are the costs per turn, with the cost of the shift itself subtracted.
+
+    python card_location.py --outfile card_location.csv -s 31
+"""
+import copy
+import random
+import timeit
+
+import click
+
+from labyrinth.model.factories import create_board
+from model._bench import print_row, write_csv
+
+
+@click.command()
+@click.option("--outfile", default=None, help="csv file to write the results to.")
+@click.option("--size", "-s", "sizes", multiple=True, type=int, default=[7, 15, 31], show_default=True)
+@click.option("--pieces", "num_pieces", default=4, show_default=True, help="Number of pieces on the board.")
+@click.option("--turns", "num_turns", default=200, show_default=True, help="Number of turns per size.")
+@click.option("--repeats", default=5, show_default=True)
+def run(outfile, sizes, num_pieces, num_turns, repeats):
+    rows = []
+    for size in sizes:
+        board = create_board(maze_size=size)
+        for _ in range(num_pieces):
+            board.create_piece()
+        shift_locations = [location for location in board.maze.geometry.shift_lines
+                           if location.row % 2 == 1 or location.column % 2 == 1]
+        shifts = [random.choice(shift_locations) for _ in range(num_turns)]
+        timings = {}
+        for name, variant in VARIANTS.items():
+            timer = timeit.Timer(lambda: variant(copy.deepcopy(board), shifts))
+            timings[name] = min(timer.repeat(repeats, 1)) / num_turns * 1000
+        row = {"size": size,
+               "scan[ms]": timings["scan"] - timings["shift"],
+               "index[ms]": timings["index"] - timings["shift"]}
+        row["speedup"] = row["scan[ms]"] / row["index[ms]"]
+        print_row(row, precision=4)
+        rows.append(row)
+    if outfile:
+        write_csv(rows, outfile)
+
+
+def _shift(board, shifts):
+    maze = board.maze
+    leftover = board.leftover_card
+    for location in shifts:
+        leftover = maze.shift(location, leftover)
+
+
+def _shift_scan(board, shifts):
+    maze = board.maze
+    leftover = board.leftover_card
+    for location in shifts:
+        leftover = maze.shift(location, leftover)
+        for piece in board.pieces:
+            _scan(maze, piece.maze_card)
+
+
+def _shift_index(board, shifts):
+    maze = board.maze
+    leftover = board.leftover_card
+    for location in shifts:
+        leftover = maze.shift(location, leftover)
+        for piece in board.pieces:
+            maze.maze_card_location(piece.maze_card)
+
+
+def _scan(maze, maze_card):
+    for location, current_maze_card in zip(maze.maze_locations, maze.maze_cards):
+        if current_maze_card == maze_card:
+            return location
+    return None
+
+
+VARIANTS = {"shift": _shift, "scan": _shift_scan, "index": _shift_index}
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,45 @@
+""" Compares Board.clone() and Game.clone() with copy.deepcopy().
+
+For each maze size, a game with four players is created. Its board and the game itself
+are copied with both methods. The reported values are the costs of one copy.
+
+    python clone.py --outfile clone.csv -s 7 -s 31
+"""
+import copy
+import timeit
+
+import click
+
+from labyrinth.model.factories import create_game
+from labyrinth.model.game import Player
+from model._bench import print_row, write_csv
+
+
+@click.command()
+@click.option("--outfile", default=None, help="csv file to write the results to.")
+@click.option("--size", "-s", "sizes", multiple=True, type=int, default=[7, 15, 31], show_default=True)
+@click.option("--number", default=100, show_default=True, help="Number of copies per measurement.")
+@click.option("--repeats", default=5, show_default=True)
+def run(outfile, sizes, number, repeats):
+    rows = []
+    for size in sizes:
+        game = create_game(maze_size=size, with_delay=False)
+        for player_id in range(4):
+            game.add_player(Player(player_id))
+        game.board.maze.component_index()
+        row = {"size": size}
+        for name, copy_method in [("board-deepcopy", lambda: copy.deepcopy(game.board)),
+                                  ("board-clone", game.board.clone),
+                                  ("game-deepcopy", lambda: copy.deepcopy(game)),
+                                  ("game-clone", game.clone)]:
+            row[f"{name}[ms]"] = min(timeit.repeat(copy_method, number=number, repeat=repeats)) / number * 1000
+        row["board-speedup"] = row["board-deepcopy[ms]"] / row["board-clone[ms]"]
+        row["game-speedup"] = row["game-deepcopy[ms]"] / row["game-clone[ms]"]
+        print_row(row)
+        rows.append(row)
+    if outfile:
+        write_csv(rows, outfile)
+
+
+if __name__ == "__main__":
+    run()
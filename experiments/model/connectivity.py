@@ -0,0 +1,79 @@
+""" Measures the cost of keeping the connected components of a maze up to date during a series of shifts.
+
+For each maze size, a random maze is shifted repeatedly with random shift locations and rotations.
+Three variants are timed:
+- 'shift' only performs the shifts, without any connectivity information,
+- 'incremental' keeps the component index of the maze current, which updates it after each shift,
+- 'rebuild' creates a new ComponentIndex after each shift.
+The reported values are the costs per shift, with the cost of the shift itself subtracted.
+
+    python connectivity.py --outfile connectivity.csv -s 7 -s 15 -s 31
+"""
+import copy
+import random
+import timeit
+
+import click
+
+from labyrinth.model.factories import create_maze_and_leftover
+from labyrinth.model.reachable import ComponentIndex
+from model._bench import print_row, write_csv
+
+
+@click.command()
+@click.option("--outfile", default=None, help="csv file to write the results to.")
+@click.option("--size", "-s", "sizes", multiple=True, type=int, default=[7, 9, 11, 15, 21, 31], show_default=True)
+@click.option("--shifts", "num_shifts", default=200, show_default=True, help="Number of shifts per size.")
+@click.option("--repeats", default=5, show_default=True)
+def run(outfile, sizes, num_shifts, repeats):
+    rows = []
+    for size in sizes:
+        maze, leftover = create_maze_and_leftover(size)
+        shifts = _random_shifts(size, num_shifts)
+        timings = {}
+        for name, variant in VARIANTS.items():
+            timer = timeit.Timer(lambda: variant(*copy.deepcopy((maze, leftover)), shifts))
+            timings[name] = min(timer.repeat(repeats, 1)) / num_shifts * 1000
+        row = {"size": size,
+               "incremental[ms]": timings["incremental"] - timings["shift"],
+               "rebuild[ms]": timings["rebuild"] - timings["shift"]}
+        row["speedup"] = row["rebuild[ms]"] / row["incremental[ms]"]
+        print_row(row)
+        rows.append(row)
+    if outfile:
+        write_csv(rows, outfile)
+
+
+def _random_shifts(size, num_shifts):
+    shift_locations = [location for location in create_maze_and_leftover(size)[0].maze_locations
+                       if location.row in [0, size - 1] or location.column in [0, size - 1]
+                       if location.row % 2 == 1 or location.column % 2 == 1]
+    return [(random.choice(shift_locations), random.choice([0, 90, 180, 270])) for _ in range(num_shifts)]
+
+
+def _shift(maze, leftover, shifts):
+    for location, rotation in shifts:
+        leftover.rotation = rotation
+        leftover = maze.shift(location, leftover)
+
+
+def _shift_incremental(maze, leftover, shifts):
+    maze.component_index()
+    for location, rotation in shifts:
+        leftover.rotation = rotation
+        leftover = maze.shift(location, leftover)
+        maze.component_index()
+
+
+def _shift_rebuild(maze, leftover, shifts):
+    for location, rotation in shifts:
+        leftover.rotation = rotation
+        leftover = maze.shift(location, leftover)
+        ComponentIndex(maze)
+
+
+VARIANTS = {"shift": _shift, "incremental": _shift_incremental, "rebuild": _shift_rebuild}
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,58 @@
+""" Compares the persisted encodings of a game: JSON of the DTOs of the parts of a game (mapper.persistence),
+and the binary encoding of the parts (mapper.binary).
+
+For each maze size, a game with four players is created. The reported values are the size of all parts in bytes,
+the time to encode the game (game_to_parts, and json.dumps for each part),
+the time to decode it (json.loads for each part and parts_to_game),
+and the size of the turn state part, which is all that is written on a turn change.
+
+    python encoding.py --outfile encoding.csv -s 7 -s 31
+"""
+import json
+import random
+import timeit
+
+import click
+
+import labyrinth.mapper.binary as binary
+import labyrinth.mapper.persistence as persistence
+from labyrinth.mapper.persistence import GameParts
+from labyrinth.model.factories import create_game
+from labyrinth.model.game import Player
+from model._bench import print_row, write_csv
+
+
+@click.command()
+@click.option("--outfile", default=None, help="csv file to write the results to.")
+@click.option("--size", "-s", "sizes", multiple=True, type=int, default=[7, 15, 31], show_default=True)
+@click.option("--number", default=200, show_default=True, help="Number of encodings and decodings per measurement.")
+@click.option("--repeats", default=5, show_default=True)
+def run(outfile, sizes, number, repeats):
+    rows = []
+    for size in sizes:
+        random.seed(size)
+        game = create_game(maze_size=size, game_id=1, with_delay=False)
+        for player_id in range(1, 5):
+            game.add_player(Player(player_id))
+        encodings = {"json": (lambda: GameParts(*map(json.dumps, persistence.game_to_parts(game))),
+                              lambda parts: persistence.parts_to_game(GameParts(*map(json.loads, parts)))),
+                     "binary": (lambda: binary.game_to_parts(game), binary.parts_to_game)}
+        row = {"size": size}
+        for name, (encode, decode) in encodings.items():
+            parts = encode()
+            row[f"{name}[bytes]"] = sum(map(len, parts))
+            row[f"{name}-encode[ms]"] = _measure(encode, number, repeats)
+            row[f"{name}-decode[ms]"] = _measure(lambda: decode(parts), number, repeats)
+            row[f"{name}-turn-state[bytes]"] = len(parts.turn_state)
+        print_row(row)
+        rows.append(row)
+    if outfile:
+        write_csv(rows, outfile)
+
+
+def _measure(function, number, repeats):
+    return min(timeit.repeat(function, number=number, repeat=repeats)) / number * 1000
+
+
+if __name__ == "__main__":
+    run()
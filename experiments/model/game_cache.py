@@ -0,0 +1,99 @@
+""" Measures the latency of requests to a game stored in a sqlite database, with and without a GameCache.
+
+For each maze size, a game with two players is stored in a temporary database. Then, each request opens a
+DatabaseGateway, as the API does, and either retrieves the game state like a GET state request, or performs
+the next shift or move of a player. This is repeated without cache, and with a write-through and a write-behind cache.
+The reported values are the mean latency of both kinds of requests, and the hit rate of the cache.
+
+    python game_cache.py --outfile game_cache.csv -s 7 -s 31
+"""
+from datetime import datetime
+import os
+import random
+import statistics
+import tempfile
+import time
+
+import click
+
+from labyrinth import database
+from labyrinth.database import DatabaseGateway, close_connection_pools
+from labyrinth.game_cache import GameCache, WRITE_THROUGH, WRITE_BEHIND
+from labyrinth.model.factories import create_game
+from labyrinth.model.game import Player, PlayerAction
+from labyrinth.model.interactors import GameRepository, ObserveGameInteractor, PlayerActionInteractor
+from model._bench import print_row, write_csv
+
+
+@click.command()
+@click.option("--outfile", default=None, help="csv file to write the results to.")
+@click.option("--size", "-s", "sizes", multiple=True, type=int, default=[7, 15, 31], show_default=True)
+@click.option("--requests", "num_requests", default=500, show_default=True, help="Number of requests per kind.")
+def run(outfile, sizes, num_requests):
+    rows = []
+    for size in sizes:
+        for durability in (None, WRITE_THROUGH, WRITE_BEHIND):
+            random.seed(size)
+            row = {"size": size, "cache": durability or "none", **_measure(size, durability, num_requests)}
+            print_row(row)
+            rows.append(row)
+    if outfile:
+        write_csv(rows, outfile)
+
+
+def _measure(size, durability, num_requests):
+    file_descriptor, db_path = tempfile.mkstemp()
+    settings = {"DATABASE": db_path, "GAME_STATE_ENCODING": "binary"}
+    cache = GameCache(settings, capacity=8, durability=durability, flush_interval=1) if durability else None
+    try:
+        _create_database(settings, size)
+        read_latencies, action_latencies = [], []
+        for _ in range(num_requests):
+            start = time.perf_counter()
+            with DatabaseGateway(settings) as gateway:
+                ObserveGameInteractor(GameRepository(gateway, cache)).retrieve_game(1)
+            read_latencies.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            with DatabaseGateway(settings) as gateway:
+                _perform_next_action(GameRepository(gateway, cache))
+            action_latencies.append(time.perf_counter() - start)
+        result = {"read[ms]": statistics.mean(read_latencies) * 1000,
+                  "action[ms]": statistics.mean(action_latencies) * 1000}
+        if cache:
+            metrics = cache.metrics()
+            result["hit-rate"] = metrics.hits / (metrics.hits + metrics.misses)
+            cache.close()
+        return result
+    finally:
+        close_connection_pools()
+        os.close(file_descriptor)
+        for path in (db_path, db_path + "-wal", db_path + "-shm"):
+            if os.path.exists(path):
+                os.unlink(path)
+
+
+def _create_database(settings, size):
+    with DatabaseGateway(settings) as gateway:
+        gateway._db().executescript(database._SCHEMA)
+        game = create_game(maze_size=size, game_id=1, with_delay=False)
+        for player_id in (1, 2):
+            game.add_player(Player(player_id))
+        gateway.create_game(game, game_id=1)
+        gateway.update_action_timestamp(1, datetime.now())
+
+
+def _perform_next_action(repository):
+    game = repository.find_by_id(1)
+    player = game.next_player()
+    interactor = PlayerActionInteractor(repository)
+    if game.turns.next_action() == PlayerAction.SHIFT_ACTION:
+        shift_location = random.choice(sorted(game.get_enabled_shift_locations(),
+                                              key=lambda location: (location.row, location.column)))
+        interactor.perform_shift(1, player.identifier, shift_location, random.choice([0, 90, 180, 270]))
+    else:
+        piece_location = game.board.maze.maze_card_location(player.piece.maze_card)
+        interactor.perform_move(1, player.identifier, piece_location)
+
+
+if __name__ == "__main__":
+    run()
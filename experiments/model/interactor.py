@@ -0,0 +1,88 @@
+""" Measures the latency of PlayerActionInteractor.perform_shift() and perform_move() against an in-memory repository.
+
+For each maze size, a game with four players is stored in an in-memory data access object, which keeps the
+JSON representation of the game, as the database does. Then, the players perform random valid shifts and moves
+through the interactor, i.e. each action loads the game from JSON, performs the action and stores it again.
+The reported values are the mean, median and 95th percentile of the latency of one action.
+
+    python interactor.py --outfile interactor.csv -s 7 -s 31
+"""
+import json
+import random
+import statistics
+import time
+
+import click
+
+import labyrinth.mapper.persistence as mapper
+from labyrinth.model.factories import create_game
+from labyrinth.model.game import Player, PlayerAction
+from labyrinth.model.interactors import GameRepository, PlayerActionInteractor
+from model._bench import print_row, write_csv
+
+
+class InMemoryDataAccess:
+    """ Stores games as JSON strings, with the subset of the interface of DatabaseGateway used by GameRepository """
+
+    def __init__(self):
+        self._game_states = {}
+
+    def create_game(self, game, game_id=0):
+        self._game_states[game_id] = json.dumps(mapper.game_to_dto(game))
+
+    def load_game(self, game_id, for_update=False, with_timestamps=False):
+        return mapper.dto_to_game(json.loads(self._game_states[game_id]))
+
+    def update_game(self, game_id, game):
+        self._game_states[game_id] = json.dumps(mapper.game_to_dto(game))
+
+    def register_game_created_listener(self, listener):
+        pass
+
+
+@click.command()
+@click.option("--outfile", default=None, help="csv file to write the results to.")
+@click.option("--size", "-s", "sizes", multiple=True, type=int, default=[7, 15, 31], show_default=True)
+@click.option("--actions", "num_actions", default=2000, show_default=True, help="Number of actions per size.")
+def run(outfile, sizes, num_actions):
+    rows = []
+    for size in sizes:
+        random.seed(size)
+        latencies = _measure(size, num_actions)
+        row = {"size": size,
+               "mean[ms]": statistics.mean(latencies) * 1000,
+               "median[ms]": statistics.median(latencies) * 1000,
+               "p95[ms]": statistics.quantiles(latencies, n=20)[-1] * 1000}
+        print_row(row)
+        rows.append(row)
+    if outfile:
+        write_csv(rows, outfile)
+
+
+def _measure(size, num_actions):
+    game = create_game(maze_size=size, game_id=1, with_delay=False)
+    for player_id in range(1, 5):
+        game.add_player(Player(player_id))
+    data_access = InMemoryDataAccess()
+    data_access.create_game(game, game_id=1)
+    repository = GameRepository(data_access)
+    interactor = PlayerActionInteractor(repository)
+    latencies = []
+    for _ in range(num_actions):
+        game = repository.find_by_id(1)
+        player = game.next_player()
+        if game.turns.next_action() == PlayerAction.SHIFT_ACTION:
+            shift_location = random.choice(sorted(game.get_enabled_shift_locations(),
+                                                  key=lambda location: (location.row, location.column)))
+            start = time.perf_counter()
+            interactor.perform_shift(1, player.identifier, shift_location, random.choice([0, 90, 180, 270]))
+        else:
+            piece_location = game.board.maze.maze_card_location(player.piece.maze_card)
+            start = time.perf_counter()
+            interactor.perform_move(1, player.identifier, piece_location)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+if __name__ == "__main__":
+    run()
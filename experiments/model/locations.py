@@ -0,0 +1,71 @@
+""" Measures the cost of BoardLocation values in the hot paths of the model.
+
+For each maze size, a game with four players is created, with a fixed seed. The following operations are measured:
+* reachable: Graph.reachable_locations() for each of the four pieces
+* restore: dto_to_game() of the persisted game, i.e. the first step of each request
+* create: BoardLocation(row, column) for each location of the maze, as done by mappers and tests
+For each operation, the CPU time and the peak of traced memory (tracemalloc) are reported.
+Additionally, the size of a single BoardLocation instance is reported, including its __dict__ if it has one.
+
+    python locations.py --outfile locations.csv -s 7 -s 31
+"""
+import json
+import random
+import sys
+import timeit
+import tracemalloc
+
+import click
+
+import labyrinth.mapper.persistence as mapper
+from labyrinth.model.factories import create_game
+from labyrinth.model.game import BoardLocation, Player
+from labyrinth.model.reachable import Graph
+from model._bench import print_row, write_csv
+
+
+@click.command()
+@click.option("--outfile", default=None, help="csv file to write the results to.")
+@click.option("--size", "-s", "sizes", multiple=True, type=int, default=[7, 15, 31], show_default=True)
+@click.option("--number", default=100, show_default=True, help="Number of operations per time measurement.")
+@click.option("--repeats", default=5, show_default=True)
+def run(outfile, sizes, number, repeats):
+    location = BoardLocation(1, 2)
+    instance_size = sys.getsizeof(location) + (sys.getsizeof(vars(location)) if hasattr(location, "__dict__") else 0)
+    print(f"size of BoardLocation: {instance_size} bytes")
+    rows = []
+    for size in sizes:
+        random.seed(size)
+        game = create_game(maze_size=size, with_delay=False)
+        for player_id in range(4):
+            game.add_player(Player(player_id))
+        maze = game.board.maze
+        piece_locations = [maze.maze_card_location(piece.maze_card) for piece in game.board.pieces]
+        dto = json.loads(json.dumps(mapper.game_to_dto(game)))
+
+        def reachable():
+            graph = Graph(maze)
+            return [graph.reachable_locations(piece_location) for piece_location in piece_locations]
+
+        def create():
+            return [BoardLocation(row, column) for row in range(size) for column in range(size)]
+
+        row = {"size": size, "instance[B]": instance_size}
+        for name, operation in [("reachable", reachable), ("restore", lambda: mapper.dto_to_game(dto)),
+                                ("create", create)]:
+            operation()
+            tracemalloc.start()
+            result = operation()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            del result
+            row[f"{name}-peak[KiB]"] = peak / 1024
+            row[f"{name}[ms]"] = min(timeit.repeat(operation, number=number, repeat=repeats)) / number * 1000
+        print_row(row)
+        rows.append(row)
+    if outfile:
+        write_csv(rows, outfile)
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,39 @@
+""" Measures the cost of drawing a new objective, as it happens each time a piece reaches its objective.
+
+For each maze size, a board with four pieces is created, and its objective generator is seeded.
+The reported value is the cost of one call of Board._find_new_objective_maze_card().
+
+    python objective.py --outfile objective.csv -s 7 -s 31
+"""
+import random
+import timeit
+
+import click
+
+from labyrinth.model.factories import create_board
+from model._bench import print_row, write_csv
+
+
+@click.command()
+@click.option("--outfile", default=None, help="csv file to write the results to.")
+@click.option("--size", "-s", "sizes", multiple=True, type=int, default=[7, 15, 31], show_default=True)
+@click.option("--number", default=1000, show_default=True, help="Number of draws per measurement.")
+@click.option("--repeats", default=5, show_default=True)
+@click.option("--seed", default=0, show_default=True)
+def run(outfile, sizes, number, repeats, seed):
+    rows = []
+    for size in sizes:
+        board = create_board(maze_size=size)
+        for _ in range(4):
+            board.create_piece()
+        board.rng = random.Random(seed)
+        draw = board._find_new_objective_maze_card
+        row = {"size": size, "draw[us]": min(timeit.repeat(draw, number=number, repeat=repeats)) / number * 1e6}
+        print_row(row)
+        rows.append(row)
+    if outfile:
+        write_csv(rows, outfile)
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,69 @@
+""" Measures the cost of the delayed transitions of many concurrent games.
+
+For each number of games, a turn progression with two players and a prepare delay is started per game.
+Then, each game performs a shift and a move action every few milliseconds, so that each game constantly
+waits for the transitions after the prepare delay. The reported values are the peak number of threads of the process,
+and the number of performed actions per second. If the scheduler of the model is available,
+its mean and maximum lateness are reported as well.
+
+    python prepare_delay.py --outfile prepare_delay.csv -g 10 -g 100
+"""
+import threading
+import time
+from datetime import timedelta
+
+import click
+
+from labyrinth.model.game import Player, PlayerAction, Turns
+from model._bench import print_row, write_csv
+
+
+@click.command()
+@click.option("--outfile", default=None, help="csv file to write the results to.")
+@click.option("--games", "-g", "num_games", multiple=True, type=int, default=[10, 100, 500], show_default=True)
+@click.option("--delay", default=20, show_default=True, help="Prepare delay in milliseconds.")
+@click.option("--duration", default=2.0, show_default=True, help="Duration of each measurement in seconds.")
+def run(outfile, num_games, delay, duration):
+    rows = []
+    for games in num_games:
+        row = {"games": games, **_measure(games, timedelta(milliseconds=delay), duration)}
+        print_row(row)
+        rows.append(row)
+    if outfile:
+        write_csv(rows, outfile)
+
+
+def _measure(num_games, prepare_delay, duration):
+    games = []
+    for _ in range(num_games):
+        players = [Player(1), Player(2)]
+        turns = Turns(prepare_delay=prepare_delay, players=players)
+        turns.start()
+        games.append(turns)
+    peak_threads, actions = 0, 0
+    scheduler = getattr(games[0], "scheduler", None)
+    initial_metrics = scheduler.metrics() if scheduler else None
+    start = time.perf_counter()
+    while time.perf_counter() - start < duration:
+        for turns in games:
+            action = turns.next_action() if hasattr(turns, "next_action") else turns.next_player_action().action
+            if action in (PlayerAction.SHIFT_ACTION, PlayerAction.MOVE_ACTION):
+                player = turns.next_player() if hasattr(turns, "next_player") else turns.next_player_action().player
+                turns.perform_action(player, action)
+                actions += 1
+        peak_threads = max(peak_threads, threading.active_count())
+        time.sleep(0.002)
+    result = {"peak-threads": peak_threads, "actions/s": actions / duration}
+    if scheduler:
+        metrics = scheduler.metrics()
+        executed = metrics.executed - initial_metrics.executed
+        result["mean-lateness[ms]"] = metrics.mean_lateness * 1000 if executed else 0.0
+        result["max-lateness[ms]"] = metrics.max_lateness * 1000
+    for turns in games:
+        turns.init()
+    time.sleep(prepare_delay.total_seconds() * 2)
+    return result
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,65 @@
+""" Compares the reachability engines of labyrinth.model.reachable.
+
+For each maze size, a number of random mazes is generated with the layout rules of the original game.
+For each maze, all reachable locations of a random source location are computed with the BFS (Graph),
+the bitboard flood fill (BitboardGraph), and the union-find labeling (ComponentIndex).
+The columns '<engine>[ms]' include the construction of the engine, as both Board and Bot create a new instance
+for every query. The columns '<engine>-query[ms]' only measure the query on an already constructed engine.
+
+    python reachability.py --outfile reachability.csv -s 7 -s 15 -s 31
+"""
+import random
+import timeit
+
+import click
+
+from labyrinth.model.factories import create_maze_and_leftover
+from labyrinth.model.reachable import Graph, BitboardGraph, ComponentIndex
+from model._bench import print_row, write_csv
+
+ENGINES = {"bfs": Graph, "bitboard": BitboardGraph, "components": ComponentIndex}
+
+
+@click.command()
+@click.option("--outfile", default=None, help="csv file to write the results to.")
+@click.option("--size", "-s", "sizes", multiple=True, type=int, default=[7, 9, 11, 15, 21, 31], show_default=True)
+@click.option("--mazes", "num_mazes", default=20, show_default=True, help="Number of random mazes per size.")
+@click.option("--repeats", default=5, show_default=True)
+def run(outfile, sizes, num_mazes, repeats):
+    rows = []
+    for size in sizes:
+        instances = _create_instances(size, num_mazes)
+        row = {"size": size}
+        for name, engine in ENGINES.items():
+            timer = timeit.Timer(lambda: _reachable_locations(engine, instances))
+            row[f"{name}[ms]"] = min(timer.repeat(repeats, 1)) / num_mazes * 1000
+        for name, engine in ENGINES.items():
+            graphs = [(engine(maze), source) for maze, source in instances]
+            timer = timeit.Timer(lambda: _query_reachable_locations(graphs))
+            row[f"{name}-query[ms]"] = min(timer.repeat(repeats, 1)) / num_mazes * 1000
+        print_row(row)
+        rows.append(row)
+    if outfile:
+        write_csv(rows, outfile)
+
+
+def _create_instances(size, num_mazes):
+    instances = []
+    for _ in range(num_mazes):
+        maze, _ = create_maze_and_leftover(size)
+        instances.append((maze, random.choice(maze.maze_locations)))
+    return instances
+
+
+def _reachable_locations(engine, instances):
+    for maze, source in instances:
+        engine(maze).reachable_locations(source)
+
+
+def _query_reachable_locations(graphs):
+    for graph, source in graphs:
+        graph.reachable_locations(source)
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,61 @@
+""" Measures the CPU time of the model part of a player action request.
+
+Each request of the API loads the game from its persisted DTO, performs an action and persists the game again.
+This script replays this cycle for a game with two players, alternating shift and move actions:
+json.loads -> dto_to_game -> game.shift / game.move -> game_to_dto -> json.dumps
+The database access itself is not part of the measurement.
+
+    python request_cycle.py --outfile request_cycle.csv -s 7 -s 15 -s 31
+"""
+import json
+import random
+import timeit
+
+import click
+
+import labyrinth.model.factories as factories
+import labyrinth.mapper.persistence as mapper
+from labyrinth.model.game import Player
+from model._bench import print_row, write_csv
+
+
+@click.command()
+@click.option("--outfile", default=None, help="csv file to write the results to.")
+@click.option("--size", "-s", "sizes", multiple=True, type=int, default=[7, 9, 11, 15, 21, 31], show_default=True)
+@click.option("--requests", "num_requests", default=200, show_default=True, help="Number of requests per size.")
+@click.option("--repeats", default=5, show_default=True)
+def run(outfile, sizes, num_requests, repeats):
+    rows = []
+    for size in sizes:
+        game_json = _create_game_json(size)
+        timer = timeit.Timer(lambda: _replay_requests(game_json, num_requests))
+        row = {"size": size, "request[ms]": min(timer.repeat(repeats, 1)) / num_requests * 1000}
+        print_row(row)
+        rows.append(row)
+    if outfile:
+        write_csv(rows, outfile)
+
+
+def _create_game_json(size):
+    game = factories.create_game(maze_size=size, with_delay=False)
+    for player_id in [1, 2]:
+        game.add_player(Player(player_id))
+    return json.dumps(mapper.game_to_dto(game))
+
+
+def _replay_requests(game_json, num_requests):
+    random.seed(0)
+    for _ in range(num_requests):
+        game = mapper.dto_to_game(json.loads(game_json))
+        player = game.next_player()
+        if game.turns.is_action_possible(player, "SHIFT"):
+            shift_location = random.choice(sorted(game.get_enabled_shift_locations(), key=str))
+            game.shift(player.identifier, shift_location, random.choice([0, 90, 180, 270]))
+        else:
+            piece_location = game.board.maze.maze_card_location(player.piece.maze_card)
+            game.move(player.identifier, piece_location)
+        game_json = json.dumps(mapper.game_to_dto(game))
+
+
+if __name__ == "__main__":
+    run()
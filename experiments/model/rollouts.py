@@ -0,0 +1,55 @@
+""" Measures the throughput of random rollouts with the NumPy batch engine (batch.py).
+
+For each maze size and batch size, a batch of random boards with two pieces is created,
+and a number of turns is played on all boards with random_rollouts().
+As a baseline, the same number of turns is played on a single game with the headless simulator and RandomPolicy.
+The reported values are turns per second, summed over all boards of the batch.
+
+    python rollouts.py -s 7 -s 15 -b 1 -b 100 -b 1000 --outfile rollouts.csv
+"""
+import time
+
+import click
+import numpy as np
+
+from labyrinth.model import factories
+from labyrinth.model.simulator import RandomPolicy, play_game
+from model.batch import BoardBatch, random_rollouts
+from model._bench import print_row, write_csv
+
+
+@click.command()
+@click.option("--outfile", default=None, help="csv file to write the results to.")
+@click.option("--size", "-s", "sizes", multiple=True, type=int, default=[7, 15], show_default=True)
+@click.option("--batch-size", "-b", "batch_sizes", multiple=True, type=int, default=[1, 10, 100, 1000],
+              show_default=True)
+@click.option("--turns", default=100, show_default=True, help="Number of turns per board.")
+def run(outfile, sizes, batch_sizes, turns):
+    rows = []
+    for size in sizes:
+        start = time.perf_counter()
+        result = play_game([RandomPolicy(), RandomPolicy()], maze_size=size, target_score=turns, max_turns=turns)
+        simulator_rate = result.turns / (time.perf_counter() - start)
+        for batch_size in batch_sizes:
+            batch = BoardBatch.from_boards(_boards(batch_size, size))
+            start = time.perf_counter()
+            random_rollouts(batch, turns, rng=np.random.default_rng())
+            batch_rate = batch_size * turns / (time.perf_counter() - start)
+            row = {"size": size, "batch": batch_size, "simulator[turns/s]": simulator_rate,
+                   "batch[turns/s]": batch_rate, "speedup": batch_rate / simulator_rate}
+            print_row(row, precision=1)
+            rows.append(row)
+    if outfile:
+        write_csv(rows, outfile)
+
+
+def _boards(batch_size, size):
+    boards = [factories.create_board(maze_size=size) for _ in range(batch_size)]
+    for board in boards:
+        board.create_piece()
+        board.create_piece()
+    return boards
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,42 @@
+""" Plays games between policies with the headless simulator, and reports the throughput.
+
+For each maze size, the given number of games is played between the given policies (one player per policy).
+The reported values are games per second, move actions per second, and the number of wins per policy.
+
+    python simulate.py -p greedy -p random --games 50 -s 7 -s 15 --outfile simulate.csv
+"""
+import click
+
+from labyrinth.model.simulator import RandomPolicy, GreedyPolicy, simulate
+from model._bench import print_row, write_csv
+
+POLICIES = {"random": RandomPolicy, "greedy": GreedyPolicy}
+
+
+@click.command()
+@click.option("--outfile", default=None, help="csv file to write the results to.")
+@click.option("--policy", "-p", "policy_names", multiple=True, type=click.Choice(list(POLICIES)),
+              default=["greedy", "random"], show_default=True, help="One policy per player.")
+@click.option("--size", "-s", "sizes", multiple=True, type=int, default=[7], show_default=True)
+@click.option("--games", default=20, show_default=True, help="Number of games per size.")
+@click.option("--target-score", default=3, show_default=True, help="Number of objectives to win a game.")
+@click.option("--max-turns", default=1000, show_default=True, help="Maximum number of turns per game.")
+def run(outfile, policy_names, sizes, games, target_score, max_turns):
+    rows = []
+    for size in sizes:
+        policies = [POLICIES[name]() for name in policy_names]
+        report = simulate(policies, games, maze_size=size, target_score=target_score, max_turns=max_turns)
+        row = {"size": size, "games": report.games, "moves": report.moves,
+               "games/s": report.games_per_second, "moves/s": report.moves_per_second}
+        wins = report.wins
+        for index, name in enumerate(policy_names):
+            row[f"wins-{index}-{name}"] = wins[index]
+        row["draws"] = wins[None]
+        print_row(row, precision=2)
+        rows.append(row)
+    if outfile:
+        write_csv(rows, outfile)
+
+
+if __name__ == "__main__":
+    run()
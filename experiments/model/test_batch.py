@@ -0,0 +1,94 @@
+""" Tests for module batch, cross-validated with Board and Graph.
+Run them from this folder with pytest, with the backend and the experiments folder on the PYTHONPATH """
+import random
+
+import numpy as np
+import pytest
+
+from labyrinth.model import factories
+from labyrinth.model.game import BoardLocation
+from labyrinth.model.reachable import Graph
+
+from model import batch as batch_module
+
+
+def _boards(num_boards, maze_size=7, num_pieces=2):
+    boards = [factories.create_board(maze_size=maze_size) for _ in range(num_boards)]
+    for board in boards:
+        for _ in range(num_pieces):
+            board.create_piece()
+    return boards
+
+
+def _assert_batch_equals_boards(batch, boards):
+    expected = batch_module.BoardBatch.from_boards(boards)
+    assert np.array_equal(batch.masks, expected.masks)
+    assert np.array_equal(batch.leftover, expected.leftover)
+    assert np.array_equal(batch.pieces, expected.pieces)
+    assert np.array_equal(batch.objective, expected.objective)
+
+
+def test_from_boards_represents_boards():
+    """ Tests from_boards """
+    boards = _boards(3)
+    batch = batch_module.BoardBatch.from_boards(boards)
+    assert batch.masks.shape == (3, 7, 7)
+    for board_index, board in enumerate(boards):
+        for location in board.maze.maze_locations:
+            assert batch.masks[board_index, location.row, location.column] == \
+                board.maze[location].rotated_out_paths_mask
+        piece_location = board.maze.maze_card_location(board.pieces[1].maze_card)
+        assert tuple(batch.pieces[board_index, 1]) == (piece_location.row, piece_location.column)
+
+
+@pytest.mark.parametrize("maze_size", [5, 7, 9])
+def test_series_of_shifts_equals_board_shift(maze_size):
+    """ Performs random shifts on boards and on the batch, and compares the states after each shift """
+    boards = _boards(8, maze_size=maze_size)
+    batch = batch_module.BoardBatch.from_boards(boards)
+    for _ in range(20):
+        shift_indices = np.array([random.randrange(len(batch.shift_locations)) for _ in boards])
+        rotations = np.array([random.choice([0, 90, 180, 270]) for _ in boards])
+        for board, shift_index, rotation in zip(boards, shift_indices, rotations):
+            board.shift(batch.shift_locations[shift_index], int(rotation))
+        batch.shift(shift_indices, rotations)
+        _assert_batch_equals_boards(batch, boards)
+
+
+def test_shift_moves_objective_through_leftover():
+    """ Tests that a pushed out objective becomes the leftover, and is inserted again by the opposite shift """
+    board = _boards(1, num_pieces=1)[0]
+    board._objective_maze_card = board.maze[BoardLocation(6, 1)]
+    batch = batch_module.BoardBatch.from_boards([board])
+    shift_index = batch.shift_locations.index(BoardLocation(0, 1))
+    batch.shift(np.array([shift_index]), np.array([0]))
+    assert tuple(batch.objective[0]) == (-1, -1)
+    shift_index = batch.shift_locations.index(BoardLocation(6, 1))
+    batch.shift(np.array([shift_index]), np.array([0]))
+    assert tuple(batch.objective[0]) == (6, 1)
+
+
+@pytest.mark.parametrize("maze_size", [5, 7, 15])
+def test_reachable_equals_graph(maze_size):
+    """ Compares reachable locations of all pieces with Graph """
+    boards = _boards(6, maze_size=maze_size, num_pieces=4)
+    batch = batch_module.BoardBatch.from_boards(boards)
+    for piece_index in range(4):
+        reached = batch.reachable(piece_index)
+        for board_index, board in enumerate(boards):
+            piece_location = board.maze.maze_card_location(board.pieces[piece_index].maze_card)
+            expected = Graph(board.maze).reachable_locations(piece_location)
+            actual = {BoardLocation(int(row), int(column)) for row, column in np.argwhere(reached[board_index])}
+            assert actual == expected
+
+
+def test_random_rollouts_keep_pieces_and_objective_consistent():
+    """ Tests random_rollouts """
+    boards = _boards(50, num_pieces=2)
+    batch = batch_module.BoardBatch.from_boards(boards)
+    scores = batch_module.random_rollouts(batch, turns=40, rng=np.random.default_rng(0))
+    assert scores.shape == (50, 2)
+    assert (scores >= 0).all()
+    assert ((batch.pieces >= 0) & (batch.pieces < 7)).all()
+    objective_on_maze = batch.objective[:, 0] >= 0
+    assert ((batch.objective[objective_on_maze] >= 0) & (batch.objective[objective_on_maze] < 7)).all()
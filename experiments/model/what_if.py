@@ -0,0 +1,63 @@
+""" Measures the cost of determining the reachable locations of a piece for all shift actions.
+
+For each maze size, a board with four pieces is created, and the reachable locations of the first piece
+are determined for all shift locations and all rotations of the leftover card. Two variants are timed:
+- 'naive' copies the board for each shift action, performs the shift, and runs a BFS on the copy,
+- 'evaluator' uses Board.evaluate_shifts(), which reverts each shift and skips equivalent rotations.
+The reported values are the costs of evaluating all shift actions once.
+
+    python what_if.py --outfile what_if.csv -s 7 -s 31
+"""
+import copy
+import timeit
+
+import click
+
+from labyrinth.model.factories import create_board
+from labyrinth.model.reachable import Graph
+from model._bench import print_row, write_csv
+
+
+@click.command()
+@click.option("--outfile", default=None, help="csv file to write the results to.")
+@click.option("--size", "-s", "sizes", multiple=True, type=int, default=[7, 9, 15, 31], show_default=True)
+@click.option("--repeats", default=5, show_default=True)
+def run(outfile, sizes, repeats):
+    rows = []
+    for size in sizes:
+        board = create_board(maze_size=size)
+        for _ in range(4):
+            board.create_piece()
+        row = {"size": size, "actions": len(board.shift_locations) * 4}
+        for name, variant in VARIANTS.items():
+            timer = timeit.Timer(lambda: variant(board))
+            row[f"{name}[ms]"] = min(timer.repeat(repeats, 1)) * 1000
+        row["speedup"] = row["naive[ms]"] / row["evaluator[ms]"]
+        print_row(row)
+        rows.append(row)
+    if outfile:
+        write_csv(rows, outfile)
+
+
+def _naive(board):
+    piece_index = 0
+    for shift_location in board.shift_locations:
+        for rotation in [0, 90, 180, 270]:
+            board_copy = copy.deepcopy(board)
+            board_copy.shift(shift_location, rotation)
+            piece = board_copy.pieces[piece_index]
+            piece_location = board_copy.maze.maze_card_location(piece.maze_card)
+            reachable_locations = Graph(board_copy.maze).reachable_locations(piece_location)
+            objective_location = board_copy.maze.maze_card_location(board_copy.objective_maze_card)
+            _ = objective_location in reachable_locations
+
+
+def _evaluator(board):
+    board.evaluate_shifts(board.pieces[0])
+
+
+VARIANTS = {"naive": _naive, "evaluator": _evaluator}
+
+
+if __name__ == "__main__":
+    run()